@@ -0,0 +1,249 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, List, Optional, Tuple
+
+from google.api_core import exceptions as google_exceptions
+
+from agents.providers import ModelProvider
+from core.config import (GEMINI_MODEL, FAKE_LLM_LATENCY_MS, FAKE_LLM_LATENCY_JITTER_MS, FAKE_LLM_MS_PER_PROMPT_TOKEN,
+                         FAKE_LLM_MS_PER_OUTPUT_TOKEN, FAKE_LLM_CHARS_PER_TOKEN, FAKE_LLM_THROTTLE_RATE,
+                         FAKE_LLM_SERVER_ERROR_RATE, FAKE_LLM_SEED)
+from utils.prescreen import score_candidates
+from utils.skill_index import normalize_skill
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_YEARS_RE = re.compile(r"(\d+)\s*\+?\s*(?:-\s*\d+\s*)?years?", re.I)
+_SCORE_RE = re.compile(r"\*\*Match Score:\*\*\s*(\S+)")
+_PACKED_CANDIDATE_RE = re.compile(r"^\s*(c\d+): (\{.*\})$", re.M)
+
+
+#=====================Deterministic Responses=====================
+#Each Agent prompt is recognised by a marker it contains and answered from its own content, so the answers are
+#schema-valid and the same prompt always gets the same answer. A new prompt needs its own responder here.
+def _between(prompt: str, start: str, end: str) -> str:
+    head, _, rest = prompt.partition(start)
+    return rest.partition(end)[0].strip() if rest else ""
+
+
+def _list_after(text: str, *labels: str) -> List[str]:
+    '''
+        The comma/semicolon separated values of the first line starting with one of `labels` (e.g. "Skills:").
+    '''
+    for line in text.splitlines():
+        stripped = line.strip().lstrip("-* ")
+        if stripped.lower().startswith(labels):
+            values = stripped.split(":", 1)[1] if ":" in stripped else ""
+            return [value.strip() for value in re.split(r"[,;|]", values) if value.strip()]
+    return []
+
+
+def _first_line(text: str) -> Optional[str]:
+    return next((line.strip() for line in text.splitlines() if line.strip()), None)
+
+
+def _parse_resume(prompt: str) -> dict:
+    text = _between(prompt, "**Resume Text:**", "**JSON Output:**")
+    email, phone = _EMAIL_RE.search(text), _PHONE_RE.search(text)
+    parsed = {"name": _first_line(text), "email": email.group(0) if email else None,
+              "phone": phone.group(0).strip() if phone else None,
+              "summary": " ".join(_list_after(text, "summary")) or None,
+              "work_experience": [], "projects": [], "education": [],
+              "skills": _list_after(text, "skills", "technical skills")}
+    #Answer only the fields the prompt's schema asks for (a pre-parsed resume asks for a few)
+    schema = _between(prompt, "### JSON Schema & Rules ###", "### Key Instructions ###")
+    return {key: value for key, value in parsed.items() if f'"{key}":' in schema}
+
+
+def _analyze_jd(prompt: str) -> dict:
+    text = _between(prompt, "###JOB DESCRIPTION to ANALYZE###", "###JSON OUTPUT ###")
+    years = _YEARS_RE.search(text)
+    education = next((line.strip() for line in text.splitlines() if re.search(r"degree|bachelor|master", line, re.I)), None)
+    return {"job_title": _first_line(text),
+            "required_skills": [{"skill": skill, "level": "Proficient"} for skill in _list_after(text, "required", "requirements", "must have")],
+            "preferred_skills": [{"skill": skill, "level": "Familiar"} for skill in _list_after(text, "preferred", "nice to have")],
+            "required_years_of_experience": int(years.group(1)) if years else 0,
+            "education_requirements": education}
+
+
+def _screen(resume: dict, jd: dict) -> dict:
+    #The deterministic pre-screening score stands in for the model's judgement
+    scored = score_candidates([{"_id": "candidate", **resume}], jd)[0]
+    resume_skills = {normalize_skill(skill) for skill in resume.get("skills", [])}
+    required = [s["skill"] for s in jd.get("required_skills", [])]
+    matched = [skill for skill in required if normalize_skill(skill) in resume_skills]
+    return {"match_score": int(round(scored["score"])),
+            "summary": f"{resume.get('name') or 'The candidate'} covers {len(matched)} of the "
+                       f"{len(required)} required skills for the {jd.get('job_title') or 'role'}.",
+            "strengths": [f"Lists {skill}, which the JD requires." for skill in matched],
+            "gaps": [f"No evidence of {skill}." for skill in required if skill not in matched]}
+
+
+def _screen_single(prompt: str) -> dict:
+    resume = json.loads(_between(prompt, "### Candidate Resume Data ###", "---"))
+    jd = json.loads(_between(prompt, "### Job Description Data ###", "---"))
+    return _screen(resume, jd)
+
+
+def _screen_packed(prompt: str) -> dict:
+    jd = json.loads(_between(prompt, "### Job Description Data ###", "---"))
+    return {"results": [{"candidate_id": candidate_id, **_screen(json.loads(resume_json), jd)}
+                        for candidate_id, resume_json in _PACKED_CANDIDATE_RE.findall(prompt)]}
+
+
+def _title(responsibilities: List[str]) -> str:
+    words = re.findall(r"[A-Za-z][\w+#-]*", " ".join(responsibilities))[:5]
+    return " ".join(word.capitalize() for word in words) or "Untitled Project"
+
+
+def _project_titles(prompt: str) -> dict:
+    projects = json.loads(_between(prompt, "**Projects:**", "**JSON Output:**"))
+    return {"titles": [{"index": project["index"], "title": _title(project["responsibilities"])} for project in projects]}
+
+
+def _project_title(prompt: str) -> str:
+    text = _between(prompt, "**Responsibilities:**", "**Project Title:**")
+    return _title([line.lstrip("- ") for line in text.splitlines()])
+
+
+def _report(prompt: str) -> str:
+    score = _SCORE_RE.search(prompt)
+    summary = _between(prompt, "**AI Summary:**", "**Strengths:**")
+    strengths = _between(prompt, "**Strengths:**", "**Gaps / Areas for Review:**")
+    gaps = _between(prompt, "**Gaps / Areas for Review:**", "---")
+    return (f"## Candidate Screening Report\n\n**Match Score:** {score.group(1) if score else 'N/A'} / 100\n\n"
+            f"### Summary\n{summary}\n\n### Strengths\n{strengths or '- None noted'}\n\n### Gaps\n{gaps or '- None noted'}\n")
+
+
+#(marker in the prompt, responder, returns JSON); the first match wins, so the packed screening goes before the single one
+RESPONDERS: List[Tuple[str, Callable[[str], object], bool]] = [
+    ("### Candidate Resumes (one per line", _screen_packed, True),
+    ("### Candidate Resume Data ###", _screen_single, True),
+    ("**Resume Text:**", _parse_resume, True),
+    ("###JOB DESCRIPTION to ANALYZE###", _analyze_jd, True),
+    ("For EACH project below", _project_titles, True),
+    ("**Project Title:**", _project_title, False),
+    ("### Candidate Screening Analysis ###", _report, False),
+]
+
+
+def fake_response_text(prompt: str, json_response: bool) -> str:
+    for marker, responder, returns_json in RESPONDERS:
+        if marker in prompt:
+            answer = responder(prompt)
+            return json.dumps(answer) if returns_json else answer
+    return "{}" if json_response else "OK"
+
+
+#=====================Fake Model and Provider=====================
+class FakeResponse:
+    def __init__(self, text: str, prompt_tokens: int, completion_tokens: int):
+        self.text = text
+        self.parts = [text] if text else []
+        self.usage_metadata = SimpleNamespace(prompt_token_count = prompt_tokens, candidates_token_count = completion_tokens)
+
+
+class FakeStream:
+    '''
+        The streamed form of a FakeResponse: a few chunks, with the decoding time spread between them.
+    '''
+    def __init__(self, response: FakeResponse, seconds: float, chunks: int = 8):
+        size = max(1, -(-len(response.text) // chunks))
+        self._chunks = [response.text[i:i + size] for i in range(0, len(response.text), size)]
+        self._delay = seconds / max(len(self._chunks), 1)
+        self.usage_metadata = response.usage_metadata
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(self._delay)
+            yield SimpleNamespace(text = chunk, parts = [chunk])
+
+
+class FakeModel:
+    '''
+        Answers every Agent prompt deterministically (see RESPONDERS), with configurable latency, token usage and
+        injected 429/503 failures. Counts its calls so load tests can report them.
+    '''
+    def __init__(self, provider: "FakeProvider", model_name: str, generation_config):
+        self.provider = provider
+        self.model_name = model_name
+        self.json_response = getattr(generation_config, "response_mime_type", None) == "application/json"
+
+    def _answer(self, prompt: str) -> Tuple[FakeResponse, float]:
+        provider = self.provider
+        error, latency_ms = provider.draw()
+        text = fake_response_text(prompt, self.json_response)
+        prompt_tokens = int(len(prompt) / provider.chars_per_token)
+        completion_tokens = int(len(text) / provider.chars_per_token)
+        provider.record(prompt_tokens, completion_tokens, error)
+        seconds = (latency_ms + prompt_tokens * provider.ms_per_prompt_token
+                   + completion_tokens * provider.ms_per_output_token) / 1000
+        if error:
+            raise error
+        return FakeResponse(text, prompt_tokens, completion_tokens), seconds
+
+    def generate_content(self, prompt: str):
+        response, seconds = self._answer(prompt)
+        time.sleep(seconds)
+        return response
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        response, seconds = self._answer(prompt)
+        if stream:
+            return FakeStream(response, seconds)
+        await asyncio.sleep(seconds)
+        return response
+
+
+class FakeProvider(ModelProvider):
+    '''
+        Offline provider for load tests and CI: no API key, no network, same answer for the same prompt.
+    '''
+    name = "fake"
+
+    def __init__(self, latency_ms: float = FAKE_LLM_LATENCY_MS, jitter_ms: float = FAKE_LLM_LATENCY_JITTER_MS,
+                 ms_per_prompt_token: float = FAKE_LLM_MS_PER_PROMPT_TOKEN, ms_per_output_token: float = FAKE_LLM_MS_PER_OUTPUT_TOKEN, chars_per_token: float = FAKE_LLM_CHARS_PER_TOKEN,
+                 throttle_rate: float = FAKE_LLM_THROTTLE_RATE, server_error_rate: float = FAKE_LLM_SERVER_ERROR_RATE,
+                 seed: int = FAKE_LLM_SEED):
+        self.latency_ms, self.jitter_ms = latency_ms, jitter_ms
+        self.ms_per_prompt_token, self.ms_per_output_token = ms_per_prompt_token, ms_per_output_token
+        self.chars_per_token = chars_per_token
+        self.throttle_rate, self.server_error_rate = throttle_rate, server_error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "throttled": 0, "server_errors": 0}
+
+    def draw(self) -> Tuple[Optional[Exception], float]:
+        '''
+            The injected failure (if any) and the latency of the next call, from the seeded generator.
+        '''
+        with self._lock:
+            roll = self._random.random()
+            latency_ms = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms))
+        if roll < self.throttle_rate:
+            return google_exceptions.ResourceExhausted("Fake quota exceeded"), latency_ms
+        if roll < self.throttle_rate + self.server_error_rate:
+            return google_exceptions.ServiceUnavailable("Fake model overloaded"), latency_ms
+        return None, latency_ms
+
+    def record(self, prompt_tokens: int, completion_tokens: int, error: Optional[Exception]):
+        with self._lock:
+            self.counters["calls"] += 1
+            if isinstance(error, google_exceptions.TooManyRequests):
+                self.counters["throttled"] += 1
+            elif error:
+                self.counters["server_errors"] += 1
+            else:
+                self.counters["prompt_tokens"] += prompt_tokens
+                self.counters["completion_tokens"] += completion_tokens
+
+    def create_model(self, model_name: str, generation_config):
+        return FakeModel(self, model_name, generation_config)
+
+    def list_models(self) -> List[str]:
+        return [f"models/{GEMINI_MODEL}", "models/fake-model"]
@@ -1,24 +1,23 @@
 import json
-import google.generativeai as genai
 from google.generativeai.types import GenerationConfig
 from pydantic import ValidationError
 from typing import List
 
 from agents.resume_parser import ParsedJD, SkillsRequired
-from core.config import GOOGLE_API_KEY
+from core.config import GEMINI_MODEL
+from agents.llm_client import generate_text, generate_text_async
+from agents.providers import ModelProvider, get_provider
+from utils.metrics import record_agent_failure
 
 class JDAnalyzerAgent:
-    def __init__(self):
+    def __init__(self, model_name: str = GEMINI_MODEL, provider: ModelProvider = None):
         
-        if not GOOGLE_API_KEY:
-            raise ValueError("API Key not found in Environment vairables")
-        genai.configure(api_key=GOOGLE_API_KEY)
+        self.provider = provider or get_provider()
+        self.provider.check_credentials()
         
+        self.model_name = model_name
         self.generation_config = GenerationConfig(response_mime_type="application/json")
-        self.model = genai.GenerativeModel(
-            model_name = "gemini-1.5-flash",
-            generation_config=self.generation_config
-        )
+        self.model = self.provider.create_model(model_name, self.generation_config)
         
     def build_prompt(self, jd_text: str) -> str:
         return f"""
@@ -55,17 +54,37 @@ class JDAnalyzerAgent:
     """
     
     
-    def parse_jd(self, jd_text: str) ->dict:
+    def _validate_jd(self, response_text: str) -> dict:
+        parsed_json = json.loads(response_text)
+        validated_data = ParsedJD(**parsed_json)
+        return validated_data.dict()
+
+    def parse_jd(self, jd_text: str, use_cache: bool = True) ->dict:
         
         try:
             prompt = self.build_prompt(jd_text)
-            response = self.model.generate_content(prompt)
-            
-            parsed_json = json.loads(response.text)
-            validated_data = ParsedJD(**parsed_json)
-            return validated_data.dict()
+            response_text = generate_text(self, prompt, use_cache=use_cache, validate=self._validate_jd)
+            return self._validate_jd(response_text)
         
         except (json.JSONDecodeError, ValidationError) as e:
+            record_agent_failure(self, e)
+            return {"error": f"Failed to parse or validate JD model output. Details: {e}"}
+        except Exception as e:
+            record_agent_failure(self, e)
+            return {"error": f"Unknown error occured. Details: {e}"}
+
+    async def parse_jd_async(self, jd_text: str, use_cache: bool = True) ->dict:
+        '''
+            Async twin of `parse_jd`: awaits the model instead of blocking the event loop.
+        '''
+        try:
+            prompt = self.build_prompt(jd_text)
+            response_text = await generate_text_async(self, prompt, use_cache=use_cache, validate=self._validate_jd)
+            return self._validate_jd(response_text)
+
+        except (json.JSONDecodeError, ValidationError) as e:
+            record_agent_failure(self, e)
             return {"error": f"Failed to parse or validate JD model output. Details: {e}"}
         except Exception as e:
-            return {"error": f"Unknown error occured. Details: {e}"}    
\ No newline at end of file
+            record_agent_failure(self, e)
+            return {"error": f"Unknown error occured. Details: {e}"}
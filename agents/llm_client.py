@@ -0,0 +1,253 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, Optional
+
+from core.config import (LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS, LLM_CACHE_PERSISTENT, LLM_RPM, LLM_TPM,
+                         LLM_INITIAL_CONCURRENCY, LLM_MIN_CONCURRENCY, LLM_MAX_CONCURRENCY, LLM_LATENCY_TOLERANCE,
+                         LLM_MAX_RETRIES, LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS)
+from db.database import db_instance
+from utils.llm_cache import LLMResponseCache
+from utils.llm_scheduler import LLMScheduler, backoff_seconds, current_priority, retry_reason
+from utils.metrics import (LLM_REQUEST_SECONDS, LLM_REQUESTS_IN_FLIGHT, LLM_CACHE_RESULTS, LLM_SCHEDULER_WAIT_SECONDS,
+                           LLM_RETRIES, LLM_CONCURRENCY_LIMIT, agent_label, record_agent_failure, record_token_usage)
+from utils.prompt_compaction import estimate_tokens
+
+#Process-wide response cache shared by every Agent
+llm_cache = LLMResponseCache(
+    max_entries = LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds = LLM_CACHE_TTL_SECONDS,
+    collection = db_instance.get_collection("llm_cache") if LLM_CACHE_PERSISTENT else None,
+)
+
+#Process-wide admission control (RPM/TPM buckets, priorities, adaptive concurrency) shared by every Agent
+llm_scheduler = LLMScheduler(
+    rpm = LLM_RPM,
+    tpm = LLM_TPM,
+    initial_concurrency = LLM_INITIAL_CONCURRENCY,
+    min_concurrency = LLM_MIN_CONCURRENCY,
+    max_concurrency = LLM_MAX_CONCURRENCY,
+    latency_tolerance = LLM_LATENCY_TOLERANCE,
+)
+
+
+@contextmanager
+def _timed_model_call(agent):
+    '''
+        Records the latency and in-flight count of one model call attempt.
+    '''
+    name = agent_label(agent)
+    in_flight = LLM_REQUESTS_IN_FLIGHT.labels(name)
+    in_flight.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        in_flight.dec()
+        LLM_REQUEST_SECONDS.labels(name, agent.model_name).observe(time.perf_counter() - start)
+
+
+def _billed_tokens(response, estimated_tokens: int) -> int:
+    usage = getattr(response, "usage_metadata", None)
+    billed = (getattr(usage, "prompt_token_count", 0) or 0) + (getattr(usage, "candidates_token_count", 0) or 0)
+    return billed or estimated_tokens
+
+
+def _latency_key(agent, estimated_tokens: int) -> str:
+    #Calls are compared with calls of the same agent and prompt size class (powers of two)
+    return f"{agent_label(agent)}/{max(estimated_tokens, 1).bit_length()}"
+
+
+def _release(start: float, estimated_tokens: int, response = None, error: Exception = None, latency_key = None) -> bool:
+    '''
+        Hands the outcome of an attempt back to the scheduler; returns whether the error is worth retrying.
+    '''
+    reason = retry_reason(error) if error is not None else None
+    if error is None:
+        llm_scheduler.release(time.perf_counter() - start, token_correction = _billed_tokens(response, estimated_tokens) - estimated_tokens,
+                              latency_key = latency_key)
+    else:
+        llm_scheduler.release(throttled = reason == "throttled", transient = reason == "transient")
+    LLM_CONCURRENCY_LIMIT.set(int(llm_scheduler.limit))
+    return reason is not None
+
+
+def _give_up_or_count_retry(agent, error: Exception, retryable: bool, attempt: int):
+    '''
+        Raises `error` once it is not retryable or the retries are spent; otherwise counts the retry.
+    '''
+    if not retryable or attempt == LLM_MAX_RETRIES:
+        record_agent_failure(agent, error, kind = "api_error")
+        raise error
+    LLM_RETRIES.labels(agent_label(agent), retry_reason(error)).inc()
+
+
+async def _acquire(estimated_tokens: int):
+    start = time.perf_counter()
+    await llm_scheduler.acquire(estimated_tokens)
+    LLM_SCHEDULER_WAIT_SECONDS.labels(current_priority()).observe(time.perf_counter() - start)
+
+
+def _acquire_sync(estimated_tokens: int):
+    start = time.perf_counter()
+    llm_scheduler.acquire_sync(estimated_tokens)
+    LLM_SCHEDULER_WAIT_SECONDS.labels(current_priority()).observe(time.perf_counter() - start)
+
+
+def _model_call(agent, prompt: str):
+    '''
+        generate_content through the scheduler; throttled and transient failures are retried with jittered backoff.
+    '''
+    estimated_tokens = estimate_tokens(prompt)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        _acquire_sync(estimated_tokens)
+        start = time.perf_counter()
+        try:
+            with _timed_model_call(agent):
+                response = agent.model.generate_content(prompt)
+                text = response.text
+        except Exception as e:
+            _give_up_or_count_retry(agent, e, _release(start, estimated_tokens, error = e), attempt)
+            time.sleep(backoff_seconds(attempt, LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS))
+            continue
+        _release(start, estimated_tokens, response, latency_key = _latency_key(agent, estimated_tokens))
+        return response, text
+
+
+async def _model_call_async(agent, prompt: str):
+    '''
+        Async twin of `_model_call`.
+    '''
+    estimated_tokens = estimate_tokens(prompt)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        await _acquire(estimated_tokens)
+        start = time.perf_counter()
+        try:
+            with _timed_model_call(agent):
+                response = await agent.model.generate_content_async(prompt)
+                text = response.text
+        except Exception as e:
+            _give_up_or_count_retry(agent, e, _release(start, estimated_tokens, error = e), attempt)
+            await asyncio.sleep(backoff_seconds(attempt, LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS))
+            continue
+        _release(start, estimated_tokens, response, latency_key = _latency_key(agent, estimated_tokens))
+        return response, text
+
+
+#Raises on a response the Agent cannot use (invalid JSON, schema violation...); its return value is ignored
+Validator = Optional[Callable[[str], object]]
+
+
+def _passes(text: str, validate: Validator) -> bool:
+    if validate is None:
+        return True
+    try:
+        validate(text)
+        return True
+    except Exception:
+        return False
+
+
+def _cache_lookup_result(agent, cached_text: Optional[str], usable: bool) -> bool:
+    LLM_CACHE_RESULTS.labels(agent_label(agent), "hit" if usable else "miss" if cached_text is None else "invalid").inc()
+    return usable
+
+
+def _check_cacheable(text: str, validate: Validator):
+    '''
+        Runs the Agent's validation on a fresh response before it may be cached; a failure propagates to the Agent.
+    '''
+    if validate is not None:
+        validate(text)
+
+
+def generate_text(agent, prompt: str, use_cache: bool = True, validate: Validator = None) -> str:
+    '''
+        Single entry point for every Agent's model call.
+        `agent` must expose `model`, `model_name` and `generation_config`.
+        With use_cache=False the cache is not read, but the fresh response still replaces the stored one.
+        A response is only cached once `validate` accepts it (and is not empty), so a truncated or invalid answer
+        is never replayed; a cached response that fails `validate` is dropped and asked for again.
+    '''
+    key = llm_cache.make_key(agent.model_name, agent.generation_config, prompt)
+    if use_cache:
+        cached_text = llm_cache.get(key)
+        if _cache_lookup_result(agent, cached_text, cached_text is not None and _passes(cached_text, validate)):
+            return cached_text
+        if cached_text is not None:
+            llm_cache.delete(key)
+
+    response, text = _model_call(agent, prompt)
+    record_token_usage(agent, response)
+    _check_cacheable(text, validate)
+    if text.strip():
+        llm_cache.set(key, text, agent.model_name)
+    return text
+
+
+async def generate_text_async(agent, prompt: str, use_cache: bool = True, validate: Validator = None) -> str:
+    '''
+        Same as `generate_text`, but awaits the SDK's async call so the event loop keeps serving other requests.
+        The cache's MongoDB tier is blocking, so it is consulted from a worker thread.
+    '''
+    key = llm_cache.make_key(agent.model_name, agent.generation_config, prompt)
+    if use_cache:
+        cached_text = await asyncio.to_thread(llm_cache.get, key)
+        if _cache_lookup_result(agent, cached_text, cached_text is not None and _passes(cached_text, validate)):
+            return cached_text
+        if cached_text is not None:
+            await asyncio.to_thread(llm_cache.delete, key)
+
+    response, text = await _model_call_async(agent, prompt)
+    record_token_usage(agent, response)
+    _check_cacheable(text, validate)
+    if text.strip():
+        await asyncio.to_thread(llm_cache.set, key, text, agent.model_name)
+    return text
+
+
+async def stream_text_async(agent, prompt: str, use_cache: bool = True, validate: Validator = None) -> AsyncIterator[str]:
+    '''
+        Streams the model's response chunk by chunk (a cached response arrives as a single chunk).
+        The full text is cached once the stream completes and `validate` accepts it; since the chunks are already
+        sent by then, a failed validation is raised after the last one.
+    '''
+    key = llm_cache.make_key(agent.model_name, agent.generation_config, prompt)
+    if use_cache:
+        cached_text = await asyncio.to_thread(llm_cache.get, key)
+        if _cache_lookup_result(agent, cached_text, cached_text is not None and _passes(cached_text, validate)):
+            yield cached_text
+            return
+        if cached_text is not None:
+            await asyncio.to_thread(llm_cache.delete, key)
+
+    #The call holds its scheduler slot until the stream ends; it is only retried while nothing has been yielded yet
+    chunks = []
+    estimated_tokens = estimate_tokens(prompt)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        await _acquire(estimated_tokens)
+        start, response = time.perf_counter(), None
+        try:
+            with _timed_model_call(agent):
+                response = await agent.model.generate_content_async(prompt, stream = True)
+                async for chunk in response:
+                    #The closing chunk may carry only the finish reason, and `.text` raises on a chunk without parts
+                    if chunk.parts and chunk.text:
+                        chunks.append(chunk.text)
+                        yield chunk.text
+        except Exception as e:
+            retryable = _release(start, estimated_tokens, error = e) and not chunks
+            _give_up_or_count_retry(agent, e, retryable, attempt)
+            await asyncio.sleep(backoff_seconds(attempt, LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS))
+            continue
+        except BaseException:
+            #The client went away mid-stream: free the slot without judging the latency of a partial response
+            llm_scheduler.release()
+            raise
+        _release(start, estimated_tokens, response, latency_key = _latency_key(agent, estimated_tokens))
+        break
+    record_token_usage(agent, response)
+    text = "".join(chunks)
+    _check_cacheable(text, validate)
+    if text.strip():
+        await asyncio.to_thread(llm_cache.set, key, text, agent.model_name)
@@ -0,0 +1,66 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import google.generativeai as genai
+
+from core.config import GOOGLE_API_KEY, LLM_PROVIDER
+
+
+class ModelProvider(ABC):
+    '''
+        What every Agent needs from a model backend. `create_model` returns an object with the two calls
+        llm_client makes: `generate_content(prompt)` and `generate_content_async(prompt, stream = False)`, whose
+        responses expose `.text` (chunks also `.parts`) and optionally `.usage_metadata`.
+        A provider missing `create_model` or `list_models` fails when it is instantiated.
+    '''
+    name = "base"
+
+    def check_credentials(self):
+        '''
+            Raises ValueError when the provider cannot be used (e.g. a missing API key).
+        '''
+
+    @abstractmethod
+    def create_model(self, model_name: str, generation_config):
+        ...
+
+    @abstractmethod
+    def list_models(self) -> List[str]:
+        '''
+            Names of the models that can generate content (a remote round trip for real providers).
+        '''
+
+
+class GeminiProvider(ModelProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = GOOGLE_API_KEY):
+        self.api_key = api_key
+
+    def check_credentials(self):
+        if not self.api_key:
+            raise ValueError("API Key not found in Environment variables (GOOGLE_API_KEY)")
+
+    def create_model(self, model_name: str, generation_config):
+        return genai.GenerativeModel(model_name=model_name, generation_config=generation_config)
+
+    def list_models(self) -> List[str]:
+        return [m.name for m in genai.list_models() if "generateContent" in m.supported_generation_methods]
+
+
+#Providers are process-wide singletons, created on first use
+_providers: Dict[str, ModelProvider] = {}
+
+def get_provider(name: str = LLM_PROVIDER) -> ModelProvider:
+    '''
+        The provider selected by LLM_PROVIDER: "gemini" (default) or "fake" (deterministic, offline).
+    '''
+    if name not in _providers:
+        if name == "gemini":
+            _providers[name] = GeminiProvider()
+        elif name == "fake":
+            from agents.fake_provider import FakeProvider
+            _providers[name] = FakeProvider()
+        else:
+            raise ValueError(f"Unknown LLM_PROVIDER '{name}' (expected 'gemini' or 'fake')")
+    return _providers[name]
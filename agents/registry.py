@@ -0,0 +1,78 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from agents.resume_parser import ResumeParserAgent
+from agents.jd_analyzer import JDAnalyzerAgent
+from agents.screening_agent import ScreeningAgent
+from agents.reporting_agent import ReportingAgent
+from agents.providers import ModelProvider, get_provider
+from core.config import GEMINI_MODEL
+
+
+class AgentRegistry:
+    '''
+        Holds one long-lived instance of every Agent, created once during the FastAPI lifespan startup
+        and shared across requests. Models can be swapped at runtime without restarting the server.
+    '''
+    def __init__(self, model_name: str = GEMINI_MODEL, provider: ModelProvider = None):
+        self.provider = provider or get_provider()
+        self.available_models: List[str] = []
+        self.models_refreshed_at: Optional[float] = None
+        self.build_timings_ms: Dict[str, float] = {}
+        self._build(model_name)
+
+    def _build(self, model_name: str):
+        '''
+            Constructs a fresh set of Agents for `model_name` and swaps them in.
+            Attribute assignment is atomic, so in-flight requests keep using the Agents they already hold.
+        '''
+        timings = {}
+        agents = {}
+        for name, agent_cls in (("parser", ResumeParserAgent), ("jd_analyzer", JDAnalyzerAgent),
+                                ("screening", ScreeningAgent), ("reporting", ReportingAgent)):
+            start = time.perf_counter()
+            agents[name] = agent_cls(model_name=model_name, provider=self.provider)
+            timings[name] = (time.perf_counter() - start) * 1000
+
+        self.parser = agents["parser"]
+        self.jd_analyzer = agents["jd_analyzer"]
+        self.screening = agents["screening"]
+        self.reporting = agents["reporting"]
+        self.model_name = model_name
+        self.build_timings_ms = timings
+
+    def swap_model(self, model_name: str):
+        '''
+            Rebuilds every Agent against a different model of the same provider.
+        '''
+        if self.available_models and not any(m == model_name or m == f"models/{model_name}" for m in self.available_models):
+            raise ValueError(f"Model '{model_name}' is not in the list of available models.")
+        self._build(model_name)
+
+    def refresh_models(self) -> float:
+        '''
+            Fetches the models supporting `generateContent` (a full remote round trip) and returns its latency in ms.
+        '''
+        start = time.perf_counter()
+        self.available_models = self.provider.list_models()
+        self.models_refreshed_at = time.time()
+        return (time.perf_counter() - start) * 1000
+
+    async def refresh_models_periodically(self, interval_seconds: int):
+        '''
+            Background task that keeps `available_models` fresh without blocking any request.
+        '''
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh_models)
+            except Exception as e:
+                print(f"Could not refresh the model list: {e}")
+            await asyncio.sleep(interval_seconds)
+
+    def status(self) -> dict:
+        return {"provider": self.provider.name,
+                "active_model": self.model_name,
+                "available_models": self.available_models,
+                "models_refreshed_at": self.models_refreshed_at,
+                "build_timings_ms": self.build_timings_ms}
@@ -1,29 +1,36 @@
 import json
-import google.generativeai as genai
+from typing import AsyncIterator
 from google.generativeai import GenerationConfig
 
-from core.config import GOOGLE_API_KEY
+from core.config import GEMINI_MODEL
 from agents.resume_parser import ScreeningResult
+from agents.llm_client import generate_text, generate_text_async, stream_text_async
+from agents.providers import ModelProvider, get_provider
+from utils.metrics import record_agent_failure
+
+
+#generate_prompt returns its failures as text starting with this prefix
+REPORT_ERROR_PREFIX = "An error occured during report geneartion"
+
+def is_report_error(report: str) -> bool:
+    return report.startswith(REPORT_ERROR_PREFIX)
 
 
 class ReportingAgent:
-    def __init__(self):
+    def __init__(self, model_name: str = GEMINI_MODEL, provider: ModelProvider = None):
         
-        if not GOOGLE_API_KEY:
-            raise ValueError("API Key missing!!!!")
-        genai.configure(api_key=GOOGLE_API_KEY)
+        self.provider = provider or get_provider()
+        self.provider.check_credentials()
 
+        self.model_name = model_name
         #Response type will be in Markdown/Plain-Text
         self.generation_config = GenerationConfig(response_mime_type="text/plain")
-        self.model = genai.GenerativeModel(
-            model_name="gemini-1.5-flash",
-            generation_config=self.generation_config
-        )
+        self.model = self.provider.create_model(model_name, self.generation_config)
         
     def _build_prompt(self, screening_json: dict)->str:
         
         #Extract the Key Parts for better Readability
-        score = screening_json.get('match-score', 'N/A')
+        score = screening_json.get('match_score', 'N/A')
         summary = screening_json.get('summary', 'No summary provided.')
         strengths = "\n".join([f"- {s}" for s in screening_json.get('strengths', [])])
         gaps = "\n".join([f"- {g}" for g in screening_json.get('gaps', [])])
@@ -53,16 +60,46 @@ class ReportingAgent:
     """
     
     
-    def generate_prompt(self, screening_data: dict) -> str:
+    def generate_prompt(self, screening_data: dict, use_cache: bool = True) -> str:
         
         try:
             ScreeningResult(**screening_data)
             
             prompt = self._build_prompt(screening_data)
-            response = self.model.generate_content(prompt)
+            response_text = generate_text(self, prompt, use_cache=use_cache)
             
-            return response.text.strip()
+            return response_text.strip()
         
         except Exception as e:
-            return f"An error occured during report geneartion: {str(e)}"
-            
\ No newline at end of file
+            record_agent_failure(self, e)
+            return f"{REPORT_ERROR_PREFIX}: {str(e)}"
+
+    async def generate_prompt_async(self, screening_data: dict, use_cache: bool = True) -> str:
+        '''
+            Async twin of `generate_prompt`: awaits the model instead of blocking the event loop.
+        '''
+        try:
+            ScreeningResult(**screening_data)
+
+            prompt = self._build_prompt(screening_data)
+            response_text = await generate_text_async(self, prompt, use_cache=use_cache)
+
+            return response_text.strip()
+
+        except Exception as e:
+            record_agent_failure(self, e)
+            return f"{REPORT_ERROR_PREFIX}: {str(e)}"
+
+    async def stream_report_async(self, screening_data: dict, use_cache: bool = True) -> AsyncIterator[str]:
+        '''
+            Streams the markdown report as the model writes it. Unlike `generate_prompt`, failures are raised,
+            since part of the report may already have been sent.
+        '''
+        try:
+            ScreeningResult(**screening_data)
+            prompt = self._build_prompt(screening_data)
+            async for chunk in stream_text_async(self, prompt, use_cache=use_cache):
+                yield chunk
+        except Exception as e:
+            record_agent_failure(self, e)
+            raise
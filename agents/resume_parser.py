@@ -1,14 +1,21 @@
+import asyncio
 import json 
-import google.generativeai as genai 
+import hashlib
 from google.generativeai.types import GenerationConfig
-from pydantic import BaseModel, Field, ValidationError
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from typing import List, Optional, Tuple
 
-from utils.file_handler import extract_text_from_pdf, extract_text_from_docx, extract_text_from_image
-from core.config import GOOGLE_API_KEY
+from utils.file_handler import extract_file, extract_file_with_timings, run_extraction, FileSource
+from core.config import GEMINI_MODEL, RESUME_TITLES_IN_EXTRACTION, RESUME_PREPARSE
+from agents.llm_client import generate_text, generate_text_async
+from agents.providers import ModelProvider, get_provider
+from utils.metrics import RESUME_PREPARSE_OUTCOMES, observe_extraction, record_agent_failure
+from utils.resume_preparser import PREPARSER_VERSION, RESUME_FIELDS, preparse_resume
 
 #===============Pydantic models for Type-Validation of the LLM output==================
 class WorkExperience(BaseModel):
+    #The prompts ask for `title`; the aliases are kept for older stored documents
+    model_config = ConfigDict(populate_by_name = True)
     title: Optional[str] = Field(None, alias = "job_title")
     company: Optional[str] = None
     start_date: Optional[str] = None
@@ -17,6 +24,7 @@ class WorkExperience(BaseModel):
 
 
 class Project(BaseModel):
+    model_config = ConfigDict(populate_by_name = True)
     title: Optional[str] = Field(None, alias = "project_name")
     start_date: Optional[str] = None
     end_date: Optional[str] = None
@@ -55,119 +63,295 @@ class ScreeningResult(BaseModel):
     summary: str = Field(..., description="A qualitative summary of the candidate's fit.")
     strengths: List[str] = Field(default_factory=list, description = "Specific points where the candidate meets or exceeds requirements.")
     gaps: List[str] = Field(default_factory=list, description = "Specific areas where the candidate is lacking.")
+
+class ProjectTitle(BaseModel):
+    index: int
+    title: str
+
+class ProjectTitles(BaseModel):
+    titles: List[ProjectTitle] = Field(default_factory=list)
     
 #=======================PyDantic Model==================================================
+
+#The schema the extraction prompt shows for each ParsedResume field (only the fields the model has to return are shown)
+RESUME_FIELD_SCHEMAS = {
+    "name": '"name": "string"',
+    "email": '"email": "string"',
+    "phone": '"phone": "string"',
+    "summary": '"summary": "string"',
+    "work_experience": '"work_experience": [{...}]',
+    "projects": '''"projects": [
+                {
+                    "title": "string (This can be null if no explicit title is found)",
+                    "start_date": "string",
+                    "end_date": "string",
+                    "responsibilities": ["string"]
+                }
+            ]''',
+    "education": '''"education": [
+                {
+                    "degree": "string",
+                    "institution": "string (The name of the university, college or school)",
+                    "year_of_completion": "string",
+                    "grade": "string (e.g., '8.5 CGPA', '92%', 'First Class with Distinction')"
+                } 
+                ]''',
+    "skills": '"skills": ["string"]',
+}
+
+#Keys under which ResumeParserAgent.parse reports a failure instead of a ParsedResume
+PARSE_ERROR_KEYS = ("error", "Error", "ValueError")
+
+def is_parse_error(result: dict) -> bool:
+    return any(key in result for key in PARSE_ERROR_KEYS)
     
     
 class ResumeParserAgent:
-    def __init__(self):
-        if not GOOGLE_API_KEY:
-            raise ValueError("API Key not found")
-        genai.configure(api_key = GOOGLE_API_KEY)
-        # self.model = genai.GenerativeModel('gemini-2.5-flash')
+    def __init__(self, model_name: str = GEMINI_MODEL, titles_in_extraction: bool = RESUME_TITLES_IN_EXTRACTION,
+                 preparse: bool = RESUME_PREPARSE, provider: ModelProvider = None):
+        self.provider = provider or get_provider()
+        self.provider.check_credentials()
         
         #Define Generation_config to bound the model to only output JSON
+        #(Model availability is checked once by the AgentRegistry, not on every construction)
+        self.model_name = model_name
+        #Opt-in: the extraction prompt also titles untitled projects, so no title call is needed at all
+        self.titles_in_extraction = titles_in_extraction
+        #Contact details, summary and skills are taken by rules; only the other sections go to the model
+        self.preparse = preparse
         self.generation_config = GenerationConfig(response_mime_type="application/json")
-        try:
-            available_models = [m.name for m in genai.list_models()]
-            if any("gemini-1.5-flash" in m for m in available_models):
-                self.model = genai.GenerativeModel(model_name='gemini-1.5-flash', generation_config=self.generation_config)
-                print("Using gemini-1.5-flash")
-            else:
-                self.model = genai.GenerativeModel(model_name="gemini-1.5-flash", generation_config=self.generation_config)
-                print("Using Gemini-1.5-Flash")
-        except Exception as e:
-            print("Could not list models. Falling back to Gemini-1.5-flash. Reason: {e}")
-            self.model = genai.GenerativeModel(model_name="gemini-1.5-flash", generation_config=self.generation_config)
+        self.model = self.provider.create_model(model_name, self.generation_config)
+        self.parser_version = self._compute_parser_version()
             
-    def _get_raw_text(self, filename: str, file_bytes: bytes)->str:
+    def _compute_parser_version(self) -> str:
+        '''
+            Fingerprints everything that shapes a parse: the model, both prompts, the pre-parser and the output schema.
+            Editing `_build_prompt` or a title prompt changes the version, which invalidates every cached parse.
+        '''
+        fingerprint = "\n".join([
+            self.model_name,
+            f"preparse={PREPARSER_VERSION}" if self.preparse else "preparse=off",
+            self._build_prompt("{raw_resume_text}"),
+            self._build_titles_prompt("{projects_json}"),
+            self._build_title_prompt("{responsibilities_text}"),
+            json.dumps(ParsedResume.model_json_schema(), sort_keys=True),
+        ])
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+    def new_content_hasher(self):
+        '''
+            A sha256 hasher pre-seeded with the parser version; feed it the file bytes (in chunks if streaming).
+        '''
+        hasher = hashlib.sha256(self.parser_version.encode("utf-8"))
+        hasher.update(b"\0")
+        return hasher
+
+    def content_hash(self, file_bytes: bytes) -> str:
+        '''
+            Content address of an uploaded resume: the file bytes hashed together with the parser version.
+        '''
+        hasher = self.new_content_hasher()
+        hasher.update(file_bytes)
+        return hasher.hexdigest()
+
+    def _get_raw_text(self, filename: str, source: FileSource, timings: Optional[list] = None)->str:
         '''
             This function will Determine the filetype and Extract Raw text
+            (PDF per-page timings are appended to `timings` when given)
         '''
+        return extract_file(filename, source, timings = timings)
         
-        if filename.lower().endswith(".pdf"):
-            return extract_text_from_pdf(file_bytes = file_bytes)
+    def extract_text(self, filename: str, source: FileSource) -> Tuple[str, dict]:
+        '''
+            Stage 1: extracts the raw text and records how long it took (per page for PDFs).
+        '''
+        raw_text, extraction = extract_file_with_timings(filename, source)
+        observe_extraction(filename, extraction)
+        return raw_text, extraction
 
-        elif filename.lower().endswith(".docx"):
-            return extract_text_from_docx(file_bytes)
-        
-        elif filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-            return extract_text_from_image(file_bytes)
-        
-        else:
-            raise ValueError("Unsupported File Type")
-        
-    def parse(self, filename: str, file_bytes: bytes)->dict:
-        try:
-            raw_text = self._get_raw_text(filename, file_bytes)
-            
-            #Check if raw_text is empty
-            if not raw_text:
-                return {"Error":"Failed to extract raw text from the resume"}
+    def _parse_error(self, e: Exception) -> dict:
+        '''
+            Maps a failure while parsing resume text to the error dict `parse_text` returns.
+        '''
+        record_agent_failure(self, e)
+        if isinstance(e, ValueError):
+            return {"ValueError": str(e)}
+        if isinstance(e, json.JSONDecodeError):
+            return {"Error": "Failed to Decode JSON from the models's response"}
+        if isinstance(e, ValidationError):
+            return {"Error": "Model response failed validation", 
+                    "details":e.errors()}
+        return {"Error": f"Unexpected error occured: {str(e)}"}
 
+    def _plan_parse(self, raw_text: str) -> Tuple[Optional[str], dict, Optional[dict]]:
+        '''
+            Runs the pre-parser and returns the prompt for what is left (None when nothing is), the fields it
+            resolved and a summary of the plan stored with the resume.
+        '''
+        if not self.preparse:
+            return self._build_prompt(raw_text), {}, None
+
+        preparsed = preparse_resume(raw_text)
+        if not preparsed["segmented"]:
+            #No section headings to go by: the model reads the whole resume, as without the pre-parser
+            outcome, fields, llm_fields = "full", {}, list(RESUME_FIELDS)
             prompt = self._build_prompt(raw_text)
+        elif preparsed["llm_text"]:
+            outcome, fields, llm_fields = "reduced", preparsed["fields"], preparsed["llm_fields"]
+            prompt = self._build_prompt(preparsed["llm_text"], llm_fields)
+        else:
+            outcome, fields, llm_fields = "skipped_llm", preparsed["fields"], []
+            prompt = None
+        RESUME_PREPARSE_OUTCOMES.labels(outcome).inc()
+        return prompt, fields, {"outcome": outcome, "resolved_fields": list(fields), "llm_fields": llm_fields}
+
+    def _merge_parse(self, response_text: Optional[str], fields: dict, plan: Optional[dict]) -> ParsedResume:
+        '''
+            The model's answer with the locally resolved fields on top, except for the fields the model was asked
+            for: there its (non-null) value wins over the rules'.
+        '''
+        llm_data = json.loads(response_text) if response_text is not None else {}
+        llm_fields = plan["llm_fields"] if plan else RESUME_FIELDS
+        asked = {key: value for key, value in llm_data.items() if key in llm_fields and value is not None}
+        return ParsedResume(**{**llm_data, **fields, **asked})
+
+    def _with_preparse(self, parsed_data: ParsedResume, plan: Optional[dict]) -> dict:
+        result = parsed_data.dict()
+        if plan:
+            result["preparse"] = plan
+        return result
+
+    def parse_text(self, raw_text: str, use_cache: bool = True) -> dict:
+        '''
+            Stage 2: turns extracted resume text into a ParsedResume dict using the pre-parser and the LLM.
+        '''
+        try:
+            prompt, fields, plan = self._plan_parse(raw_text)
             
             #Call the Gemini API
-            response = self.model.generate_content(prompt)
+            response_text = generate_text(self, prompt, use_cache=use_cache,
+                                          validate=lambda text: self._merge_parse(text, fields, plan)) if prompt else None
             
-            parsed_data = ParsedResume(**json.loads(response.text))
+            parsed_data = self._merge_parse(response_text, fields, plan)
             
             #----------------Post-Processing the Parsed_Data to generate Project Title------------
-            for project in parsed_data.projects:
-                if not project.title and project.responsibilities:
-                    generated_title = self._synthesize_title(project.responsibilities)
-                    project.title = generated_title
+            untitled = [project for project in parsed_data.projects if not project.title and project.responsibilities]
+            if untitled:
+                titles = self._synthesize_titles([project.responsibilities for project in untitled], use_cache=use_cache)
+                for project, title in zip(untitled, titles):
+                    project.title = title
             
-            return parsed_data.dict()
+            return self._with_preparse(parsed_data, plan)
         
         #Handle Error-Logic
+        except Exception as e:
+            return self._parse_error(e)
+
+    async def parse_text_async(self, raw_text: str, use_cache: bool = True) -> dict:
+        '''
+            Async twin of `parse_text`.
+        '''
+        try:
+            prompt, fields, plan = self._plan_parse(raw_text)
+            response_text = await generate_text_async(self, prompt, use_cache=use_cache,
+                                                      validate=lambda text: self._merge_parse(text, fields, plan)) if prompt else None
+            parsed_data = self._merge_parse(response_text, fields, plan)
+
+            untitled = [project for project in parsed_data.projects if not project.title and project.responsibilities]
+            if untitled:
+                titles = await self._synthesize_titles_async([project.responsibilities for project in untitled], use_cache=use_cache)
+                for project, title in zip(untitled, titles):
+                    project.title = title
+
+            return self._with_preparse(parsed_data, plan)
+
+        except Exception as e:
+            return self._parse_error(e)
+
+    def parse(self, filename: str, source: FileSource, use_cache: bool = True)->dict:
+        '''
+            `source` is the path of the spooled upload (preferred) or the raw file bytes.
+        '''
+        try:
+            raw_text, extraction = self.extract_text(filename, source)
         except ValueError as ve:
             return {"ValueError": str(ve)}
-        
-        except json.JSONDecodeError:
-            return {"Error": "Failed to Decode JSON from the models's response"}
-        
-        except ValidationError as e:
-            return {"Error": "Model response failed validation", 
-                    "details":e.errors()}
-            
         except Exception as e:
             return {"Error": f"Unexpected error occured: {str(e)}"}
+
+        #Check if raw_text is empty
+        if not raw_text:
+            return {"Error":"Failed to extract raw text from the resume"}
+
+        parsed_data = self.parse_text(raw_text, use_cache=use_cache)
+        if is_parse_error(parsed_data):
+            return parsed_data
+        return {**parsed_data, "extraction": extraction}
+
+    async def parse_async(self, filename: str, source: FileSource, use_cache: bool = True)->dict:
+        '''
+            Async twin of `parse`: extraction runs on the extraction pool and the model calls are awaited.
+        '''
+        try:
+            raw_text, extraction = await run_extraction(self.extract_text, filename, source)
+        except ValueError as ve:
+            return {"ValueError": str(ve)}
+        except Exception as e:
+            return {"Error": f"Unexpected error occured: {str(e)}"}
+
+        if not raw_text:
+            return {"Error":"Failed to extract raw text from the resume"}
+
+        parsed_data = await self.parse_text_async(raw_text, use_cache=use_cache)
+        if is_parse_error(parsed_data):
+            return parsed_data
+        return {**parsed_data, "extraction": extraction}
         
    
-    def _build_prompt(self, raw_resume_text: str) -> str:
+    def parse_text_fast(self, raw_text: str) -> dict:
+        '''
+            Offline triage: the fields the pre-parser resolves by rules (contact details, summary, skills) as a
+            partial ParsedResume, without any model call. `unresolved_fields` lists what a full parse would add.
+        '''
+        preparsed = preparse_resume(raw_text)
+        return {**ParsedResume(**preparsed["fields"]).dict(), "parse_mode": "fast",
+                "sections": preparsed["sections"],
+                "unresolved_fields": [field for field in RESUME_FIELDS if field not in preparsed["fields"]]}
+
+    def parse_fast(self, filename: str, source: FileSource) -> dict:
+        '''
+            `parse_text_fast` on an uploaded file (extraction included, so scanned files still pay for OCR).
+        '''
+        try:
+            raw_text, extraction = self.extract_text(filename, source)
+        except ValueError as ve:
+            return {"ValueError": str(ve)}
+        except Exception as e:
+            return {"Error": f"Unexpected error occured: {str(e)}"}
+
+        if not raw_text:
+            return {"Error":"Failed to extract raw text from the resume"}
+        return {**self.parse_text_fast(raw_text), "extraction": extraction}
+
+    def _build_prompt(self, raw_resume_text: str, fields: Optional[List[str]] = None) -> str:
+        '''
+            The extraction prompt. `fields` restricts the schema to the fields the model still has to return,
+            when the pre-parser resolved the others and `raw_resume_text` only holds the remaining sections.
+        '''
+        schema = ",\n            ".join(RESUME_FIELD_SCHEMAS[field] for field in (fields or RESUME_FIELDS))
+        partial = ("\n        - Only some sections of the resume are given; return exactly the keys of the schema above."
+                   if fields else "")
         return f"""
         You are an expert AI resume parser. Your goal is to extract information into a structured JSON that strictly adheres to the schema below.
 
         ### JSON Schema & Rules ###
         {{
-            "name": "string",
-            "email": "string",
-            "phone": "string",
-            "summary": "string",
-            "work_experience": [{{...}}],
-            "projects": [
-                {{
-                    "title": "string (This can be null if no explicit title is found)",
-                    "start_date": "string",
-                    "end_date": "string",
-                    "responsibilities": ["string"]
-                }}
-            ],
-            "education": [
-                {{
-                    "degree": "string",
-                    "institution": "string (The name of the university, college or school)",
-                    "year_of_completion": "string",
-                    "grade": "string (e.g., '8.5 CGPA', '92%', 'First Class with Distinction')"
-                }} 
-                ],
-            "skills": ["string"]
+            {schema}
         }}
 
         ### Key Instructions ###
         - 'work_experience' is for professional jobs at a company.
-        - 'projects' are for academic or personal work.
+        - 'projects' are for academic or personal work.{self._extraction_title_instruction()}{partial}
 
         ### Resume to Parse ###
         **Resume Text:**
@@ -176,7 +360,55 @@ class ResumeParserAgent:
         **JSON Output:**
         """
     
-    def _synthesize_title(self, responsibilities: List[str]) -> str:
+    def _extraction_title_instruction(self) -> str:
+        if not self.titles_in_extraction:
+            return ""
+        return "\n        - If a project has no explicit title, set 'title' to a concise, descriptive title (3-7 words) written from its responsibilities."
+
+    def _titles_from_response(self, response_text: str, count: int) -> List[Optional[str]]:
+        '''
+            Validates the batched title response and maps it back by index (None where a title is missing).
+        '''
+        titles: List[Optional[str]] = [None] * count
+        for item in ProjectTitles(**json.loads(response_text)).titles:
+            title = item.title.strip().replace('"', '')
+            if 0 <= item.index < count and title:
+                titles[item.index] = title
+        return titles
+
+    def _synthesize_titles(self, projects_responsibilities: List[List[str]], use_cache: bool = True) -> List[str]:
+        '''
+            Titles every untitled project with ONE model call; a project the response leaves out
+            (or a response that fails validation) falls back to its own `_synthesize_title` call.
+        '''
+        prompt = self._build_titles_prompt(self._projects_json(projects_responsibilities))
+        validate = lambda text: self._titles_from_response(text, len(projects_responsibilities))
+        try:
+            titles = validate(generate_text(self, prompt, use_cache=use_cache, validate=validate))
+        except (json.JSONDecodeError, ValidationError) as e:
+            record_agent_failure(self, e)
+            titles = [None] * len(projects_responsibilities)
+        return [title or self._synthesize_title(responsibilities, use_cache=use_cache)
+                for title, responsibilities in zip(titles, projects_responsibilities)]
+
+    async def _synthesize_titles_async(self, projects_responsibilities: List[List[str]], use_cache: bool = True) -> List[str]:
+        prompt = self._build_titles_prompt(self._projects_json(projects_responsibilities))
+        validate = lambda text: self._titles_from_response(text, len(projects_responsibilities))
+        try:
+            titles = validate(await generate_text_async(self, prompt, use_cache=use_cache, validate=validate))
+        except (json.JSONDecodeError, ValidationError) as e:
+            record_agent_failure(self, e)
+            titles = [None] * len(projects_responsibilities)
+        fallbacks = await asyncio.gather(*(self._synthesize_title_async(responsibilities, use_cache=use_cache)
+                                           for title, responsibilities in zip(titles, projects_responsibilities) if not title))
+        fallbacks = iter(fallbacks)
+        return [title or next(fallbacks) for title in titles]
+
+    def _projects_json(self, projects_responsibilities: List[List[str]]) -> str:
+        return json.dumps([{"index": index, "responsibilities": responsibilities}
+                           for index, responsibilities in enumerate(projects_responsibilities)], indent=2)
+
+    def _synthesize_title(self, responsibilities: List[str], use_cache: bool = True) -> str:
         ''' 
             Agent-2: Takes a list of responsibilities and generates a concise project title.
         '''
@@ -184,7 +416,48 @@ class ResumeParserAgent:
             return "Untitled Project"
         
         responsibilities_text = "-" + "\n-".join(responsibilities)
-        prompt = f"""
+        prompt = self._build_title_prompt(responsibilities_text)
+        title_text = generate_text(self, prompt, use_cache=use_cache)
+        return title_text.strip().replace('"', '')
+
+    async def _synthesize_title_async(self, responsibilities: List[str], use_cache: bool = True) -> str:
+        if not responsibilities:
+            return "Untitled Project"
+
+        responsibilities_text = "-" + "\n-".join(responsibilities)
+        prompt = self._build_title_prompt(responsibilities_text)
+        title_text = await generate_text_async(self, prompt, use_cache=use_cache)
+        return title_text.strip().replace('"', '')
+
+    def _build_titles_prompt(self, projects_json: str) -> str:
+        return f"""
+            You are an expert title generator. For EACH project below, create ONE concise, descriptive project title (3-7 words) from its responsibilities.
+
+            ### JSON Schema for Your Output ###
+            {{
+                "titles": [
+                    {{
+                        "index": "integer (The index of the project, copied from the input)",
+                        "title": "string (The title only, without quotes)"
+                    }}
+                ]
+            }}
+
+            --- EXAMPLE ---
+            Projects:
+            [{{"index": 0, "responsibilities": ["Developed an autonomous video analysis system using a multimodal LLM.", "Designed a web interface for video upload and structured analysis."]}}]
+            Output:
+            {{"titles": [{{"index": 0, "title": "Autonomous Video Analysis System"}}]}}
+            --- END EXAMPLE ---
+
+            **Projects:**
+            {projects_json}
+
+            **JSON Output:**
+            """
+
+    def _build_title_prompt(self, responsibilities_text: str) -> str:
+        return f"""
             You are an expert title generator. Your task is to create ONE concise, descriptive project title (3-7 words) from the responsibilities provided.
 
             **CRITICAL INSTRUCTIONS:**
@@ -206,6 +479,4 @@ class ResumeParserAgent:
             {responsibilities_text}
 
             **Project Title:**
-            """
-        title_response = self.model.generate_content(prompt)
-        return title_response.text.strip().replace('"', '')
\ No newline at end of file
+            """
\ No newline at end of file
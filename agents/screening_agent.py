@@ -1,24 +1,67 @@
+import hashlib
 import json
-import google.generativeai as genai
 from google.generativeai.types import GenerationConfig
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
+from typing import Dict, List, Optional, Tuple, Type
 
-from core.config import GOOGLE_API_KEY
+from core.config import (GEMINI_MODEL, SCREENING_PROMPT_TOKEN_BUDGET, SCREEN_PACK_TOKEN_BUDGET,
+                         SCREEN_PACK_MAX_SIZE)
 from agents.resume_parser import ParsedResume, ParsedJD, ScreeningResult
+from agents.llm_client import generate_text, generate_text_async
+from agents.providers import ModelProvider, get_provider
+from utils.metrics import SCREENING_PACK_CANDIDATES, record_agent_failure
+from utils.prompt_compaction import compact_json, estimate_tokens, trim_resume_for_jd
+
+
+def content_version(model_cls: Type[BaseModel], data: dict) -> str:
+    '''
+        Fingerprint of the fields of a stored resume/JD that the screening prompt sees; anything else on the document
+        (ids, hashes, extraction timings) does not change it.
+    '''
+    return hashlib.sha256(compact_json(model_cls(**data).model_dump()).encode("utf-8")).hexdigest()[:16]
 
 
 class ScreeningAgent:
-    def __init__(self):
-        if not GOOGLE_API_KEY:
-            raise ValueError("API Key not found.!!")
-        genai.configure(api_key=GOOGLE_API_KEY)
+    def __init__(self, model_name: str = GEMINI_MODEL, prompt_token_budget: int = SCREENING_PROMPT_TOKEN_BUDGET,
+                 pack_token_budget: int = SCREEN_PACK_TOKEN_BUDGET, pack_max_size: int = SCREEN_PACK_MAX_SIZE,
+                 provider: ModelProvider = None):
+        self.provider = provider or get_provider()
+        self.provider.check_credentials()
         
+        self.model_name = model_name
+        self.prompt_token_budget = prompt_token_budget
+        self.pack_token_budget = pack_token_budget
+        self.pack_max_size = pack_max_size
         self.generation_config = GenerationConfig(response_mime_type="application/json")
-        self.model = genai.GenerativeModel(model_name="gemini-1.5-flash", generation_config=self.generation_config)
+        self.model = self.provider.create_model(model_name, self.generation_config)
+        self.screening_version = self._compute_screening_version()
+
+    def _compute_screening_version(self) -> str:
+        '''
+            Fingerprints everything that shapes a screening besides its inputs: the model, the prompt, the token budget
+            and the output schema. Changing any of them makes every stored screening stale.
+        '''
+        fingerprint = "\n".join([
+            self.model_name,
+            self._build_prompt({}, {}),
+            self._build_packed_prompt([], {}),
+            str(self.prompt_token_budget),
+            json.dumps(ScreeningResult.model_json_schema(), sort_keys=True),
+        ])
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+    def screening_versions(self, resume_data: dict, jd_data: dict) -> Dict[str, str]:
+        '''
+            The versions a stored screening of this pair must carry to be reused.
+        '''
+        return {"resume_version": content_version(ParsedResume, resume_data),
+                "jd_version": content_version(ParsedJD, jd_data),
+                "screening_version": self.screening_version}
         
     def _build_prompt(self, resume_json: dict, jd_json: dict) ->str:
         ''' 
             This function builds a prompt for Gemini to compare a Resume & JD.
+            Both are serialized as compact JSON (no empty fields, no indentation).
         '''
         return f"""
         You are an expert AI Technical Recruiter. Your task is to analyze the following candidate resume and job description (JD), both provided in JSON format. Provide a detailed analysis of the candidate's suitability for the role.
@@ -35,37 +78,202 @@ class ScreeningAgent:
         - Base your analysis strictly on the information provided in the JSON data.
         - The match score should reflect how well the candidate's skills, experience, and education align with the JD's requirements.
         - Strengths and gaps should be specific and reference details from both the resume and the JD.
+        - Empty fields are omitted, and the least relevant responsibilities of a long resume may have been left out.
 
         ---
         ### Candidate Resume Data ###
-        {json.dumps(resume_json, indent=2)}
+        {compact_json(resume_json)}
         ---
         ### Job Description Data ###
-        {json.dumps(jd_json, indent=2)}
+        {compact_json(jd_json)}
         ---
 
         ### Your Analysis (JSON Output): ###
         """
     
-    def screen(self, resume_data: dict, jd_data: dict)-> dict:
+    def _build_packed_prompt(self, candidates: List[Tuple[str, dict]], jd_json: dict) -> str:
+        '''
+            One prompt for many candidates: the instructions and the JD appear once, followed by one compact
+            resume per line, prefixed by a short candidate_id the model echoes back in its results.
+        '''
+        resumes = "\n        ".join(f"{candidate_id}: {compact_json(resume_json)}" for candidate_id, resume_json in candidates)
+        return f"""
+        You are an expert AI Technical Recruiter. Your task is to analyze each of the following candidate resumes against the job description (JD), all provided in JSON format. Provide a detailed analysis of every candidate's suitability for the role.
+
+        ### JSON Schema for Your Output ###
+        {{
+            "results": [
+                {{
+                    "candidate_id": "string (The candidate_id exactly as given before the resume)",
+                    "match_score": "integer (A score from 0 to 100)",
+                    "summary": "string (A 2-3 sentence summary of the candidate's fit)",
+                    "strengths": ["string (A list of reasons why the candidate is a good fit)"],
+                    "gaps": ["string (A list of areas where the candidate is lacking or does not meet requirements)"]
+                }}
+            ]
+        }}
+
+        ### Key Instructions ###
+        - Return exactly one result per candidate.
+        - Judge every candidate on their own against the JD; do not compare candidates with each other.
+        - Base your analysis strictly on the information provided in the JSON data.
+        - The match score should reflect how well the candidate's skills, experience, and education align with the JD's requirements.
+        - Strengths and gaps should be specific and reference details from both the resume and the JD.
+        - Empty fields are omitted, and the least relevant responsibilities of a long resume may have been left out.
+
+        ---
+        ### Job Description Data ###
+        {compact_json(jd_json)}
+        ---
+        ### Candidate Resumes (one per line: candidate_id: resume JSON) ###
+        {resumes}
+        ---
+
+        ### Your Analysis (JSON Output): ###
+        """
+
+    def _compact_resume(self, resume_data: dict, jd_json: dict) -> Tuple[dict, int]:
+        '''
+            The resume as the prompt sees it, trimmed to what a single-candidate prompt within `prompt_token_budget`
+            (0 disables trimming) would hold, so a resume is judged on the same content alone or in a pack.
+        '''
+        resume_json = ParsedResume(**resume_data).dict()
+        if not self.prompt_token_budget:
+            return resume_json, 0
+        resume_budget = self.prompt_token_budget - estimate_tokens(self._build_prompt({}, jd_json))
+        return trim_resume_for_jd(resume_json, jd_json, max(resume_budget, 0))
+
+    def _screening_prompt(self, resume_data: dict, jd_data: dict) -> Tuple[str, dict]:
+        '''
+            Builds the prompt within `prompt_token_budget` (0 disables trimming) and returns it with its token stats.
+        '''
+        jd_json = ParsedJD(**jd_data).dict()
+        resume_json, trimmed_items = self._compact_resume(resume_data, jd_json)
+
+        prompt = self._build_prompt(resume_json, jd_json)
+        return prompt, {"prompt_tokens": estimate_tokens(prompt), "prompt_trimmed_items": trimmed_items}
+
+    def pack_resumes(self, resumes: List[dict], jd_data: dict) -> List[List[dict]]:
+        '''
+            Groups resumes, in order, into packs whose packed prompt stays within `pack_token_budget` and
+            `pack_max_size`. A resume that does not validate, or does not fit with any other, gets a pack of its own.
+        '''
+        jd_json = ParsedJD(**jd_data).dict()
+        base_tokens = estimate_tokens(self._build_packed_prompt([], jd_json))
+        packs, pack, pack_tokens = [], [], base_tokens
+        for resume in resumes:
+            try:
+                #+ the candidate_id prefix and the line break
+                resume_tokens = estimate_tokens(compact_json(self._compact_resume(resume, jd_json)[0])) + 5
+            except ValidationError:
+                packs.append([resume])
+                continue
+            if pack and (len(pack) >= self.pack_max_size or pack_tokens + resume_tokens > self.pack_token_budget):
+                packs.append(pack)
+                pack, pack_tokens = [], base_tokens
+            pack.append(resume)
+            pack_tokens += resume_tokens
+        if pack:
+            packs.append(pack)
+        return packs
+
+    def _packed_screening_prompt(self, resumes: List[dict], jd_data: dict) -> Tuple[str, List[str], List[dict]]:
+        '''
+            Builds the packed prompt and returns it with the candidate_ids it uses and each candidate's token stats
+            (the prompt tokens are split evenly, since the whole point is that the shared prefix is paid once).
+        '''
+        jd_json = ParsedJD(**jd_data).dict()
+        candidate_ids = [f"c{i + 1}" for i in range(len(resumes))]
+        compacted = [self._compact_resume(resume, jd_json) for resume in resumes]
+        prompt = self._build_packed_prompt([(candidate_id, resume_json) for candidate_id, (resume_json, _) in zip(candidate_ids, compacted)], jd_json)
+        prompt_tokens = estimate_tokens(prompt)
+        stats = [{"prompt_tokens": round(prompt_tokens / len(resumes)), "prompt_trimmed_items": trimmed_items,
+                  "pack_size": len(resumes)} for _, trimmed_items in compacted]
+        return prompt, candidate_ids, stats
+
+    def _validate_packed_results(self, response_text: str, candidate_ids: List[str], stats: List[dict]) -> List[Optional[dict]]:
+        '''
+            Maps the packed response back onto the candidates; a missing or invalid result is None.
+        '''
+        parsed_json = json.loads(response_text)
+        items = parsed_json.get("results", []) if isinstance(parsed_json, dict) else parsed_json
+        by_candidate = {}
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, dict) and item.get("candidate_id") in candidate_ids:
+                by_candidate.setdefault(item.pop("candidate_id"), item)
+
+        results = []
+        for candidate_id, candidate_stats in zip(candidate_ids, stats):
+            try:
+                results.append({**ScreeningResult(**by_candidate[candidate_id]).model_dump(), **candidate_stats})
+            except (KeyError, ValidationError, TypeError):
+                results.append(None)
+        return results
+
+    def _validate_result(self, response_text: str, prompt_stats: dict) -> dict:
+        parsed_json = json.loads(response_text)
+        validated_result = ScreeningResult(**parsed_json)
+        return {**validated_result.model_dump(), **prompt_stats}
+
+    def screen(self, resume_data: dict, jd_data: dict, use_cache: bool = True)-> dict:
         try:
-            validated_resume = ParsedResume(**resume_data)
-            validated_jd = ParsedJD(**jd_data)
-            
-            prompt = self._build_prompt(validated_resume.dict(), validated_jd.dict())
-            response = self.model.generate_content(prompt)
-            
-            parsed_json = json.loads(response.text)
-            validated_result = ScreeningResult(**parsed_json)
-            return validated_result.model_dump() 
+            prompt, prompt_stats = self._screening_prompt(resume_data, jd_data)
+            response_text = generate_text(self, prompt, use_cache=use_cache,
+                                          validate=lambda text: self._validate_result(text, prompt_stats))
+            return self._validate_result(response_text, prompt_stats)
           
         except ValidationError as e:
+            record_agent_failure(self, e)
             return {"error": f"Input Data validation failed. Details: {e}"}
         except Exception as e:
+            record_agent_failure(self, e)
             return {"error": f"An unexpected error occurred: {str(e)}"}
-             
-            
-            
-            
-    
-    
\ No newline at end of file
+
+    async def screen_async(self, resume_data: dict, jd_data: dict, use_cache: bool = True)-> dict:
+        '''
+            Async twin of `screen`: awaits the model instead of blocking the event loop.
+        '''
+        try:
+            prompt, prompt_stats = self._screening_prompt(resume_data, jd_data)
+            response_text = await generate_text_async(self, prompt, use_cache=use_cache,
+                                                      validate=lambda text: self._validate_result(text, prompt_stats))
+            return self._validate_result(response_text, prompt_stats)
+
+        except ValidationError as e:
+            record_agent_failure(self, e)
+            return {"error": f"Input Data validation failed. Details: {e}"}
+        except Exception as e:
+            record_agent_failure(self, e)
+            return {"error": f"An unexpected error occurred: {str(e)}"}
+
+    async def screen_packed_async(self, resumes: List[dict], jd_data: dict, use_cache: bool = True) -> List[dict]:
+        '''
+            Screens a pack of resumes (see `pack_resumes`) with one model call and returns their results in order.
+            A candidate whose result is missing or invalid is screened again on its own, one at a time, so a pack
+            never has more than one call in flight.
+            Only a response with a valid result for every candidate is cached; the valid results of an incomplete
+            one are still used.
+        '''
+        if len(resumes) == 1:
+            return [await self.screen_async(resumes[0], jd_data, use_cache)]
+
+        results = [None] * len(resumes)
+        try:
+            prompt, candidate_ids, stats = self._packed_screening_prompt(resumes, jd_data)
+
+            def validate_pack(response_text: str):
+                nonlocal results
+                results = self._validate_packed_results(response_text, candidate_ids, stats)
+                if None in results:
+                    raise ValueError(f"Packed response is missing {results.count(None)} of {len(results)} results")
+
+            await generate_text_async(self, prompt, use_cache=use_cache, validate=validate_pack)
+        except Exception as e:
+            record_agent_failure(self, e)
+
+        fallbacks = [index for index, result in enumerate(results) if result is None]
+        SCREENING_PACK_CANDIDATES.labels("packed").inc(len(resumes) - len(fallbacks))
+        SCREENING_PACK_CANDIDATES.labels("fallback").inc(len(fallbacks))
+        for index in fallbacks:
+            results[index] = await self.screen_async(resumes[index], jd_data, use_cache)
+        return results
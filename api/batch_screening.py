@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from agents.screening_agent import ScreeningAgent
+from core.config import SCREEN_BATCH_FLUSH_SIZE
+from db.database import bulk_write_documents_async, find_documents_async, update_document_async
+from db.operations import UpdateOne
+from utils.llm_scheduler import llm_priority
+
+#A stored LLM report describes the previous result, so it is dropped whenever the pair is screened again
+REPORT_FIELDS = ("report", "report_model", "report_generated_at")
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+#=====================Versioned Screening Storage=====================
+#There is one versioned screening per (resume_id, jd_id) pair. It is upserted in place and reused as long as its
+#resume, JD and screening versions match the current ones (screenings stored before versioning are left alone).
+def _pair_filter(resume_id: str, jd_id: str) -> dict:
+    return {"resume_id": resume_id, "jd_id": jd_id, "screening_version": {"$exists": True}}
+
+
+async def save_screenings(jd_id: str, rows: List[Tuple[str, Dict[str, str], dict]], batch_id: str = None) -> Dict[str, str]:
+    '''
+        Upserts (resume_id, versions, result) rows with one bulk_write and returns resume_id -> screening_id.
+    '''
+    if not rows:
+        return {}
+    now = _utcnow()
+    operations = []
+    for resume_id, versions, result in rows:
+        fields = {**result, **versions, "resume_id": resume_id, "jd_id": jd_id, "screened_at": now}
+        if batch_id:
+            fields["batch_id"] = batch_id
+        operations.append(UpdateOne(_pair_filter(resume_id, jd_id),
+                                    {"$set": fields, "$unset": {field: "" for field in REPORT_FIELDS}}, upsert = True))
+    try:
+        await bulk_write_documents_async("screenings", operations)
+    except BulkWriteError as e:
+        #A concurrent run (a rescreen, a second /screen) inserted the same pair between this upsert's match and its
+        #insert. The partial unique index rejects the insert and, as the filter has an $exists, the server does not
+        #retry it as an update. The pair exists now, so the rejected writes are applied to it as plain updates.
+        write_errors = e.details.get("writeErrors", [])
+        if not write_errors or any(error.get("code") != 11000 for error in write_errors):
+            raise
+        await bulk_write_documents_async("screenings", [UpdateOne(operations[error["index"]].filter, operations[error["index"]].update)
+                                                        for error in write_errors])
+
+    resume_ids = [resume_id for resume_id, _, _ in rows]
+    stored = await find_documents_async("screenings", {"jd_id": jd_id, "resume_id": {"$in": resume_ids},
+                                                       "screening_version": {"$exists": True}}, {"resume_id": 1})
+    return {doc["resume_id"]: doc["_id"] for doc in stored}
+
+
+async def find_fresh_screenings(jd_id: str, versions_by_resume: Dict[str, Dict[str, str]], projection: dict = None) -> Dict[str, dict]:
+    '''
+        Stored screenings against `jd_id` whose versions all match the given ones, with one query; resume_id -> screening.
+    '''
+    if not versions_by_resume:
+        return {}
+    any_versions = next(iter(versions_by_resume.values()))
+    projection = {**(projection or {}), "resume_id": 1, "resume_version": 1} if projection is not None else None
+    stored = await find_documents_async("screenings", {"jd_id": jd_id, "resume_id": {"$in": list(versions_by_resume)},
+                                                       "jd_version": any_versions["jd_version"],
+                                                       "screening_version": any_versions["screening_version"]}, projection)
+    return {doc["resume_id"]: doc for doc in stored
+            if doc.get("resume_version") == versions_by_resume[doc["resume_id"]]["resume_version"]}
+
+
+async def split_fresh(agent: ScreeningAgent, resumes: List[dict], jd_data: dict) -> Tuple[Dict[str, str], List[dict]]:
+    '''
+        Splits resumes into those with an up-to-date screening against the JD (resume_id -> screening_id) and the
+        stale or never-screened rest. Resumes that do not validate are left in the rest so screening reports their error.
+    '''
+    versions_by_resume = {}
+    for resume in resumes:
+        try:
+            versions_by_resume[resume["_id"]] = agent.screening_versions(resume, jd_data)
+        except ValidationError:
+            pass
+    fresh = await find_fresh_screenings(jd_data["_id"], versions_by_resume, {"_id": 1})
+    return ({resume_id: doc["_id"] for resume_id, doc in fresh.items()},
+            [resume for resume in resumes if resume["_id"] not in fresh])
+
+
+#=====================Batch Screening=====================
+async def _flush(batch_id: str, jd_id: str, results: List[tuple], errors: List[dict]):
+    '''
+        Upserts a chunk of screening results with one bulk_write and records the progress on the batch document.
+    '''
+    screening_ids = list((await save_screenings(jd_id, results, batch_id)).values()) if results else []
+    await update_document_async("screening_batches", batch_id, {
+        "$inc": {"completed": len(screening_ids), "failed": len(errors)},
+        "$push": {"screening_ids": {"$each": screening_ids},
+                  "errors": {"$each": errors}},
+        "$set": {"updated_at": _utcnow()},
+    })
+
+
+async def run_screening_batch(batch_id: str, resumes: List[dict], jd_data: dict, agent: ScreeningAgent, concurrency: int,
+                              use_cache: bool = True, packed: bool = False):
+    '''
+        Screens every resume against one JD with at most `concurrency` LLM calls in flight.
+        With `packed`, resumes are screened several per call (see ScreeningAgent.pack_resumes).
+        A failing candidate is recorded in the batch's error list and never aborts the batch.
+    '''
+    jd_id = jd_data["_id"]
+    semaphore = asyncio.Semaphore(concurrency)
+    packs = agent.pack_resumes(resumes, jd_data) if packed else [[resume] for resume in resumes]
+
+    async def screen_pack(pack: List[dict]):
+        async with semaphore:
+            try:
+                with llm_priority("batch"):
+                    pack_results = await agent.screen_packed_async(pack, jd_data, use_cache)
+            except Exception as e:
+                pack_results = [{"error": f"An unexpected error occurred: {str(e)}"}] * len(pack)
+        return zip(pack, pack_results)
+
+    results, errors, tasks = [], [], []
+    try:
+        tasks = [asyncio.ensure_future(screen_pack(pack)) for pack in packs]
+        for finished in asyncio.as_completed(tasks):
+            for resume, result in await finished:
+                if "error" in result:
+                    errors.append({"resume_id": resume["_id"], "error": result["error"]})
+                else:
+                    results.append((resume["_id"], agent.screening_versions(resume, jd_data), result))
+
+            if len(results) + len(errors) >= SCREEN_BATCH_FLUSH_SIZE:
+                await _flush(batch_id, jd_id, results, errors)
+                results, errors = [], []
+
+        await _flush(batch_id, jd_id, results, errors)
+        await update_document_async("screening_batches", batch_id,
+                                    {"$set": {"status": "completed", "finished_at": _utcnow()}})
+    except Exception as e:
+        for task in tasks:
+            task.cancel()
+        await update_document_async("screening_batches", batch_id,
+                                    {"$set": {"status": "failed", "finished_at": _utcnow(),
+                                              "detail": f"Batch aborted unexpectedly: {str(e)}"}})
@@ -0,0 +1,243 @@
+import asyncio
+import os
+import time
+import zipfile
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+from fastapi import HTTPException, UploadFile
+from pymongo.errors import BulkWriteError
+
+from agents.resume_parser import ResumeParserAgent, is_parse_error
+from api.uploads import SpooledUpload, spool_upload, unpack_zip
+from core.config import (RESUME_MAX_BYTES, INGEST_SPOOL_DIR, BULK_UPLOAD_MAX_BYTES, BULK_MAX_FILES, BULK_EXTRACTION_PROCESSES,
+                         BULK_PARSE_CONCURRENCY, BULK_PERSIST_BATCH_SIZE, BULK_PERSIST_FLUSH_SECONDS)
+from db.database import add_documents_async, find_documents_async, update_document_async
+from utils.file_handler import run_extraction_in_process
+from utils.llm_scheduler import llm_priority
+from utils.metrics import observe_extraction
+
+RESUME_EXTENSIONS = (".pdf", ".docx", ".png", ".jpg", ".jpeg")
+ZIP_CONTENT_TYPES = ("application/zip", "application/x-zip-compressed")
+BULK_STAGES = ("extract", "parse", "persist")
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _discard(item: dict):
+    try:
+        os.remove(item["path"])
+    except FileNotFoundError:
+        pass
+
+
+def _is_zip(upload: UploadFile) -> bool:
+    return (upload.filename or "").lower().endswith(".zip") or upload.content_type in ZIP_CONTENT_TYPES
+
+
+#=====================Preparing an Upload=====================
+async def _spool_files(files: List[UploadFile], new_hasher: Callable) -> Tuple[List[Tuple[str, SpooledUpload]], List[dict]]:
+    '''
+        Spools every uploaded resume and every resume inside the uploaded ZIP archives to INGEST_SPOOL_DIR.
+    '''
+    spooled, rejected = [], []
+    try:
+        for upload in files:
+            filename = upload.filename or "unnamed"
+            if _is_zip(upload):
+                archive = await spool_upload(upload, BULK_UPLOAD_MAX_BYTES, directory = INGEST_SPOOL_DIR)
+                try:
+                    entries, skipped = await asyncio.to_thread(unpack_zip, archive.path, RESUME_MAX_BYTES, new_hasher,
+                                                               RESUME_EXTENSIONS, BULK_MAX_FILES - len(spooled), INGEST_SPOOL_DIR)
+                except zipfile.BadZipFile:
+                    entries, skipped = [], [{"filename": filename, "error": "Not a valid ZIP archive"}]
+                finally:
+                    archive.cleanup()
+                spooled.extend((f"{filename}/{name}", entry) for name, entry in entries)
+                rejected.extend({**skip, "filename": f"{filename}/{skip['filename']}"} if skip["filename"] != filename else skip
+                                for skip in skipped)
+            elif filename.lower().endswith(RESUME_EXTENSIONS):
+                if len(spooled) >= BULK_MAX_FILES:
+                    raise HTTPException(status_code = 413, detail = f"At most {BULK_MAX_FILES} resumes per upload")
+                spooled.append((filename, await spool_upload(upload, RESUME_MAX_BYTES, new_hasher(), directory = INGEST_SPOOL_DIR)))
+            else:
+                rejected.append({"filename": filename, "error": "Unsupported File-Type"})
+    except BaseException:
+        for _, entry in spooled:
+            entry.cleanup()
+        raise
+    return spooled, rejected
+
+
+async def prepare_bulk_upload(files: List[UploadFile], parser: ResumeParserAgent) -> Tuple[List[dict], List[dict]]:
+    '''
+        Spools the upload and works out what actually needs parsing.
+        Returns the pipeline items ({"filenames", "path", "content_hash"}, one per distinct file) and the manifest entries
+        that are already settled: rejected files, and files this parser version has already stored (no LLM call).
+    '''
+    os.makedirs(INGEST_SPOOL_DIR, exist_ok = True)
+    spooled, manifest = await _spool_files(files, parser.new_content_hasher)
+
+    #The same file twice in one upload is parsed once
+    items: Dict[str, dict] = {}
+    for filename, entry in spooled:
+        if entry.digest in items:
+            items[entry.digest]["filenames"].append(filename)
+            entry.cleanup()
+        else:
+            items[entry.digest] = {"filenames": [filename], "path": entry.path, "content_hash": entry.digest}
+
+    existing = await find_documents_async("resumes", {"content_hash": {"$in": list(items)}}, {"content_hash": 1}) if items else []
+    for doc in existing:
+        item = items.pop(doc["content_hash"])
+        _discard(item)
+        manifest.extend({"filename": filename, "resume_id": doc["_id"], "cached": True} for filename in item["filenames"])
+    return list(items.values()), manifest
+
+
+#=====================The Pipeline=====================
+async def _run_stage(inbox: asyncio.Queue, outbox: asyncio.Queue, worker: Callable, concurrency: int,
+                     downstream_workers: int, busy_seconds: Dict[str, float], stage: str):
+    '''
+        Runs `concurrency` workers that await `worker(item)` for every item of `inbox` and pass the result on to `outbox`.
+        Each worker stops at a None; once all of them stopped, one None per downstream worker is sent on.
+        Items that failed upstream carry an "error" and are passed through untouched.
+    '''
+    async def run_worker():
+        while (item := await inbox.get()) is not None:
+            if "error" not in item:
+                start = time.perf_counter()
+                try:
+                    item = await worker(item)
+                except Exception as e:
+                    item = {**item, "error": f"An unexpected error occurred: {str(e)}"}
+                busy_seconds[stage] += time.perf_counter() - start
+            await outbox.put(item)
+
+    await asyncio.gather(*(run_worker() for _ in range(concurrency)))
+    for _ in range(downstream_workers):
+        await outbox.put(None)
+
+
+async def _extract(item: dict) -> dict:
+    filename = item["filenames"][0]
+    try:
+        raw_text, extraction = await run_extraction_in_process(filename, item["path"])
+    except ValueError as ve:
+        return {**item, "error": str(ve)}
+    finally:
+        _discard(item)
+    observe_extraction(filename, extraction)
+    if not raw_text:
+        return {**item, "error": "Failed to extract raw text from the resume"}
+    return {**item, "raw_text": raw_text, "extraction": extraction}
+
+
+async def _insert_resumes(items: List[dict]) -> Dict[str, str]:
+    '''
+        Stores the parsed resumes with one insert_many; returns content_hash -> resume_id.
+    '''
+    try:
+        resume_ids = await add_documents_async("resumes", [item["resume"] for item in items])
+        return {item["content_hash"]: resume_id for item, resume_id in zip(items, resume_ids)}
+    except BulkWriteError:
+        #Some of these files were stored by another request in the meantime; every other one was still inserted
+        stored = await find_documents_async("resumes", {"content_hash": {"$in": [item["content_hash"] for item in items]}},
+                                            {"content_hash": 1})
+        return {doc["content_hash"]: doc["_id"] for doc in stored}
+
+
+async def _flush(batch_id: str, items: List[dict], busy_seconds: Dict[str, float]):
+    '''
+        Persists the parsed resumes of a chunk and records every file of it in the batch manifest.
+    '''
+    start = time.perf_counter()
+    parsed = [item for item in items if "error" not in item]
+    resume_ids = await _insert_resumes(parsed) if parsed else {}
+    busy_seconds["persist"] += time.perf_counter() - start
+
+    manifest, completed, failed = [], 0, 0
+    for item in items:
+        resume_id = resume_ids.get(item["content_hash"])
+        error = item.get("error") or (None if resume_id else "The parsed resume could not be stored")
+        for filename in item["filenames"]:
+            if error:
+                manifest.append({"filename": filename, "error": error})
+                failed += 1
+            else:
+                manifest.append({"filename": filename, "resume_id": resume_id})
+                completed += 1
+    await update_document_async("ingest_batches", batch_id, {
+        "$inc": {"completed": completed, "failed": failed},
+        "$push": {"manifest": {"$each": manifest}},
+        "$set": {"updated_at": _utcnow(), "stage_seconds": {stage: round(seconds, 4) for stage, seconds in busy_seconds.items()}},
+    })
+
+
+async def _persist(batch_id: str, inbox: asyncio.Queue, busy_seconds: Dict[str, float]):
+    '''
+        Collects finished items into chunks of BULK_PERSIST_BATCH_SIZE (or whatever arrived within BULK_PERSIST_FLUSH_SECONDS).
+    '''
+    finished = False
+    while not finished:
+        item = await inbox.get()
+        if item is None:
+            break
+        chunk = [item]
+        deadline = time.monotonic() + BULK_PERSIST_FLUSH_SECONDS
+        while len(chunk) < BULK_PERSIST_BATCH_SIZE:
+            try:
+                item = await asyncio.wait_for(inbox.get(), max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                finished = True
+                break
+            chunk.append(item)
+        await _flush(batch_id, chunk, busy_seconds)
+
+
+async def run_bulk_ingestion(batch_id: str, items: List[dict], parser: ResumeParserAgent, use_cache: bool = True):
+    '''
+        Streams the files through extract (process pool) -> parse (BULK_PARSE_CONCURRENCY LLM calls) -> persist (insert_many).
+        The stages are connected by bounded queues, so they all work at once and the batch moves at the pace of the
+        slowest stage; a failing file is recorded in the manifest and never aborts the batch.
+    '''
+    async def parse(item: dict) -> dict:
+        with llm_priority("bulk"):
+            structured_data = await parser.parse_text_async(item.pop("raw_text"), use_cache)
+        if is_parse_error(structured_data):
+            return {**item, "error": structured_data}
+        structured_data.update({"extraction": item.pop("extraction"),
+                                "content_hash": item["content_hash"],
+                                "parser_version": parser.parser_version})
+        return {**item, "resume": structured_data}
+
+    busy_seconds = {stage: 0.0 for stage in BULK_STAGES}
+    to_extract, to_parse, to_persist = asyncio.Queue(), asyncio.Queue(BULK_PARSE_CONCURRENCY * 2), asyncio.Queue(BULK_PERSIST_BATCH_SIZE * 2)
+    for item in items:
+        to_extract.put_nowait(item)
+    for _ in range(BULK_EXTRACTION_PROCESSES):
+        to_extract.put_nowait(None)
+
+    start = time.perf_counter()
+    tasks = [asyncio.ensure_future(_run_stage(to_extract, to_parse, _extract, BULK_EXTRACTION_PROCESSES,
+                                              BULK_PARSE_CONCURRENCY, busy_seconds, "extract")),
+             asyncio.ensure_future(_run_stage(to_parse, to_persist, parse, BULK_PARSE_CONCURRENCY, 1, busy_seconds, "parse")),
+             asyncio.ensure_future(_persist(batch_id, to_persist, busy_seconds))]
+    try:
+        await asyncio.gather(*tasks)
+        await update_document_async("ingest_batches", batch_id, {"$set": {
+            "status": "completed", "finished_at": _utcnow(), "seconds": round(time.perf_counter() - start, 4)}})
+    except Exception as e:
+        for task in tasks:
+            task.cancel()
+        await update_document_async("ingest_batches", batch_id,
+                                    {"$set": {"status": "failed", "finished_at": _utcnow(),
+                                              "detail": f"Batch aborted unexpectedly: {str(e)}"}})
+    finally:
+        #Files the pipeline never reached
+        for item in items:
+            _discard(item)
@@ -1,59 +1,253 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Body
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Literal, Optional
+
+from fastapi.responses import StreamingResponse, HTMLResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Body, BackgroundTasks, Request, Response, Header, Query
 from agents.resume_parser import ResumeParserAgent
 from agents.jd_analyzer import JDAnalyzerAgent
-from agents.screening_agent import ScreeningAgent
-from agents.reporting_agent import ReportingAgent
-from agents.resume_parser import ParsedJD, ParsedResume
-from pydantic import BaseModel
+from agents.screening_agent import ScreeningAgent, content_version
+from agents.reporting_agent import ReportingAgent, is_report_error
+from agents.resume_parser import ParsedJD, ParsedResume, SkillsRequired, is_parse_error
+from agents.registry import AgentRegistry
+from agents.llm_client import llm_cache, llm_scheduler
+from pydantic import BaseModel, Field, ValidationError
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
 
-from db.database import get_document , add_document
+from api.batch_screening import run_screening_batch, save_screenings, find_fresh_screenings, split_fresh
+from api.uploads import spool_upload
+from api.ingestion_jobs import IngestionQueue, public_job_view, FINISHED_STATUSES
+from api.bulk_ingestion import prepare_bulk_upload, run_bulk_ingestion
+from utils.file_handler import run_extraction
+from utils.prescreen import score_candidates, shortlist
+from utils.skill_index import skill_index, parse_query, to_mongo_filter
+from utils.vector_index import vectorize_jd
+from utils.report_renderer import render_markdown, render_html, render_bulk
+from utils.pagination import encode_cursor, after_cursor_descending
+from core.config import (SCREEN_BATCH_CONCURRENCY, SCREEN_BATCH_MAX_CONCURRENCY, SCREEN_BATCH_PACKED, VECTOR_DIM, RESUME_MAX_BYTES, JD_FILE_MAX_BYTES,
+                         INGEST_SPOOL_DIR, JOB_EVENTS_POLL_SECONDS, REPORT_USE_LLM)
+from db.database import (get_document_async, add_document_async, get_documents_async, find_document_async, find_documents_async, update_document_async,
+                         rebuild_skill_index, vector_index, sync_vector_index)
 
 router = APIRouter(
     prefix = "/v1",
     tags = ["Resume Analyzer"],
 )
 
-#Depenedency Injections to create a single Agent Instance per each request
-def get_parser_agent():
-    return ResumeParserAgent()
-def get_jd_analyzer_agent():
-    return JDAnalyzerAgent()
-def get_screening_agent():
-    return ScreeningAgent()
-def get_reporting_agent():
-    return ReportingAgent()
+#Depenedency Injections to hand out the long-lived Agent Instances built at startup
+def get_agent_registry(request: Request) -> AgentRegistry:
+    return request.app.state.agents
+def get_parser_agent(request: Request) -> ResumeParserAgent:
+    return request.app.state.agents.parser
+def get_jd_analyzer_agent(request: Request) -> JDAnalyzerAgent:
+    return request.app.state.agents.jd_analyzer
+def get_screening_agent(request: Request) -> ScreeningAgent:
+    return request.app.state.agents.screening
+def get_reporting_agent(request: Request) -> ReportingAgent:
+    return request.app.state.agents.reporting
+def get_ingestion_queue(request: Request) -> IngestionQueue:
+    return request.app.state.ingestion
+
+#Send `X-Bypass-Cache: true` to force a fresh model call (the fresh response still refreshes the cache)
+def get_use_llm_cache(x_bypass_cache: bool = Header(False)) -> bool:
+    return not x_bypass_cache
+
+#Formats one server-sent event
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+#Resume file-types accepted by the upload endpoints
+RESUME_CONTENT_TYPES = ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "image/png", "image/jpeg"]
 
 #-----------------EndPoints-----------------------
 
 #--------------Endpoint for Resume Upload-------------------
-@router.post("/resumes", status_code=201)
-async def parse_resume_endpoint(resume_file: UploadFile = File(..., description="Upload your Resume file(PDF,DOCX,PNG,JPG)."),
-                                agent: ResumeParserAgent = Depends(get_parser_agent)):
-    
-    #Set a file-size limit(<=10MB)
-    if resume_file.size > 10*1024*1024:
-        raise HTTPException(status_code=413, detail = "File size should be <=10MB")
+@router.post("/resumes", status_code=202)
+async def parse_resume_endpoint(response: Response,
+                                resume_file: UploadFile = File(..., description="Upload your Resume file(PDF,DOCX,PNG,JPG)."),
+                                agent: ResumeParserAgent = Depends(get_parser_agent),
+                                ingestion: IngestionQueue = Depends(get_ingestion_queue),
+                                use_cache: bool = Depends(get_use_llm_cache)):
+    '''
+        Queues a resume for extraction, parsing and storage and returns `202` with a job_id right away.
+        Poll GET /v1/jobs/{job_id} (or stream GET /v1/jobs/{job_id}/events) for the resume_id.
+    '''
     
     #Check for allowed file-types 
-    allowed_types = ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "image/png", "image/jpeg"]
-    if resume_file.content_type not in allowed_types:
+    if resume_file.content_type not in RESUME_CONTENT_TYPES:
         raise HTTPException(status_code=415, detail = "Unsupported File-Type")
     
+    #Stream the upload (<=10MB) to the ingestion spool, hashing it on the way
+    os.makedirs(INGEST_SPOOL_DIR, exist_ok=True)
+    spooled = await spool_upload(resume_file, RESUME_MAX_BYTES, agent.new_content_hasher(), directory=INGEST_SPOOL_DIR)
+    content_hash = spooled.digest
+
+    #Skip extraction and the LLM entirely if this exact file was already parsed by the current parser version
+    existing = await find_document_async("resumes", {"content_hash": content_hash}, {"_id": 1})
+    if existing:
+        spooled.cleanup()
+        response.status_code = 200
+        return {"message": "Resume already parsed",
+                "resume_id": existing["_id"],
+                "cached": True}
+
+    #The same file is already being ingested
+    pending_job = await find_document_async("jobs", {"content_hash": content_hash, "status": {"$in": ["queued", "running"]}}, {"_id": 1})
+    if pending_job:
+        spooled.cleanup()
+        job_id = pending_job["_id"]
+    else:
+        job_id = await ingestion.submit(resume_file.filename, spooled.path, content_hash, use_cache)
+
+    return {"message": "Resume queued for parsing",
+            "job_id": job_id,
+            "status_url": f"/v1/jobs/{job_id}",
+            "events_url": f"/v1/jobs/{job_id}/events"}
+
+
+#--------------Endpoint for Resume Triage (no LLM)-------------------
+@router.post("/resumes/triage", status_code=200)
+async def triage_resume_endpoint(resume_file: UploadFile = File(..., description="Upload your Resume file(PDF,DOCX,PNG,JPG)."),
+                                 agent: ResumeParserAgent = Depends(get_parser_agent)):
+    '''
+        Fast intake triage: extracts the resume and returns the fields the rule-based pre-parser resolves
+        (contact details, summary, skills) as a partial ParsedResume, without any model call. Nothing is stored;
+        POST /v1/resumes runs the full parse.
+    '''
+    if resume_file.content_type not in RESUME_CONTENT_TYPES:
+        raise HTTPException(status_code=415, detail = "Unsupported File-Type")
+
+    spooled = await spool_upload(resume_file, RESUME_MAX_BYTES)
     try:
-        file_content = await resume_file.read()
-        structured_data = agent.parse(resume_file.filename, file_content)
-        
-        if "error" in structured_data:
-            raise HTTPException(status_code=500, detail = structured_data)
-        
-        resume_id = add_document("resumes", structured_data)
-        return {"message": "Resume parsed and saved successfully",
-                "resume_id": resume_id}
-    
-    except Exception as e:
-        raise HTTPException(status_code= 500, detail = f"An unexpected error occurred during parsing: {str(e)}")
-    except HTTPException as he:
-        raise he
+        result = await run_extraction(agent.parse_fast, resume_file.filename, spooled.path)
+    finally:
+        spooled.cleanup()
+
+    if is_parse_error(result):
+        raise HTTPException(status_code=422, detail=result)
+    return result
+
+
+#--------------Endpoint for Bulk Resume Upload-------------------
+@router.post("/resumes/bulk", status_code=202)
+async def bulk_upload_resumes(response: Response, background_tasks: BackgroundTasks,
+                              files: List[UploadFile] = File(..., description="Resume files (PDF,DOCX,PNG,JPG) and/or ZIP archives of them."),
+                              wait: bool = Query(False, description="Respond with the finished manifest instead of a batch_id to poll."),
+                              agent: ResumeParserAgent = Depends(get_parser_agent),
+                              use_cache: bool = Depends(get_use_llm_cache)):
+    '''
+        Ingests many resumes at once. Every file is streamed through extract -> parse -> persist stages that run concurrently;
+        the batch manifest maps each filename to its resume_id or to an error.
+        Returns `202` with a batch_id (poll GET /v1/resumes/bulk/{batch_id}), or the finished batch with `wait=true`.
+    '''
+    items, manifest = await prepare_bulk_upload(files, agent)
+    total = sum(len(item["filenames"]) for item in items) + len(manifest)
+    now = datetime.now(timezone.utc)
+    batch_id = await add_document_async("ingest_batches", {
+        "status": "running",
+        "total": total,
+        "completed": sum(1 for entry in manifest if "resume_id" in entry),
+        "failed": sum(1 for entry in manifest if "error" in entry),
+        "manifest": manifest,
+        "created_at": now,
+        "updated_at": now,
+    })
+
+    if wait:
+        await run_bulk_ingestion(batch_id, items, agent, use_cache)
+        response.status_code = 200
+        return await get_bulk_upload(batch_id)
+
+    background_tasks.add_task(run_bulk_ingestion, batch_id, items, agent, use_cache)
+    return {"batch_id": batch_id, "total": total, "queued": len(items),
+            "status_url": f"/v1/resumes/bulk/{batch_id}"}
+
+@router.get("/resumes/bulk/{batch_id}", status_code=200)
+async def get_bulk_upload(batch_id: str):
+    batch = await get_document_async("ingest_batches", batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail=f"Bulk upload with id '{batch_id}' not found.")
+    return batch
+
+
+#-----------------End-Points for Ingestion Jobs----------------------
+@router.get("/jobs/metrics", status_code=200)
+async def get_ingestion_metrics(ingestion: IngestionQueue = Depends(get_ingestion_queue)):
+    '''
+        Queue depth, in-flight jobs and per-stage latency of resume ingestion.
+    '''
+    return await ingestion.metrics()
+
+@router.get("/jobs/{job_id}", status_code=200)
+async def get_job(job_id: str):
+    job = await get_document_async("jobs", job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with id '{job_id}' not found.")
+    return public_job_view(job)
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    '''
+        Server-sent events with the job's status, sent whenever it changes, until the job finishes.
+    '''
+    if not await get_document_async("jobs", job_id, {"_id": 1}):
+        raise HTTPException(status_code=404, detail=f"Job with id '{job_id}' not found.")
+
+    async def events():
+        last_view = None
+        while True:
+            job = await get_document_async("jobs", job_id)
+            view = public_job_view(job)
+            view.pop("updated_at", None)
+            view.pop("lease_expires_at", None)
+            if view != last_view:
+                yield _sse("status", view)
+                last_view = view
+            if job["status"] in FINISHED_STATUSES:
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+#-----------------End-Points for Boolean Skill Search over Resumes----------------------
+@router.get("/resumes/search", status_code=200)
+async def search_resumes_by_skills(q: str, limit: int = 100, source: str = "memory"):
+    '''
+        Finds resumes with a boolean skill query, e.g. `Python AND (PyTorch OR TensorFlow) NOT PHP`.
+        `source=memory` answers from the in-process bitmaps (resumes inserted by other processes show up within
+        SKILL_INDEX_REFRESH_SECONDS); `source=mongo` uses the multikey index.
+    '''
+    start = time.perf_counter()
+    try:
+        if source == "memory":
+            resume_ids = skill_index.query(q, limit=limit)
+        elif source == "mongo":
+            collection_filter = to_mongo_filter(parse_query(q))
+            resume_ids = [doc["_id"] for doc in await find_documents_async("resumes", collection_filter, {"_id": 1}, limit)]
+        else:
+            raise HTTPException(status_code=422, detail="`source` must be 'memory' or 'mongo'.")
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+
+    return {"query": q,
+            "count": len(resume_ids),
+            "resume_ids": resume_ids,
+            "took_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+@router.post("/resumes/skill-index/rebuild", status_code=200)
+async def rebuild_resume_skill_index():
+    '''
+        Re-normalizes every stored resume's skills and rebuilds the in-memory skill index.
+    '''
+    indexed = await run_in_threadpool(rebuild_skill_index, True)
+    return {"indexed_resumes": indexed, **skill_index.stats()}
 
 
 #-----------------End-Point for JD Upload-------------------------------
@@ -62,31 +256,36 @@ class JDText(BaseModel):
     
 @router.post("/jds/upload-file", status_code=201)
 async def parse_jd_file_endpoint(jd_file: UploadFile = File(..., description="A text file(.txt) containing the job description"), 
-                                 agent: JDAnalyzerAgent = Depends(get_jd_analyzer_agent)):
+                                 agent: JDAnalyzerAgent = Depends(get_jd_analyzer_agent),
+                                 use_cache: bool = Depends(get_use_llm_cache)):
     '''
         Accepts Job Decription text file, parses it, and returns structured criteria.
     '''  
     
-    #Set a file-size limit(<=2MB)
-    if jd_file.size > 2*1024*1024:
-        raise HTTPException(status_code=413, detail = "File size should be <=2MB")
-    
     if not jd_file.filename.lower().endswith(".txt") or jd_file.content_type != "text/plain":
         raise HTTPException(status_code=412, detail = "Unsupported file type. Please upload a .txt file")
     
+    #Stream the upload to a temp file (<=2MB)
+    spooled = await spool_upload(jd_file, JD_FILE_MAX_BYTES)
+    try:
+        with open(spooled.path, encoding="utf-8") as jd_text_file:
+            jd_text = jd_text_file.read()
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=412, detail = "The uploaded file is not valid UTF-8 text.")
+    finally:
+        spooled.cleanup()
+
     try:
-        jd_text_bytes = await jd_file.read()
-        jd_text = jd_text_bytes.decode("utf-8")
         
         if not jd_text.strip():
             raise HTTPException(status_code=412, detail = "The uploaded file is empty.")
         
-        structured_data = agent.parse_jd(jd_text)
+        structured_data = await agent.parse_jd_async(jd_text, use_cache=use_cache)
         
         if "error" in structured_data:
             raise HTTPException(status_code=412, details = structured_data)
         
-        jd_id = add_document("jds", structured_data)
+        jd_id = await add_document_async("jds", structured_data)
         return {"message": "JD from file parsed and saved successfully.",
                 "jd_id": jd_id}
     
@@ -95,18 +294,19 @@ async def parse_jd_file_endpoint(jd_file: UploadFile = File(..., description="A
 
 @router.post("/jds/paste-text", status_code = 201)
 async def parse_jd_text_endpoint(jd_text: str = Body(..., media_type="text/plain", description="Paste the Job Description text"),
-                                 agent: JDAnalyzerAgent = Depends(get_jd_analyzer_agent)):
+                                 agent: JDAnalyzerAgent = Depends(get_jd_analyzer_agent),
+                                 use_cache: bool = Depends(get_use_llm_cache)):
     
     if not jd_text.strip():
         raise HTTPException(status_code=413, detail="JD Text cannot be empty")
     
     try:
-        structured_data = agent.parse_jd(jd_text)
+        structured_data = await agent.parse_jd_async(jd_text, use_cache=use_cache)
         
         if "error" in structured_data:
             raise HTTPException(status_code=413, detail = structured_data)
         
-        jd_id = add_document("jds", structured_data)
+        jd_id = await add_document_async("jds", structured_data)
         return {"message": "JD from text parsed and saved successfully.",
                 "jd_id": jd_id}
     except Exception as e:
@@ -120,45 +320,499 @@ class ScreeningRequestByIds(BaseModel):
     jd_id: str
 
 @router.post("/screen", status_code=201)
-async def screen_by_ids(request: ScreeningRequestByIds, agent: ScreeningAgent = Depends(get_screening_agent)):
-    resume_data = get_document("resumes", request.resume_id)
-    jd_data = get_document("jds", request.jd_id)
+async def screen_by_ids(request: ScreeningRequestByIds, response: Response, agent: ScreeningAgent = Depends(get_screening_agent),
+                        use_cache: bool = Depends(get_use_llm_cache)):
+    '''
+        Screens one resume against one JD. A stored screening of the same resume/JD/prompt versions is returned as is
+        (200, `stored: true`); otherwise the pair is screened and its screening upserted in place (201).
+    '''
+    resume_data, jd_data = await asyncio.gather(get_document_async("resumes", request.resume_id),
+                                                get_document_async("jds", request.jd_id))
 
     if not resume_data:
         raise HTTPException(status_code=404, detail=f"Resume with id '{request.resume_id}' not found.")
     if not jd_data:
         raise HTTPException(status_code=404, detail=f"JD with id '{request.jd_id}' not found.")
 
-    result = agent.screen(resume_data, jd_data)
+    try:
+        versions = agent.screening_versions(resume_data, jd_data)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Stored resume or JD does not validate: {e}")
+
+    if use_cache:
+        stored = (await find_fresh_screenings(request.jd_id, {request.resume_id: versions})).get(request.resume_id)
+        if stored:
+            response.status_code = 200
+            return {"screening_id": stored.pop("_id"), "result": stored, "stored": True}
+
+    result = await agent.screen_async(resume_data, jd_data, use_cache=use_cache)
     
     if "error" in result:
         raise HTTPException(status_code=500, detail=result)
         
-    result["resume_id"] = request.resume_id
-    result["jd_id"] = request.jd_id
-    screening_id = add_document("screenings", result)
+    screening_ids = await save_screenings(request.jd_id, [(request.resume_id, versions, result)])
+    result.update(versions, resume_id = request.resume_id, jd_id = request.jd_id)
     
-    return {"screening_id": screening_id, "result": result}
+    return {"screening_id": screening_ids[request.resume_id], "result": result, "stored": False}
+
+#-----------------------------End-Points for Semantic Candidate Retrieval-------------------------------
+@router.get("/jds/{jd_id}/candidates", status_code=200)
+async def get_closest_candidates(jd_id: str, k: int = Query(50, ge=1, le=1000)):
+    '''
+        Returns the K resumes closest to the JD in the local vector index, without any LLM call.
+    '''
+    jd_data = await get_document_async("jds", jd_id)
+    if not jd_data:
+        raise HTTPException(status_code=404, detail=f"JD with id '{jd_id}' not found.")
+
+    start = time.perf_counter()
+    matches = await run_in_threadpool(vector_index.search, vectorize_jd(jd_data, VECTOR_DIM), k)
+    took_ms = (time.perf_counter() - start) * 1000
+
+    #One batched lookup for the candidate details
+    details = {doc["_id"]: doc for doc in await get_documents_async("resumes", [resume_id for resume_id, _ in matches],
+                                                                     projection={"name": 1, "email": 1})}
+    return {"jd_id": jd_id,
+            "indexed_resumes": len(vector_index),
+            "took_ms": round(took_ms, 3),
+            "candidates": [{"resume_id": resume_id,
+                            "similarity": round(score, 4),
+                            "name": details.get(resume_id, {}).get("name"),
+                            "email": details.get(resume_id, {}).get("email")}
+                           for resume_id, score in matches]}
+
+@router.post("/resumes/vector-index/rebuild", status_code=200)
+async def rebuild_resume_vector_index():
+    '''
+        Re-vectorizes every stored resume into a fresh vector index.
+    '''
+    indexed = await run_in_threadpool(sync_vector_index, True)
+    return {"indexed_resumes": indexed}
+
+
+#-----------------------------End-Point for Deterministic Pre-Screening----------------------------------
+#Only the fields the pre-screening scorer reads are fetched from MongoDB
+PRESCREEN_PROJECTION = {"name": 1, "skills": 1, "work_experience.start_date": 1, "work_experience.end_date": 1}
+
+class PrefilterOptions(BaseModel):
+    top_k: Optional[int] = Field(None, ge=1, description="Keep only the K best pre-screened candidates.")
+    min_score: Optional[float] = Field(None, ge=0, le=100, description="Keep only candidates scoring at least this much.")
+
+class PrescreenRequest(PrefilterOptions):
+    resume_ids: Optional[List[str]] = Field(None, description="Resume IDs to score against the JD.")
+    all_resumes: bool = Field(False, description="Score every stored resume instead of `resume_ids`.")
+
+async def _load_resumes(resume_ids: Optional[List[str]], all_resumes: bool, projection: Optional[dict] = None):
+    '''
+        Fetches the requested resumes with one query and returns them along with the IDs that were not found.
+    '''
+    if all_resumes:
+        return await get_documents_async("resumes", projection=projection), []
+    requested_ids = list(dict.fromkeys(resume_ids))
+    resumes = await get_documents_async("resumes", requested_ids, projection=projection)
+    found_ids = {resume["_id"] for resume in resumes}
+    return resumes, [resume_id for resume_id in requested_ids if resume_id not in found_ids]
+
+@router.post("/jds/{jd_id}/prescreen", status_code=200)
+async def prescreen_candidates(jd_id: str, request: PrescreenRequest):
+    '''
+        Scores resumes against a JD locally (skill coverage + experience fit) without any LLM call.
+    '''
+    jd_data = await get_document_async("jds", jd_id)
+    if not jd_data:
+        raise HTTPException(status_code=404, detail=f"JD with id '{jd_id}' not found.")
+    if not request.all_resumes and not request.resume_ids:
+        raise HTTPException(status_code=422, detail="Provide `resume_ids` or set `all_resumes` to true.")
+
+    resumes, missing_ids = await _load_resumes(request.resume_ids, request.all_resumes, PRESCREEN_PROJECTION)
+    scored = await run_in_threadpool(score_candidates, resumes, jd_data)
+    return {"jd_id": jd_id,
+            "scored": len(scored),
+            "missing_resume_ids": missing_ids,
+            "candidates": shortlist(scored, request.top_k, request.min_score)}
+
+
+#-----------------------------End-Point for Batch Screening (one JD vs many Resumes)--------------------
+class BatchScreeningRequest(BaseModel):
+    resume_ids: Optional[List[str]] = Field(None, description="Resume IDs to screen against the JD.")
+    all_resumes: bool = Field(False, description="Screen every stored resume instead of `resume_ids`.")
+    concurrency: Optional[int] = Field(None, ge=1, le=SCREEN_BATCH_MAX_CONCURRENCY,
+                                       description="Maximum number of screenings in flight at once.")
+    prefilter: Optional[PrefilterOptions] = Field(None, description="Only send the best pre-screened candidates to the LLM.")
+    packed: bool = Field(SCREEN_BATCH_PACKED, description="Screen several resumes per LLM call, sharing the JD and instructions.")
+
+async def _start_screening_batch(jd_data: dict, resumes: List[dict], background_tasks: BackgroundTasks, agent: ScreeningAgent,
+                                 concurrency: int, use_cache: bool, missing_ids: List[str] = (), prescreened_out: List[str] = (),
+                                 reused: Optional[Dict[str, str]] = None, trigger: str = "request", packed: bool = SCREEN_BATCH_PACKED) -> str:
+    '''
+        Records a screening batch (reused screenings count as completed) and queues the remaining resumes in the background.
+    '''
+    reused = reused or {}
+    now = datetime.now(timezone.utc)
+    batch_id = await add_document_async("screening_batches", {
+        "jd_id": jd_data["_id"],
+        "status": "running",
+        "trigger": trigger,
+        "total": len(resumes) + len(reused) + len(missing_ids),
+        "completed": len(reused),
+        "failed": len(missing_ids),
+        "reused": len(reused),
+        "packed": packed,
+        "screening_ids": list(reused.values()),
+        "errors": [{"resume_id": resume_id, "error": "Resume not found."} for resume_id in missing_ids],
+        "prescreened_out": list(prescreened_out),
+        "created_at": now,
+        "updated_at": now,
+    })
+    background_tasks.add_task(run_screening_batch, batch_id, resumes, jd_data, agent, concurrency, use_cache, packed)
+    return batch_id
+
+@router.post("/jds/{jd_id}/screen-batch", status_code=202)
+async def screen_batch(jd_id: str, request: BatchScreeningRequest, background_tasks: BackgroundTasks,
+                       agent: ScreeningAgent = Depends(get_screening_agent),
+                       use_cache: bool = Depends(get_use_llm_cache)):
+    '''
+        Queues the screening of many resumes against one JD and returns a batch_id to poll for progress.
+        Pairs that already have an up-to-date screening are reused instead of being screened again.
+    '''
+    jd_data = await get_document_async("jds", jd_id)
+    if not jd_data:
+        raise HTTPException(status_code=404, detail=f"JD with id '{jd_id}' not found.")
+    if not request.all_resumes and not request.resume_ids:
+        raise HTTPException(status_code=422, detail="Provide `resume_ids` or set `all_resumes` to true.")
+
+    resumes, missing_ids = await _load_resumes(request.resume_ids, request.all_resumes)
+
+    prescreened_out = []
+    if request.prefilter:
+        shortlisted_ids = {candidate["resume_id"] for candidate in
+                           shortlist(await run_in_threadpool(score_candidates, resumes, jd_data), request.prefilter.top_k, request.prefilter.min_score)}
+        prescreened_out = [resume["_id"] for resume in resumes if resume["_id"] not in shortlisted_ids]
+        resumes = [resume for resume in resumes if resume["_id"] in shortlisted_ids]
+
+    reused = {}
+    if use_cache:
+        reused, resumes = await split_fresh(agent, resumes, jd_data)
+
+    concurrency = request.concurrency or SCREEN_BATCH_CONCURRENCY
+    batch_id = await _start_screening_batch(jd_data, resumes, background_tasks, agent, concurrency, use_cache,
+                                            missing_ids, prescreened_out, reused, packed = request.packed)
+
+    return {"batch_id": batch_id, "total": len(resumes) + len(reused) + len(missing_ids), "queued": len(resumes),
+            "reused": len(reused), "prescreened_out": len(prescreened_out)}
+
+@router.get("/screen-batches/{batch_id}", status_code=200)
+async def get_screening_batch(batch_id: str):
+    '''
+        Reports the progress, screening IDs and per-candidate errors of a batch screening.
+    '''
+    batch = await get_document_async("screening_batches", batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail=f"Screening batch with id '{batch_id}' not found.")
+    batch["pending"] = batch["total"] - batch["completed"] - batch["failed"]
+    return batch
+
+#-----------------------------End-Points for Incremental Re-Screening-------------------------------
+#A screening is stale once its resume, its JD or the screening prompt/model changed; only those pairs are screened again
+class JDUpdate(BaseModel):
+    job_title: Optional[str] = None
+    required_skills: Optional[List[SkillsRequired]] = None
+    preferred_skills: Optional[List[SkillsRequired]] = None
+    required_years_of_experience: Optional[int] = None
+    education_requirements: Optional[str] = None
+
+async def _rescreen(jd_data: dict, resumes: List[dict], background_tasks: BackgroundTasks, agent: ScreeningAgent,
+                    use_cache: bool) -> dict:
+    '''
+        Queues the stale (resume, JD) pairs among previously screened ones; with the cache bypassed every pair is redone.
+    '''
+    fresh, stale = await split_fresh(agent, resumes, jd_data) if use_cache else ({}, resumes)
+    batch_id = None
+    if stale:
+        batch_id = await _start_screening_batch(jd_data, stale, background_tasks, agent, SCREEN_BATCH_CONCURRENCY, use_cache,
+                                                trigger = "rescreen")
+    return {"jd_id": jd_data["_id"], "screened_pairs": len(resumes), "stale": len(stale), "calls_avoided": len(fresh),
+            "batch_id": batch_id}
+
+async def _rescreen_jd(jd_data: dict, background_tasks: BackgroundTasks, agent: ScreeningAgent, use_cache: bool) -> dict:
+    screened = await find_documents_async("screenings", {"jd_id": jd_data["_id"], "screening_version": {"$exists": True}},
+                                          {"resume_id": 1})
+    resumes = await get_documents_async("resumes", [screening["resume_id"] for screening in screened])
+    return await _rescreen(jd_data, resumes, background_tasks, agent, use_cache)
+
+@router.patch("/jds/{jd_id}", status_code=200)
+async def update_jd(jd_id: str, changes: JDUpdate, background_tasks: BackgroundTasks,
+                    rescreen: bool = Query(True, description="Queue the re-screening of the candidates this edit makes stale."),
+                    agent: ScreeningAgent = Depends(get_screening_agent),
+                    use_cache: bool = Depends(get_use_llm_cache)):
+    '''
+        Edits the structured criteria of a JD; only the fields that are sent change.
+        If the edit changes what the screening prompt sees, the candidates already screened against it are re-screened.
+    '''
+    jd_data = await get_document_async("jds", jd_id)
+    if not jd_data:
+        raise HTTPException(status_code=404, detail=f"JD with id '{jd_id}' not found.")
+    fields = changes.model_dump(exclude_unset = True)
+    if not fields:
+        raise HTTPException(status_code=422, detail="Provide at least one field to update.")
+    try:
+        fields = ParsedJD(**{**jd_data, **fields}).model_dump(include = set(fields))
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"The updated JD does not validate: {e}")
+
+    old_version = content_version(ParsedJD, jd_data)
+    jd_data.update(fields)
+    jd_version = content_version(ParsedJD, jd_data)
+    changed = jd_version != old_version
+    if changed:
+        await update_document_async("jds", jd_id, {"$set": {**fields, "updated_at": datetime.now(timezone.utc)}})
+
+    result = {"jd_id": jd_id, "changed": changed, "jd_version": jd_version, "rescreen": None}
+    if changed and rescreen:
+        result["rescreen"] = await _rescreen_jd(jd_data, background_tasks, agent, use_cache)
+    return result
+
+@router.post("/jds/{jd_id}/rescreen", status_code=202)
+async def rescreen_jd(jd_id: str, background_tasks: BackgroundTasks,
+                      agent: ScreeningAgent = Depends(get_screening_agent),
+                      use_cache: bool = Depends(get_use_llm_cache)):
+    '''
+        Re-screens the stale screenings against a JD (e.g. after a model or prompt change) and reports the calls avoided.
+    '''
+    jd_data = await get_document_async("jds", jd_id)
+    if not jd_data:
+        raise HTTPException(status_code=404, detail=f"JD with id '{jd_id}' not found.")
+    return await _rescreen_jd(jd_data, background_tasks, agent, use_cache)
+
+@router.post("/resumes/{resume_id}/rescreen", status_code=202)
+async def rescreen_resume(resume_id: str, background_tasks: BackgroundTasks,
+                          agent: ScreeningAgent = Depends(get_screening_agent),
+                          use_cache: bool = Depends(get_use_llm_cache)):
+    '''
+        Re-screens the stale screenings of a resume, with one background batch per JD it was screened against.
+    '''
+    resume_data = await get_document_async("resumes", resume_id)
+    if not resume_data:
+        raise HTTPException(status_code=404, detail=f"Resume with id '{resume_id}' not found.")
+    screened = await find_documents_async("screenings", {"resume_id": resume_id, "screening_version": {"$exists": True}},
+                                          {"jd_id": 1})
+    jds = await get_documents_async("jds", list({screening["jd_id"] for screening in screened}))
+    runs = [await _rescreen(jd_data, [resume_data], background_tasks, agent, use_cache) for jd_data in jds]
+    return {"resume_id": resume_id,
+            "screened_pairs": len(runs),
+            "stale": sum(run["stale"] for run in runs),
+            "calls_avoided": sum(run["calls_avoided"] for run in runs),
+            "batch_ids": [run["batch_id"] for run in runs if run["batch_id"]]}
+
+#-------------------------End-Point for the JD Leaderboard-----------------------------
+#Summary fields of a leaderboard row; strengths, gaps and reports stay in the database
+LEADERBOARD_PROJECTION = {"resume_id": 1, "match_score": 1, "summary": 1}
+
+@router.get("/jds/{jd_id}/leaderboard", status_code=200)
+async def get_jd_leaderboard(jd_id: str,
+                             limit: int = Query(20, ge=1, le=100),
+                             cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page."),
+                             include_candidates: bool = Query(False, description="Add each candidate's name and email.")):
+    '''
+        Screened candidates for a JD, best match first, one page at a time.
+        Served by the (jd_id, match_score desc, _id desc) index with keyset pagination, so a deep page costs as much as the first.
+    '''
+    try:
+        query = {"jd_id": jd_id, **after_cursor_descending("match_score", cursor)}
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    #One extra row tells whether another page follows
+    rows = await find_documents_async("screenings", query, LEADERBOARD_PROJECTION, limit + 1,
+                                      sort=[("match_score", -1), ("_id", -1)])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows and not cursor and not await get_document_async("jds", jd_id, {"_id": 1}):
+        raise HTTPException(status_code=404, detail=f"JD with id '{jd_id}' not found.")
+
+    if include_candidates and rows:
+        candidates = {resume["_id"]: resume for resume in
+                      await get_documents_async("resumes", list({row["resume_id"] for row in rows}), projection={"name": 1, "email": 1})}
+        for row in rows:
+            candidate = candidates.get(row["resume_id"], {})
+            row.update({"name": candidate.get("name"), "email": candidate.get("email")})
+
+    for row in rows:
+        row["screening_id"] = row.pop("_id")
+    return {"jd_id": jd_id,
+            "candidates": rows,
+            "next_cursor": encode_cursor(rows[-1]["match_score"], rows[-1]["screening_id"]) if has_more else None}
 
 #-------------------------End-Point For Report Generation Endpoint-----------------------------
+#Reports are rendered locally from the stored ScreeningResult; `use_llm=true` opts into the Gemini rewrite
+ReportFormat = Literal["markdown", "html"]
+
+async def _candidate_names(screenings: List[dict]) -> Dict[str, str]:
+    '''
+        resume_id -> candidate name for the given screenings, fetched with one query.
+    '''
+    resume_ids = list({screening["resume_id"] for screening in screenings if screening.get("resume_id")})
+    resumes = await get_documents_async("resumes", resume_ids, projection={"name": 1}) if resume_ids else []
+    return {resume["_id"]: resume["name"] for resume in resumes if resume.get("name")}
+
+#The finished LLM report is stored on the screening document, so later requests skip the LLM
+async def _save_report(screening_id: str, report_markdown: str, agent: ReportingAgent):
+    await update_document_async("screenings", screening_id, {"$set": {
+        "report": report_markdown,
+        "report_model": agent.model_name,
+        "report_generated_at": datetime.now(timezone.utc),
+    }})
+
 @router.get("/reports/{screening_id}", status_code = 200)
 async def get_screening_report(
     screening_id: str,
-    agent: ReportingAgent = Depends(get_reporting_agent)
+    format: ReportFormat = "markdown",
+    use_llm: bool = REPORT_USE_LLM,
+    agent: ReportingAgent = Depends(get_reporting_agent),
+    use_cache: bool = Depends(get_use_llm_cache)
 ):
     """ 
         Fetches a screening result by its ID and generates a Human-Readable report.
+        The template renderer answers without any LLM call; with `use_llm=true` Gemini rewrites the report,
+        and a report generated earlier is served from storage (send `X-Bypass-Cache: true` to regenerate it).
     """
-    screening_data = get_document("screenings", screening_id)
+    screening_data = await get_document_async("screenings", screening_id)
     
     if not screening_data:
         raise HTTPException(status_code = 404, detail = f"Screeing with id '{screening_id}' not found.")
+
+    if not use_llm:
+        candidate_name = (await _candidate_names([screening_data])).get(screening_data.get("resume_id"))
+        if format == "html":
+            return HTMLResponse(render_html(screening_data, candidate_name))
+        return {"screening_report": render_markdown(screening_data, candidate_name), "screening_id": screening_id,
+                "renderer": "template"}
+
+    if format == "html":
+        raise HTTPException(status_code = 422, detail = "HTML reports are rendered from the template; drop `use_llm`.")
+
+    if use_cache and screening_data.get("report"):
+        return {"screening_report": screening_data["report"], "screening_id": screening_id, "renderer": "llm", "stored": True}
     
-    report_markdown = agent.generate_prompt(screening_data)
+    report_markdown = await agent.generate_prompt_async(screening_data, use_cache=use_cache)
     
-    if "An error occurred" in report_markdown:
+    if is_report_error(report_markdown):
         raise HTTPException(status_code = 500, detail = report_markdown)
-    
-    return {"screening_report":report_markdown, "screening_id":screening_id}
 
+    await _save_report(screening_id, report_markdown, agent)
+    return {"screening_report":report_markdown, "screening_id":screening_id, "renderer": "llm", "stored": False}
+
+@router.get("/reports/{screening_id}/stream")
+async def stream_screening_report(
+    screening_id: str,
+    use_llm: bool = REPORT_USE_LLM,
+    agent: ReportingAgent = Depends(get_reporting_agent),
+    use_cache: bool = Depends(get_use_llm_cache)
+):
+    """
+        Server-sent events: `chunk` events carry the report markdown as it is produced,
+        followed by `done` (or `error`). Template and stored reports arrive as a single chunk.
+    """
+    screening_data = await get_document_async("screenings", screening_id)
+    if not screening_data:
+        raise HTTPException(status_code = 404, detail = f"Screeing with id '{screening_id}' not found.")
+
+    async def events():
+        if not use_llm:
+            candidate_name = (await _candidate_names([screening_data])).get(screening_data.get("resume_id"))
+            yield _sse("chunk", {"text": render_markdown(screening_data, candidate_name)})
+            yield _sse("done", {"screening_id": screening_id, "renderer": "template"})
+            return
+
+        if use_cache and screening_data.get("report"):
+            yield _sse("chunk", {"text": screening_data["report"]})
+            yield _sse("done", {"screening_id": screening_id, "renderer": "llm", "stored": True})
+            return
+
+        chunks = []
+        try:
+            async for chunk in agent.stream_report_async(screening_data, use_cache=use_cache):
+                chunks.append(chunk)
+                yield _sse("chunk", {"text": chunk})
+        except Exception as e:
+            yield _sse("error", {"detail": f"An error occurred during report generation: {str(e)}"})
+            return
+
+        await _save_report(screening_id, "".join(chunks).strip(), agent)
+        yield _sse("done", {"screening_id": screening_id, "renderer": "llm", "stored": False})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+class ReportExportRequest(BaseModel):
+    screening_ids: Optional[List[str]] = Field(None, description="Screenings to include.")
+    batch_id: Optional[str] = Field(None, description="Include every screening of a batch.")
+    jd_id: Optional[str] = Field(None, description="Include every screening against a JD.")
+    format: ReportFormat = "markdown"
 
+@router.post("/reports/export", status_code = 200)
+async def export_screening_reports(request: ReportExportRequest):
+    '''
+        Renders many screenings into one markdown or HTML document (ranked overview + every report), without any LLM call.
+    '''
+    if request.screening_ids:
+        screenings = await get_documents_async("screenings", request.screening_ids)
+        title = "Screening Reports"
+    elif request.batch_id:
+        screenings = await find_documents_async("screenings", {"batch_id": request.batch_id})
+        title = "Screening Reports for Batch " + request.batch_id
+    elif request.jd_id:
+        jd_data = await get_document_async("jds", request.jd_id)
+        if not jd_data:
+            raise HTTPException(status_code = 404, detail = f"JD with id '{request.jd_id}' not found.")
+        screenings = await find_documents_async("screenings", {"jd_id": request.jd_id})
+        title = "Screening Reports: " + (jd_data.get("job_title") or request.jd_id)
+    else:
+        raise HTTPException(status_code = 422, detail = "Provide `screening_ids`, `batch_id` or `jd_id`.")
+    if not screenings:
+        raise HTTPException(status_code = 404, detail = "No screenings found.")
+
+    document = render_bulk(screenings, request.format, await _candidate_names(screenings), title)
+    extension, media_type = ("html", "text/html") if request.format == "html" else ("md", "text/markdown")
+    return Response(content = document, media_type = media_type,
+                    headers = {"Content-Disposition": f'attachment; filename="screening_reports.{extension}"'})
+
+
+#-------------------------End-Points for Model Management-----------------------------
+class ModelSwapRequest(BaseModel):
+    model_name: str
+
+@router.get("/models", status_code=200)
+async def get_models(registry: AgentRegistry = Depends(get_agent_registry)):
+    '''
+        Returns the active model, the last fetched list of available models and the Agent build timings.
+    '''
+    return registry.status()
+
+@router.put("/models/active", status_code=200)
+async def swap_active_model(request: ModelSwapRequest, registry: AgentRegistry = Depends(get_agent_registry)):
+    '''
+        Swaps every Agent onto a different Gemini model without restarting the server.
+    '''
+    try:
+        registry.swap_model(request.model_name)
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    return registry.status()
+
+
+#-------------------------End-Point for LLM Response Cache Statistics-----------------------------
+@router.get("/cache/stats", status_code=200)
+async def get_llm_cache_stats():
+    '''
+        Hit, miss and eviction counters of the LLM response cache.
+    '''
+    return llm_cache.stats()
+
+
+#-------------------------End-Point for LLM Scheduler Statistics-----------------------------
+@router.get("/llm/scheduler", status_code=200)
+async def get_llm_scheduler_stats():
+    '''
+        Concurrency limit, waiting calls per priority, rate-limit budgets and retry counters of the LLM scheduler.
+    '''
+    return llm_scheduler.stats()
@@ -0,0 +1,267 @@
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Optional
+
+from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from agents.resume_parser import ResumeParserAgent, is_parse_error
+from core.config import INGEST_WORKERS, INGEST_MAX_ATTEMPTS, INGEST_LEASE_SECONDS
+from db.database import (add_document_async, find_document_async, find_documents_async, find_and_update_document_async,
+                         count_documents_async)
+from utils.file_handler import run_extraction
+from utils.llm_scheduler import llm_priority
+
+JOB_STAGES = ("extract", "parse", "persist")
+FINISHED_STATUSES = ("completed", "failed")
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _job(job_id: str, **conditions) -> dict:
+    return {"_id": ObjectId(job_id), **conditions}
+
+
+def _claimed(job: dict) -> dict:
+    '''
+        Matches the job only while the claim in `job` still holds: each claim bumps `attempts`, so once the job is
+        requeued and claimed elsewhere, the writes of the previous worker match nothing.
+    '''
+    return _job(job["_id"], status = "running", attempts = job["attempts"])
+
+
+def _lease_expiry():
+    return _utcnow() + timedelta(seconds = INGEST_LEASE_SECONDS)
+
+
+class LeaseLost(Exception):
+    '''
+        The job's lease expired and it was requeued, so another worker owns it now.
+    '''
+
+
+def public_job_view(job: dict) -> dict:
+    '''
+        The job document as returned to clients (the spool path is internal).
+    '''
+    return {key: value for key, value in job.items() if key != "path"}
+
+
+class IngestionQueue:
+    '''
+        Runs resume ingestion (extract -> parse -> persist) on a pool of asyncio workers, off the request path.
+        Job state lives in the MongoDB `jobs` collection; a job is claimed with a lease that a heartbeat keeps
+        renewing while a stage runs, and jobs whose lease expires (the process running them crashed) are put back
+        on the queue until INGEST_MAX_ATTEMPTS is reached.
+    '''
+    def __init__(self, get_parser: Callable[[], ResumeParserAgent], workers: int = INGEST_WORKERS):
+        self.get_parser = get_parser
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.in_flight = 0
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "retried": 0}
+        self.stage_latencies = {stage: deque(maxlen = 1000) for stage in JOB_STAGES}
+        self._tasks = []
+
+    async def start(self):
+        await self._requeue_abandoned()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reaper()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions = True)
+
+    async def submit(self, filename: str, path: str, content_hash: str, use_cache: bool) -> str:
+        now = _utcnow()
+        job_id = await add_document_async("jobs", {
+            "type": "resume_ingest",
+            "status": "queued",
+            "filename": filename,
+            "path": path,
+            "content_hash": content_hash,
+            "use_cache": use_cache,
+            "attempts": 0,
+            "max_attempts": INGEST_MAX_ATTEMPTS,
+            "stage": None,
+            "stages": {},
+            "created_at": now,
+            "updated_at": now,
+        })
+        self.counters["submitted"] += 1
+        await self.queue.put(job_id)
+        return job_id
+
+    async def _requeue_abandoned(self):
+        '''
+            Puts back jobs whose worker died: running jobs with an expired lease, and queued jobs nobody claimed.
+        '''
+        now = _utcnow()
+        stale = now - timedelta(seconds = INGEST_LEASE_SECONDS)
+        abandoned = await find_documents_async("jobs", {"$or": [
+            {"status": "running", "lease_expires_at": {"$lt": now}},
+            {"status": "queued", "updated_at": {"$lt": stale}},
+        ]}, {"_id": 1, "status": 1, "attempts": 1, "max_attempts": 1})
+
+        for job in abandoned:
+            if job["status"] == "running" and job["attempts"] >= job["max_attempts"]:
+                await self._finish(job, "failed", error = "Worker crashed on every attempt.")
+                continue
+            #The status guard makes sure only one process requeues a given job
+            requeued = await find_and_update_document_async("jobs",
+                                                            _job(job["_id"], status = job["status"], updated_at = {"$lt": now}),
+                                                            {"$set": {"status": "queued", "updated_at": _utcnow()}})
+            if requeued:
+                if job["status"] == "running":
+                    self.counters["retried"] += 1
+                await self.queue.put(job["_id"])
+
+    async def _reaper(self):
+        while True:
+            await asyncio.sleep(max(INGEST_LEASE_SECONDS / 4, 1))
+            try:
+                await self._requeue_abandoned()
+            except Exception as e:
+                print(f"Could not requeue abandoned ingestion jobs: {e}")
+
+    async def _worker(self):
+        while True:
+            job_id = await self.queue.get()
+            job = None
+            try:
+                job = await find_and_update_document_async("jobs", _job(job_id, status = "queued"), {
+                    "$set": {"status": "running", "updated_at": _utcnow(), "lease_expires_at": _lease_expiry()},
+                    "$inc": {"attempts": 1},
+                })
+                if job is None:
+                    continue   #Already claimed elsewhere or finished
+                self.in_flight += 1
+                try:
+                    #Queued uploads yield to interactive calls but go ahead of bulk ingestion
+                    with llm_priority("batch"):
+                        await self._run(job)
+                finally:
+                    self.in_flight -= 1
+            except asyncio.CancelledError:
+                raise
+            except LeaseLost:
+                print(f"Ingestion job {job_id} was requeued while running; leaving it to its new worker")
+            except Exception as e:
+                if job is None:
+                    #The claim itself failed; the job is still queued and the reaper puts it back
+                    print(f"Could not claim ingestion job {job_id}: {e}")
+                else:
+                    await self._retry_or_fail(job, f"Ingestion crashed: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    async def _retry_or_fail(self, job: dict, error: str):
+        if job["attempts"] < job["max_attempts"]:
+            requeued = await find_and_update_document_async("jobs", _claimed(job), {
+                "$set": {"status": "queued", "last_error": error, "updated_at": _utcnow()}})
+            if requeued:
+                self.counters["retried"] += 1
+                await self.queue.put(job["_id"])
+        else:
+            await self._finish(job, "failed", error = error)
+
+    async def _heartbeat(self, job: dict):
+        '''
+            Keeps pushing the lease forward while a stage runs, so a long extraction or parse is not mistaken for a
+            crashed worker. Stops once the claim is gone.
+        '''
+        while True:
+            await asyncio.sleep(max(INGEST_LEASE_SECONDS / 3, 0.1))
+            try:
+                renewed = await find_and_update_document_async("jobs", _claimed(job), {"$set": {
+                    "lease_expires_at": _lease_expiry(), "updated_at": _utcnow()}})
+            except Exception as e:
+                print(f"Could not renew the lease of ingestion job {job['_id']}: {e}")
+                continue
+            if renewed is None:
+                return
+
+    async def _stage(self, job: dict, stage: str, coroutine_fn, *args):
+        '''
+            Awaits one stage, recording its latency and renewing the job's lease until it is done.
+            Raises LeaseLost when the job is no longer claimed by this worker.
+        '''
+        claimed = await find_and_update_document_async("jobs", _claimed(job), {"$set": {
+            "stage": stage, "updated_at": _utcnow(), "lease_expires_at": _lease_expiry()}})
+        if claimed is None:
+            raise LeaseLost(job["_id"])
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        start = time.perf_counter()
+        try:
+            result = await coroutine_fn(*args)
+        finally:
+            heartbeat.cancel()
+        seconds = time.perf_counter() - start
+        self.stage_latencies[stage].append(seconds)
+        await find_and_update_document_async("jobs", _claimed(job), {"$set": {f"stages.{stage}.seconds": round(seconds, 4)}})
+        return result
+
+    async def _run(self, job: dict):
+        parser = self.get_parser()
+
+        try:
+            raw_text, extraction = await self._stage(job, "extract", run_extraction, parser.extract_text, job["filename"], job["path"])
+        except ValueError as ve:
+            return await self._finish(job, "failed", error = str(ve))
+        if not raw_text:
+            return await self._finish(job, "failed", error = "Failed to extract raw text from the resume")
+
+        structured_data = await self._stage(job, "parse", parser.parse_text_async, raw_text, job["use_cache"])
+        if is_parse_error(structured_data):
+            return await self._finish(job, "failed", error = structured_data)
+
+        structured_data.update({"extraction": extraction,
+                                "content_hash": job["content_hash"],
+                                "parser_version": parser.parser_version})
+        try:
+            resume_id = await self._stage(job, "persist", add_document_async, "resumes", structured_data)
+        except DuplicateKeyError:
+            #The same file was ingested by another job in the meantime
+            existing = await find_document_async("resumes", {"content_hash": job["content_hash"]}, {"_id": 1})
+            resume_id = existing["_id"]
+        await self._finish(job, "completed", resume_id = resume_id)
+
+    async def _finish(self, job: dict, status: str, resume_id: Optional[str] = None, error = None):
+        '''
+            Records the outcome of the claimed `job`; a no-op when the job was requeued and claimed again meanwhile.
+        '''
+        job = await find_and_update_document_async("jobs", _claimed(job), {"$set": {
+            "status": status, "resume_id": resume_id, "error": error, "stage": None,
+            "finished_at": _utcnow(), "updated_at": _utcnow()}})
+        if job is None:
+            return
+        self.counters[status] += 1
+        if job.get("path"):
+            try:
+                os.remove(job["path"])
+            except FileNotFoundError:
+                pass
+
+    async def metrics(self) -> dict:
+        def summary(samples):
+            if not samples:
+                return {"count": 0}
+            ordered = sorted(samples)
+            return {"count": len(ordered),
+                    "avg_ms": round(1000 * sum(ordered) / len(ordered), 2),
+                    "p50_ms": round(1000 * ordered[len(ordered) // 2], 2),
+                    "p95_ms": round(1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2)}
+
+        return {"local_queue_depth": self.queue.qsize(),
+                "in_flight": self.in_flight,
+                "workers": self.workers,
+                "queued_jobs": await count_documents_async("jobs", {"status": "queued"}),
+                "running_jobs": await count_documents_async("jobs", {"status": "running"}),
+                **self.counters,
+                "stage_latency": {stage: summary(list(samples)) for stage, samples in self.stage_latencies.items()}}
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import tempfile
+import zipfile
+from typing import Callable, Dict, List, Tuple
+
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+
+from core.config import UPLOAD_CHUNK_BYTES, UPLOAD_SPOOL_DIR
+
+#Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    '''
+        ASGI middleware that rejects oversized upload bodies while they are still arriving:
+        up front from Content-Length when the client sends it, otherwise as soon as the streamed body crosses the limit.
+    '''
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits   #path -> maximum file size in bytes
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" and scope["method"] in ("POST", "PUT") else None
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        max_body = limit + MULTIPART_OVERHEAD_BYTES
+        detail = f"File size should be <={limit // (1024 * 1024)}MB"
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_body:
+            return await JSONResponse({"detail": detail}, status_code = 413)(scope, receive, send)
+
+        received = 0
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body:
+                    #Raised while FastAPI parses the form, which passes HTTPExceptions through untouched
+                    raise HTTPException(status_code = 413, detail = detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class SpooledUpload:
+    '''
+        An upload copied to a named temporary file, with its size and content hash computed on the way.
+    '''
+    def __init__(self, path: str, size: int, digest: str):
+        self.path = path
+        self.size = size
+        self.digest = digest
+
+    def cleanup(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def spool_upload(upload: UploadFile, max_bytes: int, hasher = None, directory: str = UPLOAD_SPOOL_DIR) -> SpooledUpload:
+    '''
+        Streams an UploadFile in chunks into a temp file (never holding the whole file in memory),
+        aborting with 413 as soon as `max_bytes` is exceeded. `hasher` (a hashlib object, possibly pre-seeded)
+        is fed every chunk; the resulting hex digest is exposed as `SpooledUpload.digest`.
+    '''
+    hasher = hasher or hashlib.sha256()
+    suffix = os.path.splitext(upload.filename or "")[1]
+    size = 0
+    spool = tempfile.NamedTemporaryFile(suffix = suffix, dir = directory, delete = False)
+    try:
+        with spool:
+            while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code = 413, detail = f"File size should be <={max_bytes // (1024 * 1024)}MB")
+                hasher.update(chunk)
+                spool.write(chunk)
+    except BaseException:
+        os.remove(spool.name)
+        raise
+    return SpooledUpload(spool.name, size, hasher.hexdigest())
+
+
+def unpack_zip(zip_path: str, max_entry_bytes: int, new_hasher: Callable, extensions: Tuple[str, ...],
+               max_files: int, directory: str = UPLOAD_SPOOL_DIR) -> Tuple[List[Tuple[str, SpooledUpload]], List[dict]]:
+    '''
+        Streams every entry of a ZIP archive with one of `extensions` into its own temp file (blocking; run it off the event loop).
+        Returns the spooled entries as (name inside the archive, SpooledUpload) and the skipped ones as {"filename", "error"}.
+        Sizes are counted while decompressing, so an entry that lies about its size cannot blow past `max_entry_bytes`.
+    '''
+    spooled, rejected = [], []
+    try:
+        with zipfile.ZipFile(zip_path) as archive:
+            for info in archive.infolist():
+                name = info.filename
+                if info.is_dir() or name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+                    continue
+                if not name.lower().endswith(extensions):
+                    rejected.append({"filename": name, "error": "Unsupported File-Type"})
+                    continue
+                if len(spooled) >= max_files:
+                    raise HTTPException(status_code = 413, detail = f"At most {max_files} resumes per upload")
+
+                hasher = new_hasher()
+                size = 0
+                spool = tempfile.NamedTemporaryFile(suffix = os.path.splitext(name)[1], dir = directory, delete = False)
+                try:
+                    with spool, archive.open(info) as entry:
+                        while chunk := entry.read(UPLOAD_CHUNK_BYTES):
+                            size += len(chunk)
+                            if size > max_entry_bytes:
+                                break
+                            hasher.update(chunk)
+                            spool.write(chunk)
+                except BaseException:
+                    os.remove(spool.name)
+                    raise
+                if size > max_entry_bytes:
+                    os.remove(spool.name)
+                    rejected.append({"filename": name, "error": f"File size should be <={max_entry_bytes // (1024 * 1024)}MB"})
+                    continue
+                spooled.append((name, SpooledUpload(spool.name, size, hasher.hexdigest())))
+    except BaseException:
+        for _, upload in spooled:
+            upload.cleanup()
+        raise
+    return spooled, rejected
@@ -12,6 +12,99 @@ if GOOGLE_API_KEY:
     genai.configure(api_key=GOOGLE_API_KEY)
 
 
+#Configure the Gemini Models used by the Agents
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")      #"gemini" or "fake" (deterministic offline model for load tests and CI)
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+MODEL_REFRESH_INTERVAL_SECONDS = int(os.getenv("MODEL_REFRESH_INTERVAL_SECONDS", "3600"))  #How often the available model list is refreshed in the background
+
+
 #Configure the Database
-MONGODB_CONNECTION = "mongodb://localhost:27017/"
-DB_NAME = "Agentic_RAG"
\ No newline at end of file
+MONGODB_CONNECTION = os.getenv("MONGODB_CONNECTION", "mongodb://localhost:27017/")   #"memory://" runs on an in-process stand-in (needs mongomock)
+DB_NAME = os.getenv("DB_NAME", "Agentic_RAG")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))                 #Connections per client (the sync and async clients have one pool each)
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))                   #Connections kept open even when idle
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))        #Idle connections are closed after this long
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000"))   #How long an operation waits for a free pooled connection
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))   #Fail fast when MongoDB is unreachable
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "0"))           #0 = no timeout on a single operation
+
+#Configure Batch Screening
+SCREEN_BATCH_CONCURRENCY = int(os.getenv("SCREEN_BATCH_CONCURRENCY", "5"))         #Default number of in-flight LLM screenings per batch
+SCREEN_BATCH_MAX_CONCURRENCY = int(os.getenv("SCREEN_BATCH_MAX_CONCURRENCY", "20")) #Upper bound a client may request
+SCREEN_BATCH_FLUSH_SIZE = int(os.getenv("SCREEN_BATCH_FLUSH_SIZE", "25"))           #Results written per insert_many
+SCREEN_BATCH_PACKED = os.getenv("SCREEN_BATCH_PACKED", "false").lower() == "true"   #Default: screen several resumes per LLM call
+SCREEN_PACK_TOKEN_BUDGET = int(os.getenv("SCREEN_PACK_TOKEN_BUDGET", "24000"))     #Estimated tokens per packed screening prompt
+SCREEN_PACK_MAX_SIZE = int(os.getenv("SCREEN_PACK_MAX_SIZE", "20"))                #Resumes per packed prompt; bounds the response length too
+
+#Configure the LLM Response Cache
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))     #In-process LRU size
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))    #Applies to both the LRU and the MongoDB tier
+LLM_CACHE_PERSISTENT = os.getenv("LLM_CACHE_PERSISTENT", "true").lower() == "true"
+
+#Configure the fake model provider (LLM_PROVIDER=fake)
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))            #Mean fixed latency of a call
+FAKE_LLM_LATENCY_JITTER_MS = float(os.getenv("FAKE_LLM_LATENCY_JITTER_MS", "0"))   #Uniform +/- jitter around the mean
+FAKE_LLM_MS_PER_PROMPT_TOKEN = float(os.getenv("FAKE_LLM_MS_PER_PROMPT_TOKEN", "0"))   #Prefill time, so long prompts take longer
+FAKE_LLM_MS_PER_OUTPUT_TOKEN = float(os.getenv("FAKE_LLM_MS_PER_OUTPUT_TOKEN", "0"))   #Decoding time, so long answers take longer
+FAKE_LLM_CHARS_PER_TOKEN = float(os.getenv("FAKE_LLM_CHARS_PER_TOKEN", "4"))  #Token usage reported per character of prompt/response
+FAKE_LLM_THROTTLE_RATE = float(os.getenv("FAKE_LLM_THROTTLE_RATE", "0"))      #Share of calls failing with a 429
+FAKE_LLM_SERVER_ERROR_RATE = float(os.getenv("FAKE_LLM_SERVER_ERROR_RATE", "0"))   #Share of calls failing with a 503
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "7"))     #Seeds the latency jitter and the injected errors
+
+#Configure the LLM Scheduler (every Gemini call of the process goes through it)
+LLM_RPM = int(os.getenv("LLM_RPM", "1000"))                       #Requests per minute of the project's quota; 0 = unlimited
+LLM_TPM = int(os.getenv("LLM_TPM", "1000000"))                    #Tokens per minute (prompt + completion); 0 = unlimited
+LLM_INITIAL_CONCURRENCY = int(os.getenv("LLM_INITIAL_CONCURRENCY", "8"))   #Starting point of the adaptive concurrency limit
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "64"))
+LLM_LATENCY_TOLERANCE = float(os.getenv("LLM_LATENCY_TOLERANCE", "2.0"))  #Shrink the limit once latency exceeds this x the best seen
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))          #Retries of a throttled (429) or transient (5xx) call
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1.0"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "32.0"))
+
+#Configure Resume Parsing
+RESUME_TITLES_IN_EXTRACTION = os.getenv("RESUME_TITLES_IN_EXTRACTION", "false").lower() == "true"   #Let the extraction prompt title untitled projects itself
+RESUME_PREPARSE = os.getenv("RESUME_PREPARSE", "true").lower() == "true"   #Resolve contacts, summary and skills by rules and send only the other sections to the model
+
+#Configure Screening
+SCREENING_PROMPT_TOKEN_BUDGET = int(os.getenv("SCREENING_PROMPT_TOKEN_BUDGET", "3000"))   #Estimated tokens per screening prompt; 0 disables trimming
+
+#Configure Reports
+REPORT_USE_LLM = os.getenv("REPORT_USE_LLM", "false").lower() == "true"   #Default renderer: false = local template, true = Gemini rewrite
+
+#Configure the in-memory Skill Index (boolean skill search)
+SKILL_INDEX_REFRESH_SECONDS = float(os.getenv("SKILL_INDEX_REFRESH_SECONDS", "5"))   #How often resumes inserted by other processes are picked up
+
+#Configure the Semantic Retrieval Index (memory-mapped resume vectors)
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "data/vector_index")
+VECTOR_DIM = int(os.getenv("VECTOR_DIM", "1024"))      #Changing this requires deleting VECTOR_INDEX_DIR
+
+#Configure OCR for scanned PDF pages
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 2)))       #Process pool size for page OCR
+OCR_MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "20"))             #Pages with less extractable text are OCR-ed
+OCR_MIN_DPI = int(os.getenv("OCR_MIN_DPI", "150"))
+OCR_MAX_DPI = int(os.getenv("OCR_MAX_DPI", "300"))
+OCR_TARGET_LONG_SIDE_PX = int(os.getenv("OCR_TARGET_LONG_SIDE_PX", "3300"))  #Rendered size of the page's longest side
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "4"))              #Threads running text extraction off the event loop
+
+#Configure Uploads (streamed to spooled temp files)
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(10*1024*1024)))
+JD_FILE_MAX_BYTES = int(os.getenv("JD_FILE_MAX_BYTES", str(2*1024*1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024*1024)))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR")      #None uses the system temp directory
+
+#Configure the Asynchronous Resume Ingestion Jobs
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))                       #Concurrent extract -> parse -> persist jobs per process
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+INGEST_LEASE_SECONDS = int(os.getenv("INGEST_LEASE_SECONDS", "300"))         #A running job whose lease expires is retried (worker crash)
+INGEST_SPOOL_DIR = os.getenv("INGEST_SPOOL_DIR", "data/uploads")             #Uploads wait here until their job finishes
+JOB_EVENTS_POLL_SECONDS = float(os.getenv("JOB_EVENTS_POLL_SECONDS", "0.5"))
+
+#Configure Bulk Resume Ingestion (ZIP archives / many files in one request)
+BULK_UPLOAD_MAX_BYTES = int(os.getenv("BULK_UPLOAD_MAX_BYTES", str(512*1024*1024)))   #Whole request body
+BULK_MAX_FILES = int(os.getenv("BULK_MAX_FILES", "5000"))                           #Resumes per request (ZIP entries included)
+BULK_EXTRACTION_PROCESSES = int(os.getenv("BULK_EXTRACTION_PROCESSES", str(os.cpu_count() or 2)))   #Process pool for text extraction
+BULK_PARSE_CONCURRENCY = int(os.getenv("BULK_PARSE_CONCURRENCY", "16"))             #LLM parse calls in flight
+BULK_PERSIST_BATCH_SIZE = int(os.getenv("BULK_PERSIST_BATCH_SIZE", "50"))           #Resumes per insert_many
+BULK_PERSIST_FLUSH_SECONDS = float(os.getenv("BULK_PERSIST_FLUSH_SECONDS", "1.0"))  #A partial batch is written after this long
@@ -1,9 +1,34 @@
+import asyncio
 import pymongo
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 from pymongo.collection import Collection
+from pymongo.asynchronous.collection import AsyncCollection
 from bson.objectid import ObjectId
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-from core.config import MONGODB_CONNECTION, DB_NAME
+from core.config import (MONGODB_CONNECTION, DB_NAME, LLM_CACHE_TTL_SECONDS, VECTOR_INDEX_DIR, VECTOR_DIM, MONGO_MAX_POOL_SIZE,
+                         MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                         MONGO_CONNECT_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS)
+from db.in_memory import IN_MEMORY_SCHEME, InMemoryAsyncClient, InMemoryClient
+from db.operations import UpdateOne
+from utils.skill_index import skill_index, normalize_skills
+from utils.vector_index import VectorIndex, vectorize_resume
+from utils.metrics import mongo_command_metrics
+
+#Pool size and timeouts shared by the sync and async clients
+def _client_options() -> dict:
+    return {"maxPoolSize": MONGO_MAX_POOL_SIZE,
+               "minPoolSize": MONGO_MIN_POOL_SIZE,
+               "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+               "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+               "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+               "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+               "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS or None,
+               "event_listeners": [mongo_command_metrics]}
+
+def _in_memory() -> bool:
+    return MONGODB_CONNECTION.startswith(IN_MEMORY_SCHEME)
 
 class Database:
     _instance = None
@@ -13,13 +38,16 @@ class Database:
             cls._instance = super(Database, cls).__new__(cls)
             
             try:
-                cls._instance.client = pymongo.MongoClient(MONGODB_CONNECTION)
+                cls._instance.client = InMemoryClient() if _in_memory() else pymongo.MongoClient(MONGODB_CONNECTION, **_client_options())
                 cls._instance.db = cls._instance.client[DB_NAME]
                 
                 #Collections
                 cls._instance.resumes = cls._instance.db["resumes"]
                 cls._instance.jds = cls._instance.db["jds"]
                 cls._instance.screenings = cls._instance.db["screenings"]
+                cls._instance.screening_batches = cls._instance.db["screening_batches"]
+                cls._instance.llm_cache = cls._instance.db["llm_cache"]
+                cls._instance.jobs = cls._instance.db["jobs"]
                 print("-"*10,"MongoDB connection successful", "-"*10)
             except pymongo.errors.ConnectionFailure as e:
                 print("-"*10, "MongoDB connection failed", "-"*10)
@@ -27,28 +55,329 @@ class Database:
             
             return cls._instance
     
-    def get_collection(self, name: str) -> Optional[Collection]:
-        return getattr(self, name, None)
+    def get_collection(self, name: str) -> Collection:
+        return self.db[name]
 
 #Create Instance of our Database
 db_instance = Database()
 
+
+class AsyncDatabase:
+    '''
+        Same collections as `Database`, through PyMongo's native asyncio client.
+        Used on the request path so a database round trip never blocks the event loop.
+    '''
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AsyncDatabase, cls).__new__(cls)
+            cls._instance.client = InMemoryAsyncClient() if _in_memory() else pymongo.AsyncMongoClient(MONGODB_CONNECTION, **_client_options())
+            cls._instance.db = cls._instance.client[DB_NAME]
+        return cls._instance
+
+    def get_collection(self, name: str) -> AsyncCollection:
+        return self.db[name]
+
+    async def close(self):
+        await self.client.close()
+
+#The async client connects lazily, on the first awaited operation
+async_db_instance = AsyncDatabase()
+
+#Memory-mapped resume vectors shared by every worker process
+vector_index = VectorIndex(VECTOR_INDEX_DIR, VECTOR_DIM)
+
+#This function keeps the derived resume indexes (skills + vectors) current after resumes are inserted
+def _on_resumes_inserted(inserted: List[tuple]):
+    for resume_id, doc in inserted:
+        skill_index.add(resume_id, doc["normalized_skills"])
+    try:
+        vector_index.append([(resume_id, vectorize_resume(doc, VECTOR_DIM)) for resume_id, doc in inserted])
+    except Exception as e:
+        print(f"Could not append resumes to the vector index: {e}")
+
+def _inserted_before_error(docs_to_insert: List[dict], error: BulkWriteError) -> List[tuple]:
+    #With ordered=False every document without a write error was inserted (the driver assigned their _ids up front)
+    failed = {write_error["index"] for write_error in error.details.get("writeErrors", [])}
+    return [(str(doc["_id"]), doc) for index, doc in enumerate(docs_to_insert) if index not in failed]
+
+#Indexes the API relies on: (collection, keys, options)
+INDEXES = [
+    #Content address of an uploaded resume file; sparse so resumes stored before hashing are left alone
+    ("resumes", "content_hash", {"unique": True, "sparse": True}),
+    #Multikey index behind the boolean skill search
+    ("resumes", "normalized_skills", {}),
+    #Persistent tier of the LLM response cache expires on its own
+    ("llm_cache", "created_at", {"expireAfterSeconds": LLM_CACHE_TTL_SECONDS}),
+    #Ingestion jobs are claimed by status and reclaimed once their lease expires
+    ("jobs", [("status", pymongo.ASCENDING), ("lease_expires_at", pymongo.ASCENDING)], {}),
+    ("jobs", "content_hash", {}),
+    #Report exports and batch progress look screenings up by batch and by JD
+    ("screenings", "batch_id", {}),
+    ("screenings", [("jd_id", pymongo.ASCENDING), ("resume_id", pymongo.ASCENDING)], {}),
+    #One versioned screening per (resume, JD) pair; partial so screenings stored before versioning are left alone
+    ("screenings", [("resume_id", pymongo.ASCENDING), ("jd_id", pymongo.ASCENDING)],
+     {"unique": True, "partialFilterExpression": {"screening_version": {"$exists": True}}}),
+    #JD leaderboard: walks one JD's screenings best-first; _id breaks score ties for keyset pagination
+    ("screenings", [("jd_id", pymongo.ASCENDING), ("match_score", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)], {}),
+]
+
+#This function will create the indexes the API relies on (safe to call on every startup)
+def create_indexes():
+    for collection_name, keys, options in INDEXES:
+        db_instance.get_collection(collection_name).create_index(keys, **options)
+
 #This function will store document into the DB and return a Unique_ID for it
 def add_document(collection_name: str, data: dict)-> str:
     collection = db_instance.get_collection(collection_name)
     data_to_insert = data.copy()
+    if collection_name == "resumes":
+        data_to_insert["normalized_skills"] = normalize_skills(data_to_insert.get("skills", []))
     result = collection.insert_one(data_to_insert)
+    if collection_name == "resumes":
+        _on_resumes_inserted([(str(result.inserted_id), data_to_insert)])
     return str(result.inserted_id)
 
-#This function will fetch a stored document from the DB using the Unique_ID
-def get_document(collection_name: str, doc_id: str)-> Optional[dict]:
+#This function will fetch a stored document from the DB using the Unique_ID (projection limits the returned fields)
+def get_document(collection_name: str, doc_id: str, projection: Optional[dict] = None)-> Optional[dict]:
     try:
         collection = db_instance.get_collection(collection_name)
-        doc = collection.find_one({"_id": ObjectId(doc_id)})
+        doc = collection.find_one({"_id": ObjectId(doc_id)}, projection)
         if doc:
             doc["_id"] = str(doc["_id"]) #Convert ObjectId to string for JSON 
         return doc
 
     except Exception:
         return None
-    
\ No newline at end of file
+
+
+#This function will fetch the first stored document matching a query
+def find_document(collection_name: str, query: dict, projection: Optional[dict] = None)-> Optional[dict]:
+    collection = db_instance.get_collection(collection_name)
+    doc = collection.find_one(query, projection)
+    if doc:
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+#This function will fetch every stored document matching a query (limit=0 means no limit; sort is a list of (field, direction))
+def find_documents(collection_name: str, query: dict, projection: Optional[dict] = None, limit: int = 0,
+                   sort: Optional[list] = None)-> List[dict]:
+    collection = db_instance.get_collection(collection_name)
+    docs = []
+    for doc in collection.find(query, projection, limit = limit, sort = sort):
+        doc["_id"] = str(doc["_id"])
+        docs.append(doc)
+    return docs
+
+#This function will atomically update the first document matching a query and return it as updated (None if nothing matched)
+def find_and_update_document(collection_name: str, query: dict, update: dict)-> Optional[dict]:
+    collection = db_instance.get_collection(collection_name)
+    doc = collection.find_one_and_update(query, update, return_document = ReturnDocument.AFTER)
+    if doc:
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+#This function will count the documents matching a query
+def count_documents(collection_name: str, query: dict)-> int:
+    return db_instance.get_collection(collection_name).count_documents(query)
+
+#This function will store many documents in a single round trip and return their Unique_IDs
+def add_documents(collection_name: str, docs: List[dict])-> List[str]:
+    if not docs:
+        return []
+    collection = db_instance.get_collection(collection_name)
+    docs_to_insert = [doc.copy() for doc in docs]
+    if collection_name == "resumes":
+        for doc in docs_to_insert:
+            doc["normalized_skills"] = normalize_skills(doc.get("skills", []))
+    try:
+        result = collection.insert_many(docs_to_insert, ordered = False)
+    except BulkWriteError as e:
+        if collection_name == "resumes":
+            _on_resumes_inserted(_inserted_before_error(docs_to_insert, e))
+        raise
+    inserted_ids = [str(inserted_id) for inserted_id in result.inserted_ids]
+    if collection_name == "resumes":
+        _on_resumes_inserted(list(zip(inserted_ids, docs_to_insert)))
+    return inserted_ids
+
+#This function will fetch many documents with a single $in query (doc_ids=None fetches the whole collection)
+def get_documents(collection_name: str, doc_ids: Optional[List[str]] = None, projection: Optional[dict] = None)-> List[dict]:
+    collection = db_instance.get_collection(collection_name)
+    query = {}
+    if doc_ids is not None:
+        object_ids = [ObjectId(doc_id) for doc_id in doc_ids if ObjectId.is_valid(doc_id)]
+        query = {"_id": {"$in": object_ids}}
+
+    docs = []
+    for doc in collection.find(query, projection):
+        doc["_id"] = str(doc["_id"])
+        docs.append(doc)
+    return docs
+
+#This function will apply a MongoDB update (e.g. {"$set": {...}}) to the document with the given Unique_ID
+def update_document(collection_name: str, doc_id: str, update: dict)-> bool:
+    try:
+        collection = db_instance.get_collection(collection_name)
+        result = collection.update_one({"_id": ObjectId(doc_id)}, update)
+        return result.matched_count > 0
+    except Exception:
+        return False
+
+#This function will run many inserts/updates/deletes (db.operations InsertOne, UpdateOne, ...) in a single round trip
+def bulk_write_documents(collection_name: str, operations: List[Any], ordered: bool = False)-> Dict[str, int]:
+    if not operations:
+        return {"inserted": 0, "matched": 0, "modified": 0, "upserted": 0, "deleted": 0}
+    result = db_instance.get_collection(collection_name).bulk_write(operations, ordered = ordered)
+    return {"inserted": result.inserted_count, "matched": result.matched_count, "modified": result.modified_count,
+            "upserted": result.upserted_count, "deleted": result.deleted_count}
+
+#This function will rebuild the in-memory skill index from MongoDB; persist=True also re-normalizes the stored skills (e.g. after alias changes)
+def rebuild_skill_index(persist: bool = False)-> int:
+    collection = db_instance.get_collection("resumes")
+    documents, updates = [], []
+    for doc in collection.find({}, {"skills": 1, "normalized_skills": 1}):
+        normalized = normalize_skills(doc.get("skills", [])) if persist or "normalized_skills" not in doc else doc["normalized_skills"]
+        if normalized != doc.get("normalized_skills"):
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"normalized_skills": normalized}}))
+        documents.append((str(doc["_id"]), normalized))
+
+    bulk_write_documents("resumes", updates)
+    skill_index.rebuild(documents)
+    return len(documents)
+
+#This function will vectorize every stored resume missing from the vector index (rebuild=True re-vectorizes all of them)
+def sync_vector_index(rebuild: bool = False, batch_size: int = 1000)-> int:
+    if rebuild:
+        vector_index.reset()
+    collection = db_instance.get_collection("resumes")
+    missing_ids = [doc["_id"] for doc in collection.find({}, {"_id": 1}) if not vector_index.contains(str(doc["_id"]))]
+
+    projection = {"summary": 1, "skills": 1, "work_experience.title": 1, "work_experience.responsibilities": 1,
+                  "projects.title": 1, "projects.responsibilities": 1}
+    appended = 0
+    for start in range(0, len(missing_ids), batch_size):
+        docs = collection.find({"_id": {"$in": missing_ids[start:start + batch_size]}}, projection)
+        appended += vector_index.append([(str(doc["_id"]), vectorize_resume(doc, VECTOR_DIM)) for doc in docs])
+    return appended
+
+
+#======================Async versions of the helpers above (used by the API endpoints)======================
+
+#This function will store document into the DB and return a Unique_ID for it
+async def add_document_async(collection_name: str, data: dict)-> str:
+    collection = async_db_instance.get_collection(collection_name)
+    data_to_insert = data.copy()
+    if collection_name == "resumes":
+        data_to_insert["normalized_skills"] = normalize_skills(data_to_insert.get("skills", []))
+    result = await collection.insert_one(data_to_insert)
+    if collection_name == "resumes":
+        #Vectorizing and appending to the memory-mapped index is blocking work
+        await asyncio.to_thread(_on_resumes_inserted, [(str(result.inserted_id), data_to_insert)])
+    return str(result.inserted_id)
+
+#This function will store many documents in a single round trip and return their Unique_IDs
+async def add_documents_async(collection_name: str, docs: List[dict])-> List[str]:
+    if not docs:
+        return []
+    collection = async_db_instance.get_collection(collection_name)
+    docs_to_insert = [doc.copy() for doc in docs]
+    if collection_name == "resumes":
+        for doc in docs_to_insert:
+            doc["normalized_skills"] = normalize_skills(doc.get("skills", []))
+    try:
+        result = await collection.insert_many(docs_to_insert, ordered = False)
+    except BulkWriteError as e:
+        if collection_name == "resumes":
+            await asyncio.to_thread(_on_resumes_inserted, _inserted_before_error(docs_to_insert, e))
+        raise
+    inserted_ids = [str(inserted_id) for inserted_id in result.inserted_ids]
+    if collection_name == "resumes":
+        await asyncio.to_thread(_on_resumes_inserted, list(zip(inserted_ids, docs_to_insert)))
+    return inserted_ids
+
+#This function will fetch a stored document from the DB using the Unique_ID (projection limits the returned fields)
+async def get_document_async(collection_name: str, doc_id: str, projection: Optional[dict] = None)-> Optional[dict]:
+    if not ObjectId.is_valid(doc_id):
+        return None
+    collection = async_db_instance.get_collection(collection_name)
+    doc = await collection.find_one({"_id": ObjectId(doc_id)}, projection)
+    if doc:
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+#This function will fetch many documents with a single $in query (doc_ids=None fetches the whole collection)
+async def get_documents_async(collection_name: str, doc_ids: Optional[List[str]] = None, projection: Optional[dict] = None)-> List[dict]:
+    query = {}
+    if doc_ids is not None:
+        query = {"_id": {"$in": [ObjectId(doc_id) for doc_id in doc_ids if ObjectId.is_valid(doc_id)]}}
+    return await find_documents_async(collection_name, query, projection)
+
+#This function will fetch the first stored document matching a query
+async def find_document_async(collection_name: str, query: dict, projection: Optional[dict] = None)-> Optional[dict]:
+    collection = async_db_instance.get_collection(collection_name)
+    doc = await collection.find_one(query, projection)
+    if doc:
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+#This function will fetch every stored document matching a query (limit=0 means no limit; sort is a list of (field, direction))
+async def find_documents_async(collection_name: str, query: dict, projection: Optional[dict] = None, limit: int = 0,
+                               sort: Optional[list] = None)-> List[dict]:
+    collection = async_db_instance.get_collection(collection_name)
+    docs = []
+    async for doc in collection.find(query, projection, limit = limit, sort = sort):
+        doc["_id"] = str(doc["_id"])
+        docs.append(doc)
+    return docs
+
+#This function will atomically update the first document matching a query and return it as updated (None if nothing matched)
+async def find_and_update_document_async(collection_name: str, query: dict, update: dict)-> Optional[dict]:
+    collection = async_db_instance.get_collection(collection_name)
+    doc = await collection.find_one_and_update(query, update, return_document = ReturnDocument.AFTER)
+    if doc:
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+#This function will apply a MongoDB update (e.g. {"$set": {...}}) to the document with the given Unique_ID
+async def update_document_async(collection_name: str, doc_id: str, update: dict)-> bool:
+    if not ObjectId.is_valid(doc_id):
+        return False
+    collection = async_db_instance.get_collection(collection_name)
+    result = await collection.update_one({"_id": ObjectId(doc_id)}, update)
+    return result.matched_count > 0
+
+#This function will count the documents matching a query
+async def count_documents_async(collection_name: str, query: dict)-> int:
+    return await async_db_instance.get_collection(collection_name).count_documents(query)
+
+#This function will run many inserts/updates/deletes (db.operations InsertOne, UpdateOne, ...) in a single round trip
+async def bulk_write_documents_async(collection_name: str, operations: List[Any], ordered: bool = False)-> Dict[str, int]:
+    if not operations:
+        return {"inserted": 0, "matched": 0, "modified": 0, "upserted": 0, "deleted": 0}
+    result = await async_db_instance.get_collection(collection_name).bulk_write(operations, ordered = ordered)
+    return {"inserted": result.inserted_count, "matched": result.matched_count, "modified": result.modified_count,
+            "upserted": result.upserted_count, "deleted": result.deleted_count}
+
+#This function will return (resume count, highest resume _id); it moves whenever any process inserts or deletes resumes
+async def resumes_watermark_async()-> tuple:
+    collection = async_db_instance.get_collection("resumes")
+    latest = await collection.find_one({}, {"_id": 1}, sort = [("_id", -1)])
+    return await collection.estimated_document_count(), str(latest["_id"]) if latest else None
+
+#This function will reload the process's skill index when the resumes collection moved past it (other workers, bulk or direct inserts)
+async def refresh_skill_index_async()-> bool:
+    if skill_index.watermark() == await resumes_watermark_async():
+        return False
+    await asyncio.to_thread(rebuild_skill_index)
+    return True
+
+#Background task comparing the watermarks every `interval_seconds`, so skill searches never wait on MongoDB
+async def refresh_skill_index_periodically(interval_seconds: float):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await refresh_skill_index_async()
+        except Exception as e:
+            print(f"Could not refresh the skill index: {e}")
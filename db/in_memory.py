@@ -0,0 +1,168 @@
+from itertools import islice
+from typing import Any, List, Optional
+
+from db.operations import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+
+#MONGODB_CONNECTION values starting with this run the data layer on mongomock instead of a MongoDB server
+IN_MEMORY_SCHEME = "memory://"
+
+#One store per process, shared by the sync and async clients just like a real server
+_shared_client = None
+
+
+def _shared_mongomock_client():
+    '''
+        The process-wide mongomock client (an optional dependency, only imported when the in-memory store is used).
+    '''
+    global _shared_client
+    if _shared_client is None:
+        try:
+            import mongomock
+        except ImportError as e:
+            raise RuntimeError("MONGODB_CONNECTION=memory:// needs the `mongomock` package (pip install mongomock)") from e
+        _shared_client = mongomock.MongoClient()
+    return _shared_client
+
+
+class InMemoryBulkWriteResult:
+    def __init__(self):
+        self.inserted_count = self.matched_count = self.modified_count = self.upserted_count = self.deleted_count = 0
+
+
+class InMemoryCollection:
+    '''
+        A mongomock collection; bulk_write is replayed one operation at a time because mongomock cannot
+        take the write models of current PyMongo releases. Only the db.operations models are accepted: they keep
+        their arguments public, where pymongo's own only has private attributes.
+    '''
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    def bulk_write(self, operations: List[Any], ordered: bool = True) -> InMemoryBulkWriteResult:
+        result = InMemoryBulkWriteResult()
+        for operation in operations:
+            if not isinstance(operation, (InsertOne, UpdateOne, UpdateMany, ReplaceOne, DeleteOne, DeleteMany)):
+                raise TypeError(f"Unsupported bulk operation: {operation!r} (build it with db.operations)")
+            if operation.options:
+                raise TypeError(f"The in-memory store does not support {sorted(operation.options)} in bulk operations")
+            if isinstance(operation, InsertOne):
+                self._collection.insert_one(operation.document)
+                result.inserted_count += 1
+                continue
+            if isinstance(operation, (DeleteOne, DeleteMany)):
+                delete = self._collection.delete_one if isinstance(operation, DeleteOne) else self._collection.delete_many
+                result.deleted_count += delete(operation.filter).deleted_count
+                continue
+            if isinstance(operation, ReplaceOne):
+                outcome = self._collection.replace_one(operation.filter, operation.replacement, upsert = operation.upsert)
+            else:
+                write = self._collection.update_one if isinstance(operation, UpdateOne) else self._collection.update_many
+                outcome = write(operation.filter, operation.update, upsert = operation.upsert)
+            result.matched_count += outcome.matched_count
+            result.modified_count += outcome.modified_count
+            result.upserted_count += outcome.upserted_id is not None
+        return result
+
+
+class InMemoryDatabase:
+    def __init__(self, database):
+        self._database = database
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        return InMemoryCollection(self._database[name])
+
+    def __getattr__(self, name: str):
+        return getattr(self._database, name)
+
+
+class InMemoryClient:
+    '''
+        Stands in for pymongo.MongoClient on top of the shared mongomock client.
+    '''
+    def __init__(self):
+        self._client = _shared_mongomock_client()
+
+    def __getitem__(self, name: str) -> InMemoryDatabase:
+        return InMemoryDatabase(self._client[name])
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+class InMemoryAsyncCursor:
+    '''
+        `async for` / `to_list` over a mongomock cursor; sort/limit/skip chain like on AsyncCursor.
+    '''
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        method = getattr(self._cursor, name)
+        def chained(*args, **kwargs):
+            method(*args, **kwargs)
+            return self
+        return chained
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length: Optional[int] = None):
+        return list(self._cursor) if length is None else list(islice(self._cursor, length))
+
+
+class InMemoryAsyncCollection:
+    '''
+        The AsyncCollection methods the data layer uses, answered by a mongomock collection.
+        The store is in-process, so the calls complete without ever yielding to the event loop.
+    '''
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs) -> InMemoryAsyncCursor:
+        return InMemoryAsyncCursor(self._collection.find(*args, **kwargs))
+
+    async def aggregate(self, *args, **kwargs) -> InMemoryAsyncCursor:
+        return InMemoryAsyncCursor(iter(self._collection.aggregate(*args, **kwargs)))
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+class InMemoryAsyncDatabase:
+    def __init__(self, database):
+        self._database = database
+
+    def __getitem__(self, name: str) -> InMemoryAsyncCollection:
+        return InMemoryAsyncCollection(self._database[name])
+
+    def __getattr__(self, name: str) -> InMemoryAsyncCollection:
+        return self[name]
+
+
+class InMemoryAsyncClient:
+    '''
+        Stands in for pymongo.AsyncMongoClient on top of the shared mongomock client.
+    '''
+    def __init__(self):
+        self._client = InMemoryClient()
+
+    def __getitem__(self, name: str) -> InMemoryAsyncDatabase:
+        return InMemoryAsyncDatabase(self._client[name])
+
+    async def drop_database(self, name: str):
+        self._client.drop_database(name)
+
+    async def close(self):
+        pass
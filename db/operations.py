@@ -0,0 +1,41 @@
+import pymongo
+
+#Write models for bulk_write_documents / bulk_write_documents_async. They ARE the pymongo classes (so MongoDB gets
+#them unchanged) and also keep a public copy of their arguments, which the in-memory store replays one by one.
+#`options` holds the rest (collation, array_filters, hint, ...); the in-memory store does not support them.
+
+
+class InsertOne(pymongo.InsertOne):
+    def __init__(self, document, **options):
+        super().__init__(document, **options)
+        self.document, self.options = document, options
+
+
+class UpdateOne(pymongo.UpdateOne):
+    def __init__(self, filter, update, upsert: bool = False, **options):
+        super().__init__(filter, update, upsert = upsert, **options)
+        self.filter, self.update, self.upsert, self.options = filter, update, upsert, options
+
+
+class UpdateMany(pymongo.UpdateMany):
+    def __init__(self, filter, update, upsert: bool = False, **options):
+        super().__init__(filter, update, upsert = upsert, **options)
+        self.filter, self.update, self.upsert, self.options = filter, update, upsert, options
+
+
+class ReplaceOne(pymongo.ReplaceOne):
+    def __init__(self, filter, replacement, upsert: bool = False, **options):
+        super().__init__(filter, replacement, upsert = upsert, **options)
+        self.filter, self.replacement, self.upsert, self.options = filter, replacement, upsert, options
+
+
+class DeleteOne(pymongo.DeleteOne):
+    def __init__(self, filter, **options):
+        super().__init__(filter, **options)
+        self.filter, self.options = filter, options
+
+
+class DeleteMany(pymongo.DeleteMany):
+    def __init__(self, filter, **options):
+        super().__init__(filter, **options)
+        self.filter, self.options = filter, options
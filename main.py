@@ -1,14 +1,66 @@
-from fastapi import FastAPI
-from core.config import GOOGLE_API_KEY #For Testing Purpose Only
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
+from core.config import GOOGLE_API_KEY, MODEL_REFRESH_INTERVAL_SECONDS, SKILL_INDEX_REFRESH_SECONDS, RESUME_MAX_BYTES, JD_FILE_MAX_BYTES, BULK_UPLOAD_MAX_BYTES #For Testing Purpose Only
 import uvicorn
+from agents.registry import AgentRegistry
 from api import endpoints
+from api.uploads import UploadSizeLimitMiddleware
+from utils.metrics import PrometheusMiddleware, render_metrics
+from api.ingestion_jobs import IngestionQueue
+from db.database import (create_indexes, rebuild_skill_index, refresh_skill_index_periodically, sync_vector_index,
+                         async_db_instance)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    create_indexes()
+    print("-"*10, f"Skill index loaded with {rebuild_skill_index()} resumes", "-"*10)
+    print("-"*10, f"Vector index caught up with {sync_vector_index()} new resumes", "-"*10)
+
+    #Build every Agent once and share them across requests
+    app.state.agents = AgentRegistry()
+    print("-"*10, f"Agents ready in {sum(app.state.agents.build_timings_ms.values()):.1f} ms", "-"*10)
+
+    refresh_task = asyncio.create_task(app.state.agents.refresh_models_periodically(MODEL_REFRESH_INTERVAL_SECONDS))
+    #Picks up resumes other workers inserted, off the search path
+    skill_index_task = asyncio.create_task(refresh_skill_index_periodically(SKILL_INDEX_REFRESH_SECONDS))
+
+    #Resume ingestion runs on background workers; the parser is looked up per job so model swaps apply
+    app.state.ingestion = IngestionQueue(lambda: app.state.agents.parser)
+    await app.state.ingestion.start()
+    yield
+    await app.state.ingestion.stop()
+    refresh_task.cancel()
+    skill_index_task.cancel()
+    await async_db_instance.close()
+
 
 app = FastAPI(title = "Agentic_RAG Resume Parser", 
               description = "API for parsing resumes and matching them with job descriptions.",
-              version = "1.0.0")
+              version = "1.0.0",
+              lifespan = lifespan)
+
+#Reject oversized uploads while the body is still streaming in
+app.add_middleware(UploadSizeLimitMiddleware, limits = {"/v1/resumes": RESUME_MAX_BYTES,
+                                                        "/v1/resumes/triage": RESUME_MAX_BYTES,
+                                                        "/v1/resumes/bulk": BULK_UPLOAD_MAX_BYTES,
+                                                        "/v1/jds/upload-file": JD_FILE_MAX_BYTES})
+
+#In-flight gauge and latency histogram for every request
+app.add_middleware(PrometheusMiddleware)
 
 #Add the router from the Endpoints.py
 app.include_router(endpoints.router)
 @app.get("/", tags=["Root"])
 def read_root():
-    return {"status":"API is running"}
\ No newline at end of file
+    return {"status":"API is running"}
+
+@app.get("/metrics", tags=["Root"], include_in_schema=False)
+def read_metrics():
+    '''
+        Prometheus scrape endpoint: stage latencies, token usage, Agent failures and in-flight requests.
+    '''
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
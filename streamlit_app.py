@@ -1,6 +1,8 @@
 import streamlit as st 
 import requests 
 import pandas as pd 
+import time
+import json
 
 
 #---Configuration-----
@@ -32,6 +34,42 @@ def display_docs_as_table(collection_name, docs_dict):
     
     st.dataframe(pd.DataFrame(df_data), use_container_width=True)
     
+def wait_for_job(job_id, timeout_seconds = 300):
+    """
+        Polls an ingestion job until it completes or fails.
+    """
+    deadline = time.time() + timeout_seconds
+    while time.time() < deadline:
+        job = requests.get(f"{API_URL}/v1/jobs/{job_id}").json()
+        if job.get("status") in ("completed", "failed"):
+            return job
+        time.sleep(1)
+    return {"status": "timed out"}
+    
+def stream_report(screening_id):
+    """
+        Renders the screening report while it is being generated (server-sent events).
+    """
+    placeholder = st.empty()
+    report_markdown = ""
+    with requests.get(f"{API_URL}/v1/reports/{screening_id}/stream", stream = True, timeout = 300) as response:
+        if response.status_code != 200:
+            st.error(f"Could not fetch report: {response.status_code} - {response.text}")
+            return
+        event = None
+        for line in response.iter_lines(decode_unicode = True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[len("data:"):])
+                if event == "chunk":
+                    report_markdown += data["text"]
+                    placeholder.markdown(report_markdown + " ▌")
+                elif event == "error":
+                    st.error(data["detail"])
+                    return
+    placeholder.markdown(report_markdown)
+    
 #---------Main App Sections-----------
 if 'resumes' not in st.session_state:
     st.session_state['resumes'] = {}
@@ -55,10 +93,19 @@ with col1:
             files = {'resume_file': (uploaded_resume.name, uploaded_resume.getvalue(), uploaded_resume.type)}
             try:
                 response = requests.post(f"{API_URL}/v1/resumes", files = files)
-                if response.status_code == 201:
+                if response.status_code == 202:
+                    #Parsing runs as a background job; wait for it to finish
+                    job = wait_for_job(response.json().get("job_id"))
+                    if job.get("status") == "completed":
+                        resume_id = job.get("resume_id")
+                        st.session_state.resumes[resume_id] = uploaded_resume.name
+                        st.success(f"Resume processed successfully! ID: `{resume_id}`")
+                    else:
+                        st.error(f"Error: {job.get('error') or job.get('status')}")
+                elif response.status_code == 200:
                     resume_id = response.json().get("resume_id")
                     st.session_state.resumes[resume_id] = uploaded_resume.name
-                    st.success(f"Resume processed successfully! ID: `{resume_id}`")
+                    st.success(f"Resume already processed! ID: `{resume_id}`")
                 else:
                     st.error(f"Error: {response.status_code} - {response.text}")
             
@@ -117,17 +164,16 @@ if resumes_in_db and jds_in_db:
                 try:
                     screen_response = requests.post(f"{API_URL}/v1/screen", json=payload)
                     
-                    if screen_response.status_code == 200:
+                    #201: screened now; 200: the pair was already screened against the current resume and JD
+                    if screen_response.status_code in (200, 201):
                         screening_id = screen_response.json().get("screening_id")
-                        st.success(f"Screening complete! Fetching report for screening ID: `{screening_id}`")
-                    
-                        report_response = requests.get(f"{API_URL}/v1/reports/{screening_id}")
-                        if report_response.status_code == 200:
-                            report_markdown = report_response.json().get("report")
-                            st.subheader("Screening Report")
-                            st.markdown(report_markdown)
+                        if screen_response.json().get("stored"):
+                            st.info(f"This pair was already screened; showing the stored result (screening ID: `{screening_id}`)")
                         else:
-                            st.error(f"Could not fetch report: {report_response.status_code} - {report_response.text}")
+                            st.success(f"Screening complete! Fetching report for screening ID: `{screening_id}`")
+                    
+                        st.subheader("Screening Report")
+                        stream_report(screening_id)
                     else:
                         st.error(f"Screening failed: {screen_response.status_code} - {screen_response.text}")
 
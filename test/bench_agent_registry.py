@@ -0,0 +1,54 @@
+'''
+    Startup benchmark: how much per-request latency the shared AgentRegistry removes.
+    Compares the old "build every Agent (+ list_models) on each request" path with a registry lookup.
+
+    Usage: python test/bench_agent_registry.py [iterations]
+'''
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.registry import AgentRegistry
+from agents.resume_parser import ResumeParserAgent
+from agents.jd_analyzer import JDAnalyzerAgent
+from agents.screening_agent import ScreeningAgent
+from agents.reporting_agent import ReportingAgent
+
+
+def time_ms(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    registry = AgentRegistry()
+    try:
+        list_models_ms = registry.refresh_models()
+    except Exception as e:
+        print(f"Could not list models ({e}); excluding the round trip from the per-request cost")
+        list_models_ms = 0.0
+
+    construct_ms = {
+        "parser": time_ms(ResumeParserAgent, iterations),
+        "jd_analyzer": time_ms(JDAnalyzerAgent, iterations),
+        "screening": time_ms(ScreeningAgent, iterations),
+        "reporting": time_ms(ReportingAgent, iterations),
+    }
+    lookup_ms = time_ms(lambda: registry.screening, iterations)
+
+    print("Per-request Agent construction (median):")
+    for name, ms in construct_ms.items():
+        print(f" - {name:<12} {ms:8.3f} ms")
+    print(f" - list_models  {list_models_ms:8.3f} ms (paid on every resume upload before)")
+    print(f"Registry lookup (median): {lookup_ms:.4f} ms")
+    print(f"Latency removed per resume upload: ~{construct_ms['parser'] + list_models_ms:.1f} ms")
+    print(f"Latency removed per other request: ~{max(construct_ms.values()):.1f} ms")
@@ -0,0 +1,125 @@
+'''
+    Load test: request throughput vs. number of in-flight LLM calls.
+    Fires concurrent `POST /v1/jds/paste-text` requests at the app, with the Gemini model replaced by a fake
+    that takes a fixed latency, and compares the old blocking call path (sync `parse_jd` + pymongo inside an
+    `async def` endpoint) with the async one. Event-loop lag is sampled during the load: it is how long any other
+    request (even `GET /`) would wait before being served.
+
+    Needs httpx and a reachable MongoDB (MONGODB_CONNECTION); writes go to a throwaway `DB_NAME` that is dropped afterwards.
+
+    Usage: python test/bench_async_endpoints.py [requests_per_level] [model_latency_seconds]
+'''
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "load-test")
+os.environ.setdefault("DB_NAME", "bench_async_endpoints")
+os.environ.setdefault("LLM_CACHE_PERSISTENT", "false")
+
+import httpx
+from fastapi import Body, FastAPI, Request
+
+from agents.jd_analyzer import JDAnalyzerAgent
+from api import endpoints
+from db.database import add_document, db_instance, async_db_instance
+
+CONCURRENCY_LEVELS = (1, 4, 16, 64)
+FAKE_JD = json.dumps({"job_title": "Backend Engineer",
+                      "required_skills": [{"skill": "Python", "level": "Expert"}],
+                      "preferred_skills": [{"skill": "Go", "level": "Familiar"}],
+                      "required_years_of_experience": 3,
+                      "education_requirements": "B.Tech"})
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    '''
+        Stands in for genai.GenerativeModel with a fixed response latency.
+    '''
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        return FakeResponse(FAKE_JD)
+
+    async def generate_content_async(self, prompt):
+        await asyncio.sleep(self.latency)
+        return FakeResponse(FAKE_JD)
+
+
+class FakeRegistry:
+    def __init__(self, latency: float):
+        self.jd_analyzer = JDAnalyzerAgent()
+        self.jd_analyzer.model = FakeModel(latency)
+
+
+def build_app(latency: float) -> FastAPI:
+    app = FastAPI()
+    app.state.agents = FakeRegistry(latency)
+    app.include_router(endpoints.router)
+
+    #The pre-async implementation: blocking model and database calls inside an async endpoint
+    @app.post("/blocking/jds/paste-text", status_code=201)
+    async def blocking_paste_text(request: Request, jd_text: str = Body(..., media_type="text/plain")):
+        structured_data = request.app.state.agents.jd_analyzer.parse_jd(jd_text, use_cache=False)
+        return {"jd_id": add_document("jds", structured_data)}
+
+    return app
+
+
+async def run_level(client: httpx.AsyncClient, path: str, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    lag_ms = []
+    done = asyncio.Event()
+
+    async def one(i: int):
+        async with semaphore:
+            response = await client.post(path, content=f"Backend engineer #{i} {time.time_ns()}",
+                                         headers={"Content-Type": "text/plain", "X-Bypass-Cache": "true"})
+            response.raise_for_status()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag_ms.append((time.perf_counter() - start - 0.01) * 1000)
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+    return total / elapsed, statistics.median(lag_ms) if lag_ms else float("nan"), max(lag_ms, default=float("nan"))
+
+
+async def main(total: int, latency: float):
+    transport = httpx.ASGITransport(app=build_app(latency))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        print(f"{total} requests per level, fake model latency {latency * 1000:.0f} ms")
+        print(f"{'path':<10}{'in-flight':>10}{'req/s':>10}{'lag p50 ms':>15}{'lag max ms':>15}")
+        for label, path in (("blocking", "/blocking/jds/paste-text"), ("async", "/v1/jds/paste-text")):
+            for concurrency in CONCURRENCY_LEVELS:
+                throughput, lag_p50, lag_max = await run_level(client, path, total, concurrency)
+                print(f"{label:<10}{concurrency:>10}{throughput:>10.1f}{lag_p50:>15.1f}{lag_max:>15.1f}")
+        print(f"Ideal async throughput at N in flight: ~N / {latency:.2f}s")
+    await async_db_instance.close()
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    try:
+        asyncio.run(main(total, latency))
+    finally:
+        db_instance.client.drop_database(os.environ["DB_NAME"])
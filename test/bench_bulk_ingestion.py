@@ -0,0 +1,120 @@
+'''
+    Benchmark: bulk resume ingestion, one file at a time vs the pipelined executor.
+    Generates a corpus of DOCX resumes and ingests it twice: sequentially (extract -> parse -> persist per file, as
+    repeated POST /v1/resumes calls would) and with run_bulk_ingestion, whose stages overlap. The Gemini model is replaced
+    by a fake with a fixed latency. A pipelined batch should take about as long as its slowest stage, not the sum of all three.
+
+    Needs a reachable MongoDB (MONGODB_CONNECTION); writes go to a throwaway `DB_NAME` that is dropped afterwards.
+
+    Usage: python test/bench_bulk_ingestion.py [resumes] [model_latency_seconds]
+'''
+import asyncio
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("DB_NAME", "bench_bulk_ingestion")
+os.environ.setdefault("LLM_CACHE_PERSISTENT", "false")
+os.environ.setdefault("INGEST_SPOOL_DIR", tempfile.mkdtemp(prefix = "bench_bulk_"))
+
+import docx
+
+from agents.resume_parser import ResumeParserAgent
+from api.bulk_ingestion import run_bulk_ingestion
+from core.config import BULK_EXTRACTION_PROCESSES, BULK_PARSE_CONCURRENCY, BULK_PERSIST_BATCH_SIZE
+from db.database import add_document_async, get_document_async, db_instance, async_db_instance
+from utils.file_handler import run_extraction
+
+PARAGRAPHS = 120
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def generate_content_async(self, prompt: str):
+        await asyncio.sleep(self.latency)
+        return FakeResponse(json.dumps({"name": "Bench Candidate", "skills": ["Python", "Kafka"], "projects": []}))
+
+
+def write_corpus(size: int, directory: str):
+    os.makedirs(directory, exist_ok = True)
+    paths = []
+    for i in range(size):
+        document = docx.Document()
+        for line in range(PARAGRAPHS):
+            document.add_paragraph(f"Candidate {i}: built a Python and Kafka service handling {line}k requests per day.")
+        buffer = io.BytesIO()
+        document.save(buffer)
+        path = os.path.join(directory, f"resume_{i}.docx")
+        with open(path, "wb") as f:
+            f.write(buffer.getvalue())
+        paths.append(path)
+    return paths
+
+
+def items_for(paths, run: str):
+    #Distinct content hashes per run, so the second run does not find the first run's resumes
+    return [{"filenames": [os.path.basename(path)], "path": path, "content_hash": f"{run}-{i}"} for i, path in enumerate(paths)]
+
+
+async def sequential(items, parser: ResumeParserAgent):
+    for item in items:
+        raw_text, extraction = await run_extraction(parser.extract_text, item["filenames"][0], item["path"])
+        structured_data = await parser.parse_text_async(raw_text, use_cache = False)
+        structured_data.update({"extraction": extraction, "content_hash": item["content_hash"]})
+        await add_document_async("resumes", structured_data)
+
+
+async def pipelined(items, parser: ResumeParserAgent):
+    batch_id = await add_document_async("ingest_batches", {"status": "running", "completed": 0, "failed": 0, "manifest": []})
+    await run_bulk_ingestion(batch_id, items, parser, use_cache = False)
+    return await get_document_async("ingest_batches", batch_id)
+
+
+async def main(size: int, latency: float):
+    parser = ResumeParserAgent()
+    parser.model = FakeModel(latency)
+    corpus_dir = tempfile.mkdtemp(prefix = "bench_bulk_corpus_")
+    print(f"{size} DOCX resumes, fake model latency {latency * 1000:.0f} ms, {BULK_EXTRACTION_PROCESSES} extraction processes, "
+          f"{BULK_PARSE_CONCURRENCY} parse calls in flight, insert_many batches of {BULK_PERSIST_BATCH_SIZE}")
+
+    sequential_items = items_for(write_corpus(size, os.path.join(corpus_dir, "sequential")), "sequential")
+    pipelined_items = items_for(write_corpus(size, os.path.join(corpus_dir, "pipelined")), "pipelined")
+
+    start = time.perf_counter()
+    await sequential(sequential_items, parser)
+    sequential_seconds = time.perf_counter() - start
+    print(f" - one file at a time  {sequential_seconds:8.2f} s  {size / sequential_seconds:8.1f} resumes/s")
+
+    start = time.perf_counter()
+    batch = await pipelined(pipelined_items, parser)
+    pipelined_seconds = time.perf_counter() - start
+    print(f" - pipelined           {pipelined_seconds:8.2f} s  {size / pipelined_seconds:8.1f} resumes/s  "
+          f"({batch['completed']} stored, {batch['failed']} failed)")
+
+    busy = batch.get("stage_seconds", {})
+    workers = {"extract": BULK_EXTRACTION_PROCESSES, "parse": BULK_PARSE_CONCURRENCY, "persist": 1}
+    for stage, seconds in busy.items():
+        print(f"   {stage:<8} busy {seconds:8.2f} s over {workers[stage]:>2} workers = {seconds / workers[stage]:8.2f} s wall")
+    print(f"Slowest stage bound: {max(seconds / workers[stage] for stage, seconds in busy.items()):.2f} s")
+    await async_db_instance.close()
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    try:
+        asyncio.run(main(size, latency))
+    finally:
+        db_instance.client.drop_database(os.environ["DB_NAME"])
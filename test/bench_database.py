@@ -0,0 +1,106 @@
+'''
+    Micro-benchmark: read and write throughput of the data layer.
+    Writes resume-sized documents one insert_one at a time, with insert_many and with bulk_write upserts, then reads them
+    back whole, with a projection, with one batched $in query and concurrently through the async client.
+
+    Runs against MONGODB_CONNECTION (pool settings from core/config.py); `--memory` uses the in-process stand-in instead
+    (needs mongomock; only useful to exercise the code, not to compare numbers). Writes go to a throwaway `DB_NAME`
+    that is dropped afterwards.
+
+    Usage: python test/bench_database.py [--docs N] [--concurrency C] [--memory]
+'''
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if "--memory" in sys.argv:
+    os.environ["MONGODB_CONNECTION"] = "memory://"
+os.environ.setdefault("DB_NAME", "bench_database")
+
+from core.config import MONGO_MAX_POOL_SIZE
+from db.database import (add_document, add_documents, bulk_write_documents, get_document, get_documents, get_document_async,
+                         add_document_async, db_instance, async_db_instance)
+from db.operations import UpdateOne
+
+COLLECTION = "bench_documents"
+SKILLS = ["Python", "Go", "Kafka", "Docker", "Kubernetes", "AWS", "SQL", "React"]
+
+
+def resume_like(i: int, rng: random.Random) -> dict:
+    return {"name": f"Candidate {i}", "email": f"candidate{i}@example.com", "skills": rng.sample(SKILLS, 4),
+            "summary": "Backend engineer. " * 20,
+            "work_experience": [{"title": "Engineer", "company": f"Company {j}",
+                                 "responsibilities": [f"Built service {k} handling {rng.randint(1, 900)}k requests" for k in range(8)]}
+                                for j in range(4)]}
+
+
+def report(label: str, operations: int, seconds: float):
+    print(f" - {label:<34} {operations / seconds:10.0f} ops/s  ({seconds * 1000:8.1f} ms for {operations})")
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+async def concurrent_reads(ids, concurrency: int, projection):
+    semaphore = asyncio.Semaphore(concurrency)
+    async def one(doc_id):
+        async with semaphore:
+            return await get_document_async(COLLECTION, doc_id, projection)
+    start = time.perf_counter()
+    await asyncio.gather(*(one(doc_id) for doc_id in ids))
+    return time.perf_counter() - start
+
+
+async def concurrent_writes(docs, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    async def one(doc):
+        async with semaphore:
+            return await add_document_async(COLLECTION, doc)
+    start = time.perf_counter()
+    await asyncio.gather(*(one(doc) for doc in docs))
+    return time.perf_counter() - start
+
+
+async def run_async(ids, docs, concurrency):
+    report(f"async insert_one x{concurrency} in flight", len(docs), await concurrent_writes(docs, concurrency))
+    report(f"async find_one x{concurrency} in flight", len(ids), await concurrent_reads(ids, concurrency, None))
+    report(f"async find_one+projection x{concurrency}", len(ids), await concurrent_reads(ids, concurrency, {"name": 1}))
+    await async_db_instance.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--memory", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    docs = [resume_like(i, rng) for i in range(args.docs)]
+    print(f"{args.docs} resume-sized documents, pool size {MONGO_MAX_POOL_SIZE}")
+    try:
+        ids, seconds = timed(lambda: [add_document(COLLECTION, doc) for doc in docs])
+        report("insert_one (one round trip each)", len(docs), seconds)
+        _, seconds = timed(lambda: [add_documents(COLLECTION, docs[start:start + 500]) for start in range(0, len(docs), 500)])
+        report("insert_many (500 per batch)", len(docs), seconds)
+        upserts = [UpdateOne({"email": doc["email"]}, {"$set": {"score": i}}, upsert = True) for i, doc in enumerate(docs)]
+        _, seconds = timed(lambda: bulk_write_documents(COLLECTION, upserts))
+        report("bulk_write upserts", len(upserts), seconds)
+
+        _, seconds = timed(lambda: [get_document(COLLECTION, doc_id) for doc_id in ids])
+        report("find_one, whole document", len(ids), seconds)
+        _, seconds = timed(lambda: [get_document(COLLECTION, doc_id, {"name": 1, "skills": 1}) for doc_id in ids])
+        report("find_one, projection", len(ids), seconds)
+        _, seconds = timed(lambda: get_documents(COLLECTION, ids, {"name": 1, "skills": 1}))
+        report("one $in query, projection", len(ids), seconds)
+
+        asyncio.run(run_async(ids, [resume_like(i, rng) for i in range(args.docs)], args.concurrency))
+    finally:
+        db_instance.client.drop_database(os.environ["DB_NAME"])
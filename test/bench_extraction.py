@@ -0,0 +1,304 @@
+'''
+    Benchmark: text extraction (utils/file_handler) on a synthetic resume corpus generated locally.
+    The corpus covers text PDFs, scanned PDFs (page images without a text layer), mixed PDFs, multi-page DOCX files
+    with tables, and PNG/JPEG scans rendered at several resolutions. Every file is extracted `--repeat` times after a
+    warm-up, through the same extractor ingestion uses. The suite reports the median time per file and per page, the
+    peak memory and the characters extracted, then aggregates them per extractor.
+
+    Peak memory is the tracemalloc high-water mark of one extraction. It covers Python allocations, including the
+    rendered pixmaps and OCR input. It does not cover MuPDF's own heap, the OCR worker processes or Tesseract.
+    OCR cases are skipped (and marked so in the JSON) when the tesseract binary is not installed.
+
+    --output writes the results as JSON. --baseline compares them with an earlier JSON and exits 1 when any case
+    got slower per page by more than --threshold (and by more than --min-delta-ms, so timer noise on tiny files does
+    not fail the run).
+
+    Usage: python test/bench_extraction.py [--repeat R] [--seed S] [--corpus-dir DIR] [--output results.json]
+                                           [--baseline baseline.json] [--threshold 0.2] [--min-delta-ms 2]
+'''
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import docx
+import fitz
+import pytesseract
+from docx.enum.text import WD_BREAK
+from PIL import Image
+
+from utils.file_handler import extract_text_from_pdf, extract_text_from_docx, extract_text_from_image
+
+SKILLS = ["Python", "FastAPI", "PostgreSQL", "MongoDB", "Kafka", "Docker", "Kubernetes", "AWS", "Terraform", "React",
+          "TypeScript", "Go", "Spark", "Airflow", "PyTorch", "Redis", "GraphQL", "Linux", "CI/CD", "gRPC"]
+VERBS = ["Built", "Designed", "Migrated", "Scaled", "Automated", "Led", "Optimised", "Maintained"]
+SYSTEMS = ["a payments API", "the search indexer", "an event pipeline", "the billing service", "a feature store",
+           "the deployment tooling", "an analytics dashboard", "the auth gateway"]
+
+#Points per inch of a PDF page, and the A4 page size in points
+PDF_DPI = 72
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+#Scanned PDF pages are stored as images rendered at this resolution, like a typical office scanner
+SCAN_DPI = 200
+IMAGE_DPIS = (100, 200, 300)
+
+
+#=====================Synthetic Corpus=====================
+def resume_lines(rng: random.Random, page: int, lines: int = 38) -> List[str]:
+    '''
+        One page worth of plausible resume text (a header, section titles and bullet points).
+    '''
+    text = [f"Candidate {rng.randint(1000, 9999)} - page {page + 1}",
+            f"candidate{rng.randint(1, 999)}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+            "Skills: " + ", ".join(rng.sample(SKILLS, 8)), "Experience"]
+    while len(text) < lines:
+        text.append(f"- {rng.choice(VERBS)} {rng.choice(SYSTEMS)} with {rng.choice(SKILLS)} and {rng.choice(SKILLS)}, "
+                    f"serving {rng.randint(2, 900)}k requests per day.")
+    return text
+
+
+def _write_text_page(document, lines: List[str]):
+    page = document.new_page(width = PAGE_WIDTH, height = PAGE_HEIGHT)
+    page.insert_textbox(fitz.Rect(50, 50, PAGE_WIDTH - 50, PAGE_HEIGHT - 50), "\n".join(lines), fontsize = 10)
+    return page
+
+
+def _render_page(lines: List[str], dpi: int) -> fitz.Pixmap:
+    '''
+        The page as a scanner would see it: a grayscale image of the text, with no text layer.
+    '''
+    with fitz.open() as document:
+        page = _write_text_page(document, lines)
+        return page.get_pixmap(dpi = dpi, colorspace = fitz.csGRAY, alpha = False)
+
+
+def write_pdf(path: str, rng: random.Random, layout: str):
+    '''
+        `layout` has one letter per page: "t" for a text page, "s" for a scanned one.
+    '''
+    with fitz.open() as document:
+        for number, kind in enumerate(layout):
+            lines = resume_lines(rng, number)
+            if kind == "t":
+                _write_text_page(document, lines)
+            else:
+                page = document.new_page(width = PAGE_WIDTH, height = PAGE_HEIGHT)
+                page.insert_image(page.rect, pixmap = _render_page(lines, SCAN_DPI))
+        document.save(path, garbage = 3, deflate = True)
+
+
+def write_docx(path: str, rng: random.Random, pages: int):
+    '''
+        `pages` pages of paragraphs, each followed by a skills table and a page break.
+    '''
+    document = docx.Document()
+    for number in range(pages):
+        for line in resume_lines(rng, number, lines = 28):
+            document.add_paragraph(line)
+        table = document.add_table(rows = 6, cols = 3)
+        for row in table.rows:
+            skill = rng.choice(SKILLS)
+            for cell, value in zip(row.cells, (skill, f"{rng.randint(1, 9)} years", rng.choice(SYSTEMS))):
+                cell.text = value
+        if number < pages - 1:
+            document.add_paragraph().add_run().add_break(WD_BREAK.PAGE)
+    document.save(path)
+
+
+def write_image(path: str, rng: random.Random, dpi: int):
+    pixmap = _render_page(resume_lines(rng, 0), dpi)
+    image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+    if path.endswith(".png"):
+        image.save(path, dpi = (dpi, dpi))
+    else:
+        image.save(path, dpi = (dpi, dpi), quality = 85)
+
+
+def generate_corpus(directory: str, seed: int) -> List[dict]:
+    '''
+        Writes the corpus to `directory` and returns one case per file: {name, path, kind, pages, ocr}.
+        The same seed always produces the same files.
+    '''
+    os.makedirs(directory, exist_ok = True)
+    rng = random.Random(seed)
+    cases = []
+
+    def add(name: str, kind: str, pages: int, ocr: bool, writer: Callable[[str], None]):
+        path = os.path.join(directory, name)
+        writer(path)
+        cases.append({"name": name, "path": path, "kind": kind, "pages": pages, "ocr": ocr})
+
+    for pages in (1, 3, 10):
+        add(f"text_{pages}p.pdf", "pdf_text", pages, False, lambda path, n=pages: write_pdf(path, rng, "t" * n))
+    for pages in (1, 3):
+        add(f"scanned_{pages}p.pdf", "pdf_scanned", pages, True, lambda path, n=pages: write_pdf(path, rng, "s" * n))
+    add("mixed_4p.pdf", "pdf_mixed", 4, True, lambda path: write_pdf(path, rng, "tsts"))
+    for pages in (2, 6):
+        add(f"tables_{pages}p.docx", "docx_tables", pages, False, lambda path, n=pages: write_docx(path, rng, n))
+    for dpi in IMAGE_DPIS:
+        for extension in ("png", "jpg"):
+            add(f"scan_{dpi}dpi.{extension}", f"image_{extension}", 1, True,
+                lambda path, d=dpi: write_image(path, rng, d))
+    return cases
+
+
+#=====================Measurement=====================
+EXTRACTORS: Dict[str, Callable[[str], str]] = {
+    ".pdf": extract_text_from_pdf,
+    ".docx": extract_text_from_docx,
+    ".png": extract_text_from_image,
+    ".jpg": extract_text_from_image,
+}
+
+
+def tesseract_version() -> Optional[str]:
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return None
+
+
+def measure(case: dict, repeat: int) -> dict:
+    extractor = EXTRACTORS[os.path.splitext(case["path"])[1]]
+    #Warm-up: imports, font caches and (for multi-page scans) the OCR process pool are not part of the numbers
+    text = extractor(case["path"])
+
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extractor(case["path"])
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    extractor(case["path"])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(seconds)
+    return {"extractor": extractor.__name__, "kind": case["kind"], "pages": case["pages"],
+            "bytes": os.path.getsize(case["path"]),
+            "seconds": round(median, 6), "seconds_per_page": round(median / case["pages"], 6),
+            "min_seconds": round(min(seconds), 6), "peak_memory_mib": round(peak / 2 ** 20, 3), "chars": len(text)}
+
+
+def summarize(results: Dict[str, dict]) -> Dict[str, dict]:
+    '''
+        Totals per extractor over the cases that ran.
+    '''
+    totals = defaultdict(lambda: {"files": 0, "pages": 0, "seconds": 0.0, "chars": 0, "peak_memory_mib": 0.0})
+    for result in results.values():
+        if result.get("skipped"):
+            continue
+        total = totals[result["extractor"]]
+        total["files"] += 1
+        total["pages"] += result["pages"]
+        total["seconds"] += result["seconds"]
+        total["chars"] += result["chars"]
+        total["peak_memory_mib"] = max(total["peak_memory_mib"], result["peak_memory_mib"])
+    for total in totals.values():
+        total["seconds_per_page"] = round(total["seconds"] / total["pages"], 6)
+        total["seconds"] = round(total["seconds"], 6)
+    return dict(totals)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output = True, text = True,
+                              cwd = os.path.dirname(os.path.abspath(__file__)), check = True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_suite(cases: List[dict], repeat: int, seed: int) -> dict:
+    ocr = tesseract_version()
+    results = {}
+    for case in cases:
+        if case["ocr"] and not ocr:
+            results[case["name"]] = {"kind": case["kind"], "pages": case["pages"], "skipped": "tesseract is not installed"}
+            continue
+        results[case["name"]] = measure(case, repeat)
+    return {"meta": {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                     "pymupdf": fitz.VersionBind, "tesseract": ocr, "repeat": repeat, "seed": seed},
+            "results": results,
+            "extractors": summarize(results)}
+
+
+#=====================Reporting and Baseline Comparison=====================
+def print_results(report: dict):
+    print(f"{'file':<20}{'extractor':<26}{'pages':>6}{'KiB':>8}{'ms/file':>10}{'ms/page':>10}{'peak MiB':>10}{'chars':>8}")
+    for name, result in report["results"].items():
+        if result.get("skipped"):
+            print(f"{name:<20}{'skipped: ' + result['skipped']}")
+            continue
+        print(f"{name:<20}{result['extractor']:<26}{result['pages']:>6}{result['bytes'] / 1024:>8.0f}"
+              f"{result['seconds'] * 1000:>10.2f}{result['seconds_per_page'] * 1000:>10.2f}"
+              f"{result['peak_memory_mib']:>10.2f}{result['chars']:>8}")
+    print("\nPer extractor:")
+    for extractor, total in report["extractors"].items():
+        print(f" - {extractor:<26} {total['files']:3d} files {total['pages']:4d} pages  "
+              f"{total['seconds_per_page'] * 1000:8.2f} ms/page  peak {total['peak_memory_mib']:.2f} MiB  {total['chars']} chars")
+
+
+def compare(report: dict, baseline: dict, threshold: float, min_delta_ms: float) -> List[str]:
+    '''
+        Returns one line per case that got slower per page than the baseline by more than `threshold`
+        (a fraction) and `min_delta_ms`. Changes in the characters extracted are printed but do not fail.
+    '''
+    slowdowns = []
+    print(f"\nAgainst baseline {baseline['meta'].get('commit')} (fail above +{threshold:.0%} per page):")
+    for name, result in report["results"].items():
+        before = baseline["results"].get(name)
+        if result.get("skipped") or not before or before.get("skipped"):
+            continue
+        old, new = before["seconds_per_page"], result["seconds_per_page"]
+        change = new / old - 1 if old else 0.0
+        flag = ""
+        if change > threshold and (new - old) * 1000 > min_delta_ms:
+            flag = "  SLOWER"
+            slowdowns.append(f"{name}: {old * 1000:.2f} -> {new * 1000:.2f} ms/page ({change:+.0%})")
+        if result["chars"] != before["chars"]:
+            flag += f"  chars {before['chars']} -> {result['chars']}"
+        print(f" - {name:<20}{old * 1000:>10.2f} -> {new * 1000:>8.2f} ms/page {change:>+7.0%}{flag}")
+    return slowdowns
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per file (the median is reported).")
+    parser.add_argument("--seed", type=int, default=7, help="Seed of the synthetic corpus.")
+    parser.add_argument("--corpus-dir", default=None, help="Where to write the corpus (a temporary directory by default).")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this path.")
+    parser.add_argument("--baseline", default=None, help="Results JSON of an earlier run to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown per page (0.2 = +20%%).")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore slowdowns smaller than this per page.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix = "bench_extraction_") as scratch:
+        cases = generate_corpus(args.corpus_dir or scratch, args.seed)
+        report = run_suite(cases, args.repeat, args.seed)
+    print_results(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent = 2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            slowdowns = compare(report, json.load(f), args.threshold, args.min_delta_ms)
+        if slowdowns:
+            print(f"\n{len(slowdowns)} case(s) slower than the baseline:\n  " + "\n  ".join(slowdowns))
+            sys.exit(1)
+        print("\nNo slowdown above the threshold.")
@@ -0,0 +1,99 @@
+'''
+    Benchmark: JD leaderboard page latency, skip/limit vs keyset pagination, as the screenings collection grows.
+    Seeds `--screenings` rows spread over `--jds` JDs, then fetches pages at increasing depth both ways and prints
+    the winning query plan (it should be an IXSCAN on jd_id_1_match_score_-1__id_-1 with no SORT stage).
+
+    Needs a reachable MongoDB (MONGODB_CONNECTION); writes go to a throwaway `DB_NAME` that is dropped afterwards.
+    `--memory` runs on the in-process stand-in (exercises the code only; it has no indexes to speak of).
+
+    Usage: python test/bench_leaderboard.py [--screenings N] [--jds J] [--page-size P] [--memory]
+'''
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if "--memory" in sys.argv:
+    os.environ["MONGODB_CONNECTION"] = "memory://"
+os.environ.setdefault("DB_NAME", "bench_leaderboard")
+
+from api.endpoints import LEADERBOARD_PROJECTION
+from db.database import add_documents, create_indexes, db_instance, find_documents
+from utils.pagination import after_cursor_descending, encode_cursor
+
+SORT = [("match_score", -1), ("_id", -1)]
+DEPTHS = (1, 10, 100, 1000)
+
+
+def seed(screenings: int, jds: int):
+    rng = random.Random(3)
+    for start in range(0, screenings, 10000):
+        add_documents("screenings", [{"jd_id": f"jd-{rng.randrange(jds)}", "resume_id": f"resume-{i}",
+                                      "match_score": rng.randint(0, 100), "summary": "Solid backend profile.",
+                                      "strengths": ["Python"] * 5, "gaps": ["Go"] * 3}
+                                     for i in range(start, min(start + 10000, screenings))])
+
+
+def page_with_skip(jd_id: str, page: int, page_size: int):
+    collection = db_instance.get_collection("screenings")
+    return list(collection.find({"jd_id": jd_id}, LEADERBOARD_PROJECTION, sort=SORT, skip=page * page_size, limit=page_size))
+
+
+def walk_with_keyset(jd_id: str, pages: int, page_size: int):
+    '''
+        Follows next_cursor `pages` times and returns the latency of each page.
+    '''
+    cursor, latencies = None, []
+    for _ in range(pages):
+        start = time.perf_counter()
+        rows = find_documents("screenings", {"jd_id": jd_id, **after_cursor_descending("match_score", cursor)},
+                              LEADERBOARD_PROJECTION, page_size, SORT)
+        latencies.append(time.perf_counter() - start)
+        if not rows:
+            break
+        cursor = encode_cursor(rows[-1]["match_score"], rows[-1]["_id"])
+    return latencies
+
+
+def winning_plan(jd_id: str, page_size: int) -> str:
+    try:
+        plan = db_instance.get_collection("screenings").find({"jd_id": jd_id}, LEADERBOARD_PROJECTION).sort(SORT).limit(page_size).explain()
+    except Exception as e:
+        return f"unavailable ({e.__class__.__name__})"
+    stages, node = [], plan["queryPlanner"]["winningPlan"]
+    while node:
+        stages.append(node["stage"] + (f"[{node['indexName']}]" if "indexName" in node else ""))
+        node = node.get("inputStage") or node.get("queryPlan")
+    return " <- ".join(stages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--screenings", type=int, default=1_000_000)
+    parser.add_argument("--jds", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--memory", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        create_indexes()
+        start = time.perf_counter()
+        seed(args.screenings, args.jds)
+        print(f"Seeded {args.screenings} screenings over {args.jds} JDs in {time.perf_counter() - start:.1f} s")
+        print(f"Plan: {winning_plan('jd-0', args.page_size)}")
+
+        keyset = walk_with_keyset("jd-0", max(DEPTHS), args.page_size)
+        print(f"{'page':>6} | {'skip/limit ms':>14} | {'keyset ms':>10}")
+        for depth in DEPTHS:
+            if depth > len(keyset):
+                break
+            start = time.perf_counter()
+            page_with_skip("jd-0", depth - 1, args.page_size)
+            skip_ms = (time.perf_counter() - start) * 1000
+            print(f"{depth:>6} | {skip_ms:>14.2f} | {keyset[depth - 1] * 1000:>10.2f}")
+        print(f"Keyset p50 over {len(keyset)} pages: {statistics.median(keyset) * 1000:.2f} ms")
+    finally:
+        db_instance.client.drop_database(os.environ["DB_NAME"])
@@ -0,0 +1,124 @@
+'''
+    Benchmark: packed screening (many resumes per LLM call) vs one call per resume, for one JD.
+    Both modes go through ScreeningAgent and llm_client against a deterministic fake model, so the numbers are
+    reproducible offline: its latency grows with the prompt and response tokens, its scores come from a hash of
+    the resume, and it leaves out every `--drop-every`-th packed candidate from its response to exercise the fallback.
+    Reports model calls, prompt/response tokens, wall time and whether both modes agree on every score.
+
+    Usage: python test/bench_packed_screening.py [--resumes N] [--concurrency C] [--pack-budget TOKENS]
+                                                 [--pack-size K] [--drop-every D] [--time-scale S]
+'''
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+import zlib
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+#The fake model never reaches Gemini or MongoDB
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("MONGODB_CONNECTION", "memory://")
+os.environ["LLM_CACHE_PERSISTENT"] = "false"
+#Both modes share the process-wide LLM scheduler; lift its quotas so they do not skew the second run
+os.environ.setdefault("LLM_RPM", "0")
+os.environ.setdefault("LLM_TPM", "0")
+
+from agents.screening_agent import ScreeningAgent
+from bench_screening_prompt import synthetic_corpus
+from utils.prompt_compaction import estimate_tokens
+
+#Latency model of the fake: fixed overhead + prompt prefill + response decoding (seconds, before --time-scale)
+CALL_OVERHEAD_S = 0.6
+PREFILL_S_PER_TOKEN = 0.00005
+DECODE_S_PER_TOKEN = 0.005
+
+SINGLE_RESUME = re.compile(r"### Candidate Resume Data ###\s*(\{.*?\})\s*---", re.S)
+PACKED_RESUME = re.compile(r"^\s*(c\d+): (\{.*\})$", re.M)
+
+
+def fake_result(resume_json: str) -> dict:
+    name = json.loads(resume_json).get("name", "")
+    score = zlib.crc32(name.encode("utf-8")) % 101
+    return {"match_score": score, "summary": f"{name} covers part of the required stack.",
+            "strengths": ["Hands-on Python services", "Event streaming with Kafka"], "gaps": ["No Kubernetes in production"]}
+
+
+class FakeModel:
+    def __init__(self, time_scale: float, drop_every: int):
+        self.time_scale, self.drop_every = time_scale, drop_every
+        self.calls = self.prompt_tokens = self.response_tokens = self.packed_candidates = 0
+
+    async def generate_content_async(self, prompt: str):
+        packed = PACKED_RESUME.findall(prompt)
+        if packed:
+            results = []
+            for candidate_id, resume_json in packed:
+                self.packed_candidates += 1
+                if not self.drop_every or self.packed_candidates % self.drop_every:
+                    results.append({"candidate_id": candidate_id, **fake_result(resume_json)})
+            text = json.dumps({"results": results})
+        else:
+            text = json.dumps(fake_result(SINGLE_RESUME.search(prompt).group(1)))
+
+        prompt_tokens, response_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.response_tokens += response_tokens
+        await asyncio.sleep((CALL_OVERHEAD_S + prompt_tokens * PREFILL_S_PER_TOKEN + response_tokens * DECODE_S_PER_TOKEN)
+                            * self.time_scale)
+        return SimpleNamespace(text = text, usage_metadata = SimpleNamespace(prompt_token_count = prompt_tokens,
+                                                                             candidates_token_count = response_tokens))
+
+
+async def screen_all(agent: ScreeningAgent, resumes, jd, concurrency: int, packed: bool):
+    '''
+        The same pack/semaphore structure as run_screening_batch, without the MongoDB writes.
+    '''
+    semaphore = asyncio.Semaphore(concurrency)
+    packs = agent.pack_resumes(resumes, jd) if packed else [[resume] for resume in resumes]
+    async def one(pack):
+        async with semaphore:
+            return zip(pack, await agent.screen_packed_async(pack, jd, use_cache = False))
+    results = {}
+    for pack_results in await asyncio.gather(*(one(pack) for pack in packs)):
+        results.update((resume["name"], result) for resume, result in pack_results)
+    return results, len(packs)
+
+
+def run(label: str, args, resumes, jd, packed: bool):
+    agent = ScreeningAgent(pack_token_budget = args.pack_budget, pack_max_size = args.pack_size)
+    agent.model = FakeModel(args.time_scale, args.drop_every if packed else 0)
+    start = time.perf_counter()
+    results, packs = asyncio.run(screen_all(agent, resumes, jd, args.concurrency, packed))
+    seconds = time.perf_counter() - start
+    failed = sum(1 for result in results.values() if "error" in result)
+    print(f" - {label:<7} calls {agent.model.calls:5d} (packs {packs:4d})  prompt tokens {agent.model.prompt_tokens:9d}"
+          f"  response tokens {agent.model.response_tokens:8d}  wall {seconds:7.2f} s  errors {failed}")
+    return results, agent.model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--pack-budget", type=int, default=24000)
+    parser.add_argument("--pack-size", type=int, default=20)
+    parser.add_argument("--drop-every", type=int, default=25, help="Leave out every D-th packed candidate (0 = never).")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="Multiplier on the fake model's latency.")
+    args = parser.parse_args()
+
+    resumes, jd = synthetic_corpus(args.resumes)
+    print(f"{args.resumes} resumes, concurrency {args.concurrency}, pack budget {args.pack_budget} tokens / "
+          f"{args.pack_size} resumes, fake latency x{args.time_scale}")
+    single, single_model = run("single", args, resumes, jd, packed = False)
+    packed, packed_model = run("packed", args, resumes, jd, packed = True)
+
+    agree = all(single[name].get("match_score") == packed[name].get("match_score") for name in single)
+    print(f"Calls saved: {100 * (1 - packed_model.calls / single_model.calls):.1f}%  "
+          f"prompt tokens saved: {100 * (1 - packed_model.prompt_tokens / single_model.prompt_tokens):.1f}%  "
+          f"scores agree: {agree}")
@@ -0,0 +1,79 @@
+'''
+    Benchmark: report rendering throughput, local templates vs the LLM path.
+    Renders synthetic ScreeningResults with the markdown and HTML templates and as one bulk export, and compares
+    them with ReportingAgent.generate_prompt backed by a fake model with a fixed latency (or Gemini with --call-model).
+
+    Usage: python test/bench_report_renderer.py [--reports N] [--latency SECONDS] [--call-model K]
+'''
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if "--call-model" not in sys.argv:
+    #Offline runs never reach Gemini; a placeholder key lets the Agent be constructed
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("LLM_CACHE_PERSISTENT", "false")
+
+from agents.reporting_agent import ReportingAgent
+from utils.report_renderer import render_markdown, render_html, render_bulk
+
+SKILLS = ["Python", "Kafka", "Kubernetes", "SQL", "AWS", "React", "Go", "Terraform"]
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, prompt: str):
+        time.sleep(self.latency)
+        return FakeResponse("# Candidate Screening Report\n\n**Match Score:** 70 / 100\n")
+
+
+def synthetic_screenings(size: int, seed: int = 11):
+    rng = random.Random(seed)
+    return [{"_id": f"screening-{i}", "resume_id": f"resume-{i}", "jd_id": "jd-1", "match_score": rng.randint(10, 95),
+             "summary": f"Candidate {i} has {rng.randint(1, 12)} years of backend experience.",
+             "strengths": [f"Strong {skill} background" for skill in rng.sample(SKILLS, 3)],
+             "gaps": [f"No evidence of {skill}" for skill in rng.sample(SKILLS, 2)]}
+            for i in range(size)]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=1.5)
+    parser.add_argument("--call-model", type=int, default=0)
+    args = parser.parse_args()
+
+    screenings = synthetic_screenings(args.reports)
+    names = {s["resume_id"]: f"Candidate {i}" for i, s in enumerate(screenings)}
+
+    print(f"{args.reports} reports")
+    for label, render in (("template markdown", render_markdown), ("template html", render_html)):
+        elapsed = timed(lambda: [render(s, names[s["resume_id"]]) for s in screenings])
+        print(f" - {label:<18} {elapsed / len(screenings) * 1e6:10.1f} us/report  {len(screenings) / elapsed:12.0f} reports/s")
+    for fmt in ("markdown", "html"):
+        elapsed = timed(render_bulk, screenings, fmt, names)
+        print(f" - bulk {fmt:<13} {elapsed * 1000:10.1f} ms for the whole export")
+
+    agent = ReportingAgent()
+    samples = screenings[:args.call_model] if args.call_model else screenings[:3]
+    if not args.call_model:
+        agent.model = FakeModel(args.latency)
+    elapsed = timed(lambda: [agent.generate_prompt(s, use_cache=False) for s in samples])
+    source = "Gemini" if args.call_model else f"fake model, {args.latency * 1000:.0f} ms latency"
+    print(f" - llm ({source}) {elapsed / len(samples) * 1000:10.1f} ms/report  {len(samples) / elapsed:12.2f} reports/s")
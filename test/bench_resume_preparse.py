@@ -0,0 +1,170 @@
+'''
+    Benchmark: resume parsing with the rule-based pre-parser vs the whole resume sent to the model.
+    Generates resume texts with known contact details and skills, in the heading and list styles resumes use
+    (upper-case or "Title:" headings, markdown, bullets, labelled skill lines, pipes; a share without any heading).
+    Each resume is parsed three ways through ResumeParserAgent on the fake model provider:
+        - llm:      RESUME_PREPARSE off, the whole text goes to the model (the previous behaviour)
+        - preparse: contacts, summary and skills resolved by rules, only the other sections go to the model
+        - fast:     parse_text_fast, no model call at all
+    Reports model calls, prompt/completion tokens per resume, p50/p95 parse latency and how often the pre-parser
+    got each field exactly right. The fake model's latency grows with prompt and response tokens. It answers
+    experience/education with empty lists, so the response-token savings of a real model are understated.
+
+    Usage: python test/bench_resume_preparse.py [--resumes N] [--concurrency C] [--latency-ms MS]
+                                                [--ms-per-prompt-token MS] [--ms-per-output-token MS]
+'''
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_PROVIDER"] = "fake"
+os.environ.setdefault("MONGODB_CONNECTION", "memory://")
+os.environ["LLM_CACHE_PERSISTENT"] = "false"
+os.environ.setdefault("LLM_RPM", "0")
+os.environ.setdefault("LLM_TPM", "0")
+
+from agents.fake_provider import FakeProvider
+from agents.resume_parser import ResumeParserAgent
+
+FIRST_NAMES = ["Aarav", "Maya", "Liam", "Sofia", "Kenji", "Amara", "Noah", "Priya", "Lucas", "Zara", "Omar", "Elena"]
+LAST_NAMES = ["Sharma", "Okafor", "Nguyen", "Garcia", "Tanaka", "Müller", "Silva", "Cohen", "Rossi", "Iyer"]
+SKILLS = ["Python", "Go", "Java", "TypeScript", "SQL", "FastAPI", "Django", "Spring Boot", "React", "PostgreSQL",
+          "MongoDB", "Redis", "Kafka", "Docker", "Kubernetes", "AWS", "GCP", "Terraform", "CI/CD", "PyTorch",
+          "Apache Spark", "Airflow", "GraphQL", "gRPC", "Linux"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises", "Hooli"]
+VERBS = ["Built", "Designed", "Migrated", "Scaled", "Automated", "Led", "Optimised", "Maintained"]
+SYSTEMS = ["the payments API", "a search indexer", "an event pipeline", "the billing service", "a feature store",
+           "the deployment tooling", "an analytics dashboard", "the auth gateway"]
+
+HEADING_STYLES = [str.upper, lambda title: title, lambda title: f"{title}:", lambda title: f"## {title}",
+                  lambda title: f"{title.upper()}:"]
+SECTION_TITLES = {"summary": ["Summary", "Professional Summary", "Profile"],
+                  "skills": ["Skills", "Technical Skills", "Core Competencies"],
+                  "experience": ["Experience", "Work Experience", "Professional Experience"],
+                  "projects": ["Projects", "Personal Projects"],
+                  "education": ["Education", "Academic Background"],
+                  "other": ["Certifications", "Achievements"]}
+
+
+def skills_lines(rng: random.Random, skills) -> list:
+    style = rng.randrange(4)
+    if style == 0:
+        return [", ".join(skills)]
+    if style == 1:
+        return [f"• {skill}" for skill in skills]
+    if style == 2:
+        half = len(skills) // 2
+        return [f"Languages & Frameworks: {', '.join(skills[:half])}", f"Tools: {', '.join(skills[half:])}"]
+    return [" | ".join(skills)]
+
+
+def synthetic_resume(rng: random.Random, i: int) -> dict:
+    '''
+        One resume text and the fields a parser should find in it.
+    '''
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = f"{name.split()[0].lower()}.{i}@example.com"
+    phone = f"+1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}"
+    skills = rng.sample(SKILLS, rng.randint(5, 12))
+    heading = rng.choice(HEADING_STYLES)
+    title = lambda kind: heading(rng.choice(SECTION_TITLES[kind]))
+
+    lines = [name, f"{email} | {phone} | linkedin.com/in/{name.split()[0].lower()}{i}"]
+    has_headings = rng.random() > 0.1
+    summary = f"Engineer with {rng.randint(2, 15)} years of experience building {rng.choice(SYSTEMS)}."
+    if has_headings:
+        lines += [title("summary"), summary, title("skills"), *skills_lines(rng, skills), title("experience")]
+    else:
+        lines += [summary, "Skills: " + ", ".join(skills)]
+    for _ in range(rng.randint(2, 4)):
+        lines.append(f"Software Engineer, {rng.choice(COMPANIES)} ({rng.randint(2012, 2020)} - Present)")
+        lines += [f"- {rng.choice(VERBS)} {rng.choice(SYSTEMS)} with {rng.choice(skills)}, serving "
+                  f"{rng.randint(2, 900)}k requests per day." for _ in range(rng.randint(3, 6))]
+    if has_headings:
+        lines.append(title("projects"))
+    lines += [f"- {rng.choice(VERBS)} {rng.choice(SYSTEMS)} as a side project in {rng.choice(skills)}." for _ in range(3)]
+    if has_headings:
+        lines.append(title("education"))
+    lines.append(f"B.Tech Computer Science, State University, {rng.randint(2008, 2018)}, {rng.randint(70, 95)}%")
+    if has_headings and rng.random() < 0.5:
+        lines += [title("other"), "AWS Certified Solutions Architect"]
+    return {"text": "\n".join(lines), "name": name, "email": email, "phone": phone, "skills": skills,
+            "has_headings": has_headings}
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))]
+
+
+async def parse_all(agent: ResumeParserAgent, corpus, concurrency: int, fast: bool):
+    semaphore = asyncio.Semaphore(concurrency)
+    async def one(resume):
+        async with semaphore:
+            start = time.perf_counter()
+            result = agent.parse_text_fast(resume["text"]) if fast else await agent.parse_text_async(resume["text"], use_cache = False)
+            return result, time.perf_counter() - start
+    return await asyncio.gather(*(one(resume) for resume in corpus))
+
+
+def field_accuracy(corpus, results) -> dict:
+    '''
+        Share of resumes whose field the parse got exactly right, among the resumes where the rules resolved it.
+    '''
+    accuracy = {}
+    for field in ("name", "email", "phone", "skills"):
+        resolved = [(resume, result) for resume, (result, _) in zip(corpus, results)
+                    if field in result.get("preparse", {}).get("resolved_fields", [])
+                    or (result.get("parse_mode") == "fast" and field not in result["unresolved_fields"])]
+        correct = sum(1 for resume, result in resolved if result[field] == resume[field])
+        accuracy[field] = (correct, len(resolved))
+    return accuracy
+
+
+def run(label: str, args, corpus, preparse: bool, fast: bool = False):
+    provider = FakeProvider(latency_ms = args.latency_ms, jitter_ms = 0, ms_per_prompt_token = args.ms_per_prompt_token,
+                            ms_per_output_token = args.ms_per_output_token)
+    agent = ResumeParserAgent(preparse = preparse, provider = provider)
+    start = time.perf_counter()
+    results = asyncio.run(parse_all(agent, corpus, args.concurrency, fast))
+    seconds = time.perf_counter() - start
+    latencies = [latency for _, latency in results]
+    counters = provider.counters
+    print(f" - {label:<9} calls {counters['calls']:5d}  prompt tokens/resume {counters['prompt_tokens'] / len(corpus):7.1f}"
+          f"  completion tokens/resume {counters['completion_tokens'] / len(corpus):6.1f}"
+          f"  p50 {percentile(latencies, 50) * 1000:8.2f} ms  p95 {percentile(latencies, 95) * 1000:8.2f} ms  wall {seconds:6.2f} s")
+    return results, counters, latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=300, help="Fixed latency of a fake model call.")
+    parser.add_argument("--ms-per-prompt-token", type=float, default=0.05, help="Fake prefill time per prompt token.")
+    parser.add_argument("--ms-per-output-token", type=float, default=5, help="Fake decoding time per output token.")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [synthetic_resume(rng, i) for i in range(args.resumes)]
+    print(f"{args.resumes} resumes ({sum(not r['has_headings'] for r in corpus)} without section headings), "
+          f"concurrency {args.concurrency}, fake model {args.latency_ms:.0f} ms + {args.ms_per_prompt_token} ms/prompt token "
+          f"+ {args.ms_per_output_token} ms/output token")
+    _, llm_counters, llm_latencies = run("llm", args, corpus, preparse = False)
+    preparsed, pre_counters, pre_latencies = run("preparse", args, corpus, preparse = True)
+    fast, _, _ = run("fast", args, corpus, preparse = True, fast = True)
+
+    counts = {outcome: sum(1 for result, _ in preparsed if result["preparse"]["outcome"] == outcome)
+              for outcome in ("skipped_llm", "reduced", "full")}
+    print(f"Pre-parser outcomes: {counts}")
+    print(f"Prompt tokens saved: {100 * (1 - pre_counters['prompt_tokens'] / llm_counters['prompt_tokens']):.1f}%  "
+          f"completion tokens saved: {100 * (1 - pre_counters['completion_tokens'] / llm_counters['completion_tokens']):.1f}%  "
+          f"p95 latency: {percentile(llm_latencies, 95) * 1000:.1f} -> {percentile(pre_latencies, 95) * 1000:.1f} ms")
+    for label, results in (("preparse", preparsed), ("fast", fast)):
+        accuracy = field_accuracy(corpus, results)
+        print(f"Rule accuracy ({label}): " + "  ".join(f"{field} {correct}/{total}" for field, (correct, total) in accuracy.items()))
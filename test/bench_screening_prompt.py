@@ -0,0 +1,116 @@
+'''
+    Benchmark: screening prompt size before and after compact, token-budgeted serialization.
+    Builds the old prompt (full `json.dumps(..., indent=2)`) and the new one for every resume in the corpus
+    against one JD and reports estimated prompt tokens. With --call-model it also sends both prompts for the
+    first few resumes to Gemini and reports the billed prompt tokens and the latency.
+
+    Usage:
+        python test/bench_screening_prompt.py [--jd-id ID] [--limit N] [--budget TOKENS] [--call-model K]
+        python test/bench_screening_prompt.py --synthetic 200       (offline corpus, no MongoDB needed)
+'''
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if "--synthetic" in sys.argv:
+    #Offline runs never call the model; a placeholder key lets the Agent be constructed
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from agents.resume_parser import ParsedResume, ParsedJD
+from agents.screening_agent import ScreeningAgent
+from utils.prompt_compaction import compact_json, estimate_tokens
+
+SKILLS = ["Python", "Java", "Go", "React", "Docker", "Kubernetes", "AWS", "SQL", "PyTorch", "TensorFlow",
+          "Spark", "Kafka", "Redis", "GraphQL", "C++", "Rust", "Terraform", "Airflow", "Pandas", "FastAPI"]
+VERBS = ["Built", "Designed", "Led", "Optimized", "Migrated", "Maintained", "Automated", "Scaled"]
+
+
+def synthetic_corpus(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    def bullets():
+        return [f"{rng.choice(VERBS)} a {rng.choice(SKILLS)} and {rng.choice(SKILLS)} service handling "
+                f"{rng.randint(1, 900)}k requests per day for the {rng.choice(['billing', 'search', 'ads', 'risk'])} team"
+                for _ in range(rng.randint(3, 9))]
+    resumes = [{"name": f"Candidate {i}", "email": None, "phone": "", "summary": "Engineer. " * rng.randint(5, 40),
+                "work_experience": [{"title": "Software Engineer", "company": f"Company {j}", "start_date": "2018",
+                                     "end_date": None, "responsibilities": bullets()} for j in range(rng.randint(1, 5))],
+                "projects": [{"title": None, "responsibilities": bullets()} for _ in range(rng.randint(0, 6))],
+                "education": [{"degree": "B.Tech", "institution": "IIT", "year_of_completion": "2017", "grade": None}],
+                "skills": rng.sample(SKILLS, rng.randint(4, 15))}
+               for i in range(size)]
+    jd = {"job_title": "Backend Engineer",
+          "required_skills": [{"skill": "Python", "level": "Expert"}, {"skill": "Kafka", "level": "Proficient"}],
+          "preferred_skills": [{"skill": "Kubernetes", "level": "Familiar"}],
+          "required_years_of_experience": 3, "education_requirements": "B.Tech"}
+    return resumes, jd
+
+
+def stored_corpus(jd_id, limit):
+    from db.database import get_document, find_documents
+    jd = get_document("jds", jd_id) if jd_id else next(iter(find_documents("jds", {}, limit=1)), None)
+    if jd is None:
+        sys.exit("No JD found; pass --jd-id or use --synthetic")
+    return find_documents("resumes", {}, limit=limit), jd
+
+
+def legacy_prompt(agent: ScreeningAgent, resume: dict, jd: dict) -> str:
+    '''
+        The prompt as it was built before compaction: full, indented JSON including empty fields.
+    '''
+    resume_json, jd_json = ParsedResume(**resume).dict(), ParsedJD(**jd).dict()
+    prompt = agent._build_prompt(resume_json, jd_json)
+    return (prompt.replace(compact_json(resume_json), json.dumps(resume_json, indent=2))
+                  .replace(compact_json(jd_json), json.dumps(jd_json, indent=2)))
+
+
+def call_model(agent: ScreeningAgent, prompt: str):
+    start = time.perf_counter()
+    response = agent.model.generate_content(prompt)
+    return response.usage_metadata.prompt_token_count, (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jd-id")
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--budget", type=int, default=None)
+    parser.add_argument("--synthetic", type=int, default=0)
+    parser.add_argument("--call-model", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        resumes, jd = synthetic_corpus(args.synthetic)
+    else:
+        resumes, jd = stored_corpus(args.jd_id, args.limit)
+
+    agent = ScreeningAgent() if args.budget is None else ScreeningAgent(prompt_token_budget=args.budget)
+    before, after, trimmed, build_ms = [], [], [], []
+    for resume in resumes:
+        before.append(estimate_tokens(legacy_prompt(agent, resume, jd)))
+        start = time.perf_counter()
+        prompt, stats = agent._screening_prompt(resume, jd)
+        build_ms.append((time.perf_counter() - start) * 1000)
+        after.append(stats["prompt_tokens"])
+        trimmed.append(stats["prompt_trimmed_items"])
+
+    print(f"{len(resumes)} resumes, budget {agent.prompt_token_budget} tokens (estimated at 4 chars/token)")
+    for label, values in (("before", before), ("after", after)):
+        print(f" - {label:<7} mean {statistics.mean(values):8.0f}  p95 {sorted(values)[int(len(values) * 0.95) - 1]:8.0f}"
+              f"  max {max(values):8.0f}  total {sum(values):10.0f}")
+    print(f"Prompt tokens saved: {100 * (1 - sum(after) / sum(before)):.1f}%  "
+          f"(resumes trimmed to fit the budget: {sum(1 for t in trimmed if t)})")
+    print(f"Serialization + trimming: {statistics.mean(build_ms):.3f} ms per resume")
+
+    if args.call_model:
+        samples = {"before": [], "after": []}
+        for resume in resumes[:args.call_model]:
+            samples["before"].append(call_model(agent, legacy_prompt(agent, resume, jd)))
+            samples["after"].append(call_model(agent, agent._screening_prompt(resume, jd)[0]))
+        for label, values in samples.items():
+            print(f" - {label:<7} billed prompt tokens {statistics.mean(t for t, _ in values):8.0f}"
+                  f"  latency p50 {statistics.median(ms for _, ms in values):8.0f} ms")
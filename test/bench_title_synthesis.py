@@ -0,0 +1,85 @@
+'''
+    Benchmark: model calls and latency per resume for project-title synthesis.
+    Compares the old one-call-per-untitled-project loop with the batched title call and with the
+    opt-in mode that folds the titles into the extraction prompt (RESUME_TITLES_IN_EXTRACTION).
+    The Gemini model is replaced by a fake with a fixed latency, so no API key or network is needed.
+
+    Usage: python test/bench_title_synthesis.py [model_latency_seconds]
+'''
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("LLM_CACHE_PERSISTENT", "false")
+
+from agents.resume_parser import ResumeParserAgent, ParsedResume
+
+UNTITLED_PROJECTS = (0, 2, 4, 8)
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    '''
+        Answers the extraction, batched-title and single-title prompts after a fixed latency, counting calls.
+    '''
+    def __init__(self, latency: float, projects: int):
+        self.latency = latency
+        self.projects = projects
+        self.calls = 0
+
+    def generate_content(self, prompt: str):
+        self.calls += 1
+        time.sleep(self.latency)
+        if "expert AI resume parser" in prompt:
+            titled = "If a project has no explicit title" in prompt
+            return FakeResponse(json.dumps({"name": "Jane Doe", "skills": ["Python"], "projects": [
+                {"title": f"Generated Title {i}" if titled else None, "responsibilities": [f"Built system {i}"]}
+                for i in range(self.projects)]}))
+        if '"titles"' in prompt:
+            count = len(re.findall(r'"index": \d+', prompt.split("**Projects:**")[1]))
+            return FakeResponse(json.dumps({"titles": [{"index": i, "title": f"Batched Title {i}"} for i in range(count)]}))
+        return FakeResponse("Single Project Title")
+
+
+def parse_one_call_per_project(agent: ResumeParserAgent, raw_text: str) -> dict:
+    '''
+        The pre-batching post-processing loop: one title call per untitled project.
+    '''
+    parsed_data = ParsedResume(**json.loads(agent.model.generate_content(agent._build_prompt(raw_text)).text))
+    for project in parsed_data.projects:
+        if not project.title and project.responsibilities:
+            project.title = agent._synthesize_title(project.responsibilities, use_cache=False)
+    return parsed_data.model_dump()
+
+
+def run(mode: str, projects: int, latency: float):
+    agent = ResumeParserAgent(titles_in_extraction=(mode == "in-extraction"))
+    agent.model = FakeModel(latency, projects)
+    start = time.perf_counter()
+    if mode == "per-project":
+        result = parse_one_call_per_project(agent, "resume text")
+    else:
+        result = agent.parse_text("resume text", use_cache=False)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    assert all(project["title"] for project in result["projects"]), result
+    return agent.model.calls, elapsed_ms
+
+
+if __name__ == "__main__":
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    print(f"Fake model latency {latency * 1000:.0f} ms")
+    print(f"{'untitled':>8} | {'per-project (before)':>22} | {'batched':>18} | {'in-extraction':>18}")
+    for projects in UNTITLED_PROJECTS:
+        cells = []
+        for mode in ("per-project", "batched", "in-extraction"):
+            calls, elapsed_ms = run(mode, projects, latency)
+            cells.append(f"{calls:>2} calls {elapsed_ms:>7.0f} ms")
+        print(f"{projects:>8} | {cells[0]:>22} | {cells[1]:>18} | {cells[2]:>18}")
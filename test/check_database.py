@@ -0,0 +1,75 @@
+'''
+    Check: runs every data-layer helper (sync and async) against the in-memory store and asserts the results,
+    so db/database.py can be exercised without a MongoDB server. Needs mongomock.
+
+    Usage: python test/check_database.py
+'''
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["MONGODB_CONNECTION"] = "memory://"
+os.environ.setdefault("DB_NAME", "check_database")
+os.environ.setdefault("VECTOR_INDEX_DIR", tempfile.mkdtemp(prefix = "check_database_"))
+
+from db.operations import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from db import database as db
+
+
+def check_sync():
+    db.create_indexes()
+    resume_id = db.add_document("resumes", {"name": "Jane", "skills": ["Python"], "summary": "x" * 1000, "content_hash": "a"})
+    assert db.get_document("resumes", resume_id)["summary"] == "x" * 1000
+    assert db.get_document("resumes", resume_id, {"name": 1}) == {"_id": resume_id, "name": "Jane"}
+    assert db.find_document("resumes", {"content_hash": "a"}, {"_id": 1}) == {"_id": resume_id}
+    assert db.get_document("resumes", "not-an-id") is None
+
+    try:
+        db.add_document("resumes", {"name": "Copy", "content_hash": "a"})
+        raise AssertionError("content_hash must be unique")
+    except DuplicateKeyError:
+        pass
+
+    ids = db.add_documents("resumes", [{"name": f"R{i}", "skills": ["Go"], "content_hash": f"h{i}"} for i in range(5)])
+    assert len(ids) == 5 and db.count_documents("resumes", {}) == 6
+    assert [doc["name"] for doc in db.get_documents("resumes", ids[:2], {"name": 1})] == ["R0", "R1"]
+    assert len(db.find_documents("resumes", {"normalized_skills": "go"}, {"_id": 1}, limit = 3)) == 3
+    try:
+        db.add_documents("resumes", [{"name": "New", "content_hash": "new"}, {"name": "Dup", "content_hash": "h0"}])
+        raise AssertionError("insert_many must report the duplicate")
+    except BulkWriteError:
+        assert db.count_documents("resumes", {"content_hash": "new"}) == 1
+
+    counts = db.bulk_write_documents("screenings", [InsertOne({"resume_id": resume_id, "match_score": 10}),
+                                                    UpdateOne({"resume_id": "r2"}, {"$set": {"match_score": 70}}, upsert = True)])
+    assert counts["inserted"] == 1 and counts["upserted"] == 1
+    assert db.update_document("resumes", resume_id, {"$set": {"name": "Jane Doe"}})
+    assert db.find_and_update_document("resumes", {"_id": db.ObjectId(resume_id)}, {"$set": {"seen": True}})["seen"]
+    print("sync helpers: ok")
+
+
+async def check_async():
+    jd_id = await db.add_document_async("jds", {"job_title": "Backend", "required_skills": []})
+    assert (await db.get_document_async("jds", jd_id, {"job_title": 1})) == {"_id": jd_id, "job_title": "Backend"}
+    ids = await db.add_documents_async("screenings", [{"jd_id": jd_id, "match_score": score} for score in (30, 60, 90)])
+    assert len(await db.get_documents_async("screenings", ids)) == 3
+    assert len(await db.find_documents_async("screenings", {"jd_id": jd_id}, {"match_score": 1})) == 3
+    assert await db.count_documents_async("screenings", {"jd_id": jd_id}) == 3
+    assert (await db.find_document_async("screenings", {"match_score": 90}, {"_id": 1}))["_id"] == ids[2]
+    assert await db.update_document_async("screenings", ids[0], {"$set": {"match_score": 35}})
+    updated = await db.find_and_update_document_async("screenings", {"match_score": 35}, {"$inc": {"match_score": 1}})
+    assert updated["match_score"] == 36
+    counts = await db.bulk_write_documents_async("screenings", [UpdateOne({"jd_id": jd_id}, {"$set": {"seen": True}})])
+    assert counts["modified"] == 1
+    #The sync and async clients share one store, like they share one server
+    assert db.get_document("jds", jd_id)["job_title"] == "Backend"
+    print("async helpers: ok")
+
+
+if __name__ == "__main__":
+    check_sync()
+    asyncio.run(check_async())
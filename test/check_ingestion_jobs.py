@@ -0,0 +1,80 @@
+'''
+    Check: an ingestion job whose parse outlives INGEST_LEASE_SECONDS keeps its lease (the heartbeat renews it), so
+    the reaper does not requeue it and the resume is parsed once; and a worker whose job was requeued and claimed
+    again cannot finish it. Uses a stub parser and the in-memory MongoDB; takes a few seconds.
+
+    Usage: python test/check_ingestion_jobs.py
+'''
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["MONGODB_CONNECTION"] = "memory://"
+os.environ["INGEST_LEASE_SECONDS"] = "1"
+
+from api.ingestion_jobs import IngestionQueue, _job
+from db.database import find_document_async, find_and_update_document_async
+
+
+class SlowParser:
+    parser_version = "check"
+
+    def __init__(self, parse_seconds: float):
+        self.parse_seconds, self.parses = parse_seconds, 0
+
+    def extract_text(self, filename: str, path: str):
+        return "Resume text", {"seconds": 0.0, "pages": []}
+
+    async def parse_text_async(self, raw_text: str, use_cache: bool = True) -> dict:
+        self.parses += 1
+        await asyncio.sleep(self.parse_seconds)
+        return {"name": f"Candidate {self.parses}", "skills": []}
+
+
+def spooled_file() -> str:
+    handle, path = tempfile.mkstemp(suffix = ".txt")
+    os.close(handle)
+    return path
+
+
+async def wait_finished(job_id: str) -> dict:
+    while True:
+        job = await find_document_async("jobs", _job(job_id))
+        if job["status"] in ("completed", "failed"):
+            return job
+        await asyncio.sleep(0.05)
+
+
+async def check_long_parse_keeps_lease():
+    parser = SlowParser(parse_seconds = 3.5)
+    queue = IngestionQueue(lambda: parser, workers = 2)
+    await queue.start()
+    try:
+        job_id = await queue.submit("resume.txt", spooled_file(), "hash-long-parse", use_cache = False)
+        job = await asyncio.wait_for(wait_finished(job_id), timeout = 20)
+    finally:
+        await queue.stop()
+    assert job["status"] == "completed" and job["attempts"] == 1, job
+    assert parser.parses == 1 and queue.counters["retried"] == 0, "a parse longer than the lease must not run twice"
+    print(f"long parse keeps its lease: ok ({parser.parse_seconds} s parse, 1 s lease)")
+
+
+async def check_requeued_job_not_finished_twice():
+    parser = SlowParser(parse_seconds = 0.5)
+    queue = IngestionQueue(lambda: parser, workers = 1)
+    job_id = await queue.submit("resume.txt", spooled_file(), "hash-requeued", use_cache = False)
+    job = await find_and_update_document_async("jobs", _job(job_id, status = "queued"),
+                                               {"$set": {"status": "running"}, "$inc": {"attempts": 1}})
+    #Another process claims the job again while this worker still runs its first claim
+    await find_and_update_document_async("jobs", _job(job_id), {"$inc": {"attempts": 1}})
+    await queue._finish(job, "completed", resume_id = "stale")
+    stored = await find_document_async("jobs", _job(job_id))
+    assert stored["status"] == "running" and queue.counters["completed"] == 0, "a stale claim must not finish the job"
+    print("stale claim cannot finish the job: ok")
+
+
+if __name__ == "__main__":
+    asyncio.run(check_long_parse_keeps_lease())
+    asyncio.run(check_requeued_job_not_finished_twice())
@@ -0,0 +1,90 @@
+'''
+    Check: the LLM response cache only keeps responses the Agent validated. Drives the JD analyzer and the
+    screening Agent with a scripted model and asserts that an invalid or truncated answer is not cached (the next
+    call reaches the model again), a valid one is, and an invalid entry already in the cache is dropped and asked
+    for again. No Gemini key or MongoDB server needed.
+
+    Usage: python test/check_llm_cache.py
+'''
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_PROVIDER"] = "fake"
+os.environ.setdefault("MONGODB_CONNECTION", "memory://")
+os.environ["LLM_CACHE_PERSISTENT"] = "false"
+os.environ.setdefault("LLM_RPM", "0")
+os.environ.setdefault("LLM_TPM", "0")
+
+from agents.jd_analyzer import JDAnalyzerAgent
+from agents.llm_client import llm_cache
+from agents.screening_agent import ScreeningAgent
+
+VALID_JD = json.dumps({"job_title": "Backend Engineer", "required_skills": [{"skill": "Python", "level": "Proficient"}],
+                       "preferred_skills": [], "required_years_of_experience": 3, "education_requirements": None})
+JD_TEXT = "Backend Engineer\nRequired: Python\n3+ years of experience"
+
+
+class ScriptedModel:
+    '''
+        Answers each call with the next text of `texts` and counts the calls.
+    '''
+    def __init__(self, *texts: str):
+        self.texts, self.calls = list(texts), 0
+
+    def _response(self):
+        text = self.texts[min(self.calls, len(self.texts) - 1)]
+        self.calls += 1
+        return SimpleNamespace(text = text, usage_metadata = SimpleNamespace(prompt_token_count = 10, candidates_token_count = 10))
+
+    def generate_content(self, prompt: str):
+        return self._response()
+
+    async def generate_content_async(self, prompt: str):
+        return self._response()
+
+
+def check_invalid_not_cached():
+    llm_cache.clear()
+    agent = JDAnalyzerAgent()
+    agent.model = ScriptedModel(VALID_JD[:40], VALID_JD)
+    assert "error" in agent.parse_jd(JD_TEXT), "a truncated response must fail validation"
+    assert llm_cache.stats()["entries"] == 0, "a response that failed validation must not be cached"
+    assert agent.parse_jd(JD_TEXT)["job_title"] == "Backend Engineer" and agent.model.calls == 2
+    assert agent.parse_jd(JD_TEXT)["job_title"] == "Backend Engineer" and agent.model.calls == 2, "a valid response is cached"
+    print("invalid responses not cached: ok")
+
+
+def check_invalid_entry_dropped():
+    llm_cache.clear()
+    agent = JDAnalyzerAgent()
+    agent.model = ScriptedModel(VALID_JD)
+    key = llm_cache.make_key(agent.model_name, agent.generation_config, agent.build_prompt(JD_TEXT))
+    llm_cache.set(key, '{"job_title": ', agent.model_name)
+    assert agent.parse_jd(JD_TEXT)["job_title"] == "Backend Engineer" and agent.model.calls == 1
+    assert llm_cache.get(key) == VALID_JD, "the invalid entry must be replaced by the valid response"
+    print("invalid cached entry dropped: ok")
+
+
+async def check_incomplete_pack_not_cached():
+    llm_cache.clear()
+    agent = ScreeningAgent()
+    jd = json.loads(VALID_JD)
+    resumes = [{"name": f"Candidate {i}", "skills": ["Python"], "work_experience": [], "projects": [], "education": []}
+               for i in range(3)]
+    result = {"match_score": 80, "summary": "Fits.", "strengths": ["Python"], "gaps": []}
+    partial = json.dumps({"results": [{"candidate_id": "c1", **result}, {"candidate_id": "c2", **result}]})
+    agent.model = ScriptedModel(partial, json.dumps(result))
+    results = await agent.screen_packed_async(resumes, jd)
+    assert all(r["match_score"] == 80 for r in results) and agent.model.calls == 2, "c3 falls back to its own call"
+    assert llm_cache.stats()["entries"] == 1, "only the single-candidate response is cached, not the incomplete pack"
+    print("incomplete pack not cached: ok")
+
+
+if __name__ == "__main__":
+    check_invalid_not_cached()
+    check_invalid_entry_dropped()
+    asyncio.run(check_incomplete_pack_not_cached())
@@ -0,0 +1,191 @@
+'''
+    Check: drives llm_client and the LLM scheduler with a fake model that injects 429s, 5xx errors and load-dependent
+    latency, and asserts the retries, the RPM/TPM buckets, the priority classes, the adaptive concurrency limit and
+    the blocking (thread) path. No Gemini key or MongoDB server needed; takes about 15 seconds.
+
+    Usage: python test/check_llm_scheduler.py
+'''
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGODB_CONNECTION", "memory://")
+os.environ["LLM_CACHE_PERSISTENT"] = "false"
+os.environ["LLM_BACKOFF_BASE_SECONDS"] = "0.01"
+os.environ["LLM_BACKOFF_MAX_SECONDS"] = "0.2"
+os.environ["LLM_MAX_RETRIES"] = "6"
+
+from google.api_core import exceptions as google_exceptions
+
+from agents import llm_client
+from utils.llm_scheduler import LLMScheduler, llm_priority
+
+
+class FakeModel:
+    '''
+        `latency(in_flight)` seconds per call; `fail(in_flight)` returns an exception to raise instead of answering.
+    '''
+    def __init__(self, latency = lambda in_flight: 0.01, fail = lambda in_flight: None, billed_tokens = None):
+        self.latency, self.fail, self.billed_tokens = latency, fail, billed_tokens
+        self.in_flight = self.max_in_flight = self.attempts = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.attempts += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return self.in_flight
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _response(self, prompt: str):
+        billed = self.billed_tokens or len(prompt) // 4
+        return SimpleNamespace(text = "ok", usage_metadata = SimpleNamespace(prompt_token_count = billed, candidates_token_count = 0))
+
+    async def generate_content_async(self, prompt: str):
+        in_flight = self._enter()
+        try:
+            await asyncio.sleep(self.latency(in_flight))
+            error = self.fail(in_flight)
+            if error:
+                raise error
+            return self._response(prompt)
+        finally:
+            self._exit()
+
+    def generate_content(self, prompt: str):
+        in_flight = self._enter()
+        try:
+            time.sleep(self.latency(in_flight))
+            error = self.fail(in_flight)
+            if error:
+                raise error
+            return self._response(prompt)
+        finally:
+            self._exit()
+
+
+class FakeAgent:
+    model_name = "fake-model"
+    generation_config = {}
+
+    def __init__(self, model: FakeModel):
+        self.model = model
+
+
+def use_scheduler(**options) -> LLMScheduler:
+    defaults = {"rpm": 0, "tpm": 0, "initial_concurrency": 8, "min_concurrency": 1, "max_concurrency": 64}
+    llm_client.llm_scheduler = LLMScheduler(**{**defaults, **options})
+    return llm_client.llm_scheduler
+
+
+async def call_many(agent: FakeAgent, count: int, prompt: str = "prompt"):
+    #Distinct prompts, so the response cache never answers
+    return await asyncio.gather(*(llm_client.generate_text_async(agent, f"{prompt} {i} {random.random()}", use_cache = False)
+                                  for i in range(count)), return_exceptions = True)
+
+
+async def check_retries():
+    rng = random.Random(1)
+    scheduler = use_scheduler(initial_concurrency = 16)
+    model = FakeModel(fail = lambda _: google_exceptions.ResourceExhausted("quota") if rng.random() < 0.3 else None)
+    results = await call_many(FakeAgent(model), 200)
+    assert all(result == "ok" for result in results), [r for r in results if r != "ok"][:3]
+    stats = scheduler.stats()
+    assert model.attempts > 200 and stats["throttled"] == model.attempts - 200
+    assert stats["concurrency_limit"] < 16, "429s must shrink the concurrency limit"
+
+    model = FakeModel(fail = lambda _: google_exceptions.ServiceUnavailable("overloaded") if rng.random() < 0.3 else None)
+    assert all(result == "ok" for result in await call_many(FakeAgent(model), 100))
+
+    use_scheduler()
+    model = FakeModel(fail = lambda _: ValueError("bad request"))
+    results = await call_many(FakeAgent(model), 5)
+    assert all(isinstance(result, ValueError) for result in results) and model.attempts == 5, "no retry on other errors"
+    model = FakeModel(fail = lambda _: google_exceptions.ResourceExhausted("quota"))
+    results = await call_many(FakeAgent(model), 2)
+    assert all(isinstance(result, google_exceptions.ResourceExhausted) for result in results)
+    assert model.attempts == 2 * (1 + llm_client.LLM_MAX_RETRIES), "retries are bounded"
+    print(f"retries: ok (429 -> limit {stats['concurrency_limit']}, {stats['throttled']} throttled attempts retried)")
+
+
+async def check_rate_buckets():
+    #A minute's worth of burst, then the refill rate (2 requests/s)
+    use_scheduler(rpm = 120, initial_concurrency = 64, max_concurrency = 64)
+    start = time.perf_counter()
+    await call_many(FakeAgent(FakeModel(latency = lambda _: 0)), 130)
+    rpm_seconds = time.perf_counter() - start
+    assert 4.5 <= rpm_seconds <= 6.5, rpm_seconds
+
+    #Prompts of ~10k estimated tokens against 600k TPM: 60 at once, then one per second
+    use_scheduler(tpm = 600_000, initial_concurrency = 64, max_concurrency = 64)
+    start = time.perf_counter()
+    await call_many(FakeAgent(FakeModel(latency = lambda _: 0)), 63, prompt = "x" * 40_000)
+    tpm_seconds = time.perf_counter() - start
+    assert 2.5 <= tpm_seconds <= 4.5, tpm_seconds
+    print(f"rate buckets: ok (130 calls at 120 RPM in {rpm_seconds:.1f} s, 63 x 10k tokens at 600k TPM in {tpm_seconds:.1f} s)")
+
+
+async def check_priorities():
+    use_scheduler(initial_concurrency = 2, min_concurrency = 2, max_concurrency = 2)
+    agent, finished = FakeAgent(FakeModel(latency = lambda _: 0.05)), []
+
+    async def call(label: str, priority: str, i: int):
+        with llm_priority(priority):
+            await llm_client.generate_text_async(agent, f"{label} {i} {random.random()}", use_cache = False)
+        finished.append(label)
+
+    bulk = [asyncio.ensure_future(call("bulk", "bulk", i)) for i in range(20)]
+    await asyncio.sleep(0.01)
+    interactive = [asyncio.ensure_future(call("interactive", "interactive", i)) for i in range(3)]
+    batch = [asyncio.ensure_future(call("batch", "batch", i)) for i in range(3)]
+    await asyncio.gather(*bulk, *interactive, *batch)
+    #The two bulk calls already running finish first, then every interactive call, then batch, then the rest of bulk
+    assert finished[2:5] == ["interactive"] * 3 and finished[5:8] == ["batch"] * 3, finished[:10]
+    print("priorities: ok (interactive and batch calls overtake 18 queued bulk calls)")
+
+
+async def check_adaptive_concurrency():
+    #The fake server has 8 "cores": past 8 calls in flight, every call slows down proportionally
+    scheduler = use_scheduler(initial_concurrency = 2, max_concurrency = 64)
+    model = FakeModel(latency = lambda in_flight: 0.02 * max(1.0, in_flight / 8))
+    await call_many(FakeAgent(model), 1500)
+    latency_limit = scheduler.stats()["concurrency_limit"]
+    assert 6 <= latency_limit <= 24, latency_limit
+
+    #The fake API throttles past 12 calls in flight
+    scheduler = use_scheduler(initial_concurrency = 32, max_concurrency = 64)
+    model = FakeModel(fail = lambda in_flight: google_exceptions.TooManyRequests("slow down") if in_flight > 12 else None)
+    assert all(result == "ok" for result in await call_many(FakeAgent(model), 1000))
+    throttle_limit = scheduler.stats()["concurrency_limit"]
+    assert throttle_limit <= 14, throttle_limit
+    print(f"adaptive concurrency: ok (latency-bound limit {latency_limit} for 8 fake cores, throttle-bound limit {throttle_limit} for a 12-call quota)")
+
+
+def check_blocking_path():
+    use_scheduler(initial_concurrency = 3, min_concurrency = 3, max_concurrency = 3)
+    model = FakeModel(latency = lambda _: 0.02)
+    agent = FakeAgent(model)
+    threads = [threading.Thread(target = llm_client.generate_text, args = (agent, f"sync {i}", False)) for i in range(30)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert model.attempts == 30 and model.max_in_flight == 3, model.max_in_flight
+    print("blocking path: ok (30 threads, never more than 3 calls in flight)")
+
+
+if __name__ == "__main__":
+    asyncio.run(check_retries())
+    asyncio.run(check_rate_buckets())
+    asyncio.run(check_priorities())
+    asyncio.run(check_adaptive_concurrency())
+    check_blocking_path()
@@ -0,0 +1,49 @@
+'''
+    Check: a PDF page whose OCR fails keeps its text layer and is marked with "ocr_error" in the timings, and the
+    text of the other pages is still returned, for both the inline (one scanned page) and the process pool (several)
+    OCR paths. Tesseract is replaced by a function that raises, so the tesseract binary is not needed.
+
+    Usage: python test/check_pdf_extraction.py
+'''
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+import pytesseract
+
+from utils import file_handler
+
+TEXT = "Jane Doe\njane@example.com\nSenior Backend Engineer with eight years of Python, Go and Kubernetes."
+
+
+def failing_ocr(image):
+    raise pytesseract.TesseractNotFoundError()
+
+
+def mixed_pdf(blank_pages: int) -> bytes:
+    '''
+        One page with a text layer followed by `blank_pages` pages without one (they go to OCR).
+    '''
+    document = fitz.open()
+    document.new_page().insert_text((72, 72), TEXT, fontsize = 11)
+    for _ in range(blank_pages):
+        document.new_page()
+    return document.tobytes()
+
+
+def check_failed_ocr_keeps_text(blank_pages: int, path: str):
+    timings = []
+    text = file_handler.extract_text_from_pdf(mixed_pdf(blank_pages), timings = timings)
+    assert text == TEXT, f"the text layer must survive a failed OCR ({path}), got {text!r}"
+    assert "ocr_error" not in timings[0] and timings[0]["ocr"] is False
+    assert all(page["ocr"] and "TesseractNotFoundError" in page["ocr_error"] for page in timings[1:]), timings
+    print(f"failed OCR keeps the text layer ({path}): ok")
+
+
+if __name__ == "__main__":
+    #Set before the OCR pool is created, so its (forked) workers raise too
+    pytesseract.image_to_string = failing_ocr
+    check_failed_ocr_keeps_text(1, "inline")
+    check_failed_ocr_keeps_text(3, "process pool")
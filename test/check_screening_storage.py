@@ -0,0 +1,74 @@
+'''
+    Check: save_screenings survives the upsert race on a (resume_id, jd_id) pair. A concurrent run inserts the pair
+    between the upsert's match and its insert, MongoDB rejects the insert with E11000 (the partial unique index,
+    not retried because of the filter's $exists), and the result must still land on the stored pair.
+    The race is replayed against the in-memory store by a bulk_write that lets the competitor in first and then
+    fails the way the server does.
+
+    Usage: python test/check_screening_storage.py
+'''
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["MONGODB_CONNECTION"] = "memory://"
+os.environ.setdefault("DB_NAME", "check_screening_storage")
+
+from pymongo.errors import BulkWriteError
+
+from api import batch_screening
+from db import database as db
+
+VERSIONS = {"resume_version": "r1", "jd_version": "j1", "screening_version": "s1"}
+RESULT = {"match_score": 80, "summary": "Fits.", "strengths": ["Python"], "gaps": []}
+
+
+async def check_duplicate_upsert_becomes_update():
+    db.create_indexes()
+    real_bulk_write = batch_screening.bulk_write_documents_async
+    calls = []
+
+    async def racing_bulk_write(collection_name, operations, ordered = False):
+        calls.append(len(operations))
+        if len(calls) > 1:
+            return await real_bulk_write(collection_name, operations, ordered)
+        #The competitor's upsert wins the insert; ours (index 1) hits the unique index, the one at index 0 goes through
+        await db.add_document_async("screenings", {"resume_id": "r-race", "jd_id": "jd", "match_score": 10,
+                                                   "report": "stale", **VERSIONS})
+        await real_bulk_write(collection_name, operations[:1], ordered)
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000 duplicate key error"}],
+                              "nInserted": 0, "nUpserted": 1, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []})
+
+    batch_screening.bulk_write_documents_async = racing_bulk_write
+    try:
+        ids = await batch_screening.save_screenings("jd", [("r-ok", VERSIONS, RESULT), ("r-race", VERSIONS, RESULT)])
+    finally:
+        batch_screening.bulk_write_documents_async = real_bulk_write
+
+    assert calls == [2, 1], f"only the rejected write is re-applied, got {calls}"
+    stored = await db.find_documents_async("screenings", {"jd_id": "jd", "resume_id": "r-race"})
+    assert len(stored) == 1 and stored[0]["match_score"] == 80 and "report" not in stored[0], stored
+    assert set(ids) == {"r-ok", "r-race"} and ids["r-race"] == stored[0]["_id"]
+    print("duplicate upsert re-applied as an update: ok")
+
+
+async def check_other_errors_raise():
+    real_bulk_write = batch_screening.bulk_write_documents_async
+
+    async def failing_bulk_write(collection_name, operations, ordered = False):
+        raise BulkWriteError({"writeErrors": [{"index": 0, "code": 121, "errmsg": "Document failed validation"}]})
+
+    batch_screening.bulk_write_documents_async = failing_bulk_write
+    try:
+        await batch_screening.save_screenings("jd", [("r-other", VERSIONS, RESULT)])
+        raise AssertionError("errors other than E11000 must propagate")
+    except BulkWriteError:
+        print("other write errors propagate: ok")
+    finally:
+        batch_screening.bulk_write_documents_async = real_bulk_write
+
+
+if __name__ == "__main__":
+    asyncio.run(check_duplicate_upsert_becomes_update())
+    asyncio.run(check_other_errors_raise())
@@ -0,0 +1,48 @@
+'''
+    Check: skill normalization folds spelling variants (case, punctuation, '-', '_' and '/' separators, aliases)
+    into one skill, and the in-memory bitmap index answers boolean queries over them.
+
+    Usage: python test/check_skill_index.py
+'''
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.skill_index import SkillIndex, normalize_skill
+
+VARIANTS = {
+    "full stack": ["Full-Stack", "Full Stack", "full_stack", "FullStack", "full / stack"],
+    "ci cd": ["CI/CD", "CI CD", "ci-cd", "CICD", "ci_cd"],
+    "machine learning": ["Machine-Learning", "Machine Learning", "machine_learning", "ML", "MachineLearning"],
+    "react": ["ReactJS", "React.js", "React", "react-js", "React_JS"],
+    "scikitlearn": ["scikit-learn", "Scikit Learn", "sklearn"],
+    "c++": ["C++", "c plus plus", "CPP"],
+    "c#": ["C#", "C-Sharp", "csharp"],
+    "git": ["Git/GitHub", "GitHub"],
+    "python": ["Python 3", "python3", "Python-3", "py"],
+}
+
+
+def check_variants():
+    for canonical, variants in VARIANTS.items():
+        for variant in variants:
+            assert normalize_skill(variant) == canonical, f"{variant!r} -> {normalize_skill(variant)!r}, expected {canonical!r}"
+        assert normalize_skill(canonical) == canonical, f"{canonical!r} must normalize to itself"
+    print(f"skill variants: ok ({sum(len(v) for v in VARIANTS.values())} spellings of {len(VARIANTS)} skills)")
+
+
+def check_queries():
+    index = SkillIndex()
+    index.rebuild([("r1", [normalize_skill(s) for s in ("Python", "Full-Stack", "CI/CD")]),
+                   ("r2", [normalize_skill(s) for s in ("python3", "Machine-Learning")]),
+                   ("r3", [normalize_skill(s) for s in ("PHP", "full_stack")])])
+    assert index.query("Python AND (\"Full Stack\" OR ML)") == ["r1", "r2"]
+    assert index.query("\"full stack\" NOT PHP") == ["r1"]
+    assert index.query("CICD") == ["r1"] and index.count("\"Machine Learning\"") == 1
+    print("skill queries: ok")
+
+
+if __name__ == "__main__":
+    check_variants()
+    check_queries()
@@ -0,0 +1,219 @@
+'''
+    Load test: drives the whole FastAPI app (`main.app`, lifespan included) with concurrent resume uploads, JD
+    parsing, screenings and reports, and reports p50/p95/p99 latency and throughput per endpoint.
+    Runs fully offline: the Agents use the fake model provider (LLM_PROVIDER=fake) and MongoDB is the in-memory
+    stand-in (MONGODB_CONNECTION=memory://), so the numbers measure the service itself plus the simulated model
+    latency, not the network or a Gemini quota.
+
+    Phases: upload (POST /v1/resumes, then each job is polled to completion), jds (POST /v1/jds/paste-text),
+    screen (POST /v1/screen), report (GET /v1/reports/{id}, template and LLM renderer) and a mixed phase running
+    uploads, screens and reports at the same time.
+
+    Usage: python test/load_test.py [--resumes N] [--jds J] [--screens S] [--concurrency C] [--latency-ms MS]
+                                    [--jitter-ms MS] [--ms-per-token MS] [--throttle-rate R] [--error-rate R]
+'''
+import argparse
+import asyncio
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_PROVIDER"] = "fake"
+os.environ["MONGODB_CONNECTION"] = "memory://"
+os.environ["LLM_CACHE_PERSISTENT"] = "false"
+os.environ.setdefault("INGEST_SPOOL_DIR", tempfile.mkdtemp(prefix = "load_test_spool_"))
+os.environ.setdefault("VECTOR_INDEX_DIR", tempfile.mkdtemp(prefix = "load_test_vectors_"))
+#The fake backend has no quota; set LLM_RPM/LLM_TPM explicitly to load-test the scheduler against one
+os.environ.setdefault("LLM_RPM", "0")
+os.environ.setdefault("LLM_TPM", "0")
+
+import docx
+import httpx
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+SKILLS = ["Python", "FastAPI", "Django", "PostgreSQL", "MongoDB", "Redis", "Kafka", "Docker", "Kubernetes", "AWS",
+          "GCP", "Terraform", "React", "TypeScript", "Go", "Rust", "Java", "Spark", "Airflow", "PyTorch"]
+TITLES = ["Backend Engineer", "Data Engineer", "Platform Engineer", "ML Engineer", "Full Stack Developer"]
+
+
+#---------------Synthetic Inputs---------------
+def resume_docx(rng: random.Random, i: int) -> bytes:
+    document = docx.Document()
+    document.add_paragraph(f"Candidate {i:05d}")
+    document.add_paragraph(f"candidate{i}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}")
+    document.add_paragraph(f"Summary: {rng.randint(1, 12)} years building {rng.choice(TITLES).lower()} systems.")
+    document.add_paragraph("Skills: " + ", ".join(rng.sample(SKILLS, rng.randint(4, 10))))
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def jd_text(rng: random.Random) -> str:
+    skills = rng.sample(SKILLS, 8)
+    return (f"{rng.choice(TITLES)}\n"
+            f"We are looking for someone with {rng.randint(2, 8)}+ years of experience.\n"
+            f"Required: {', '.join(skills[:5])}\n"
+            f"Preferred: {', '.join(skills[5:])}\n"
+            "Bachelor's degree in Computer Science or a related field.\n")
+
+
+#---------------Measurement---------------
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[label].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+    def observe(self, label: str, seconds: float, failed: bool = False):
+        self.latencies[label].append(seconds)
+        if failed:
+            self.errors[label] += 1
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    #Nearest rank
+    return sorted_values[max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values) + 0.5) - 1))]
+
+
+def print_phase(name: str, recorder: Recorder, seconds: float):
+    print(f"\n{name} phase: {seconds:.2f} s")
+    print(f"  {'endpoint':<38}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}")
+    for label, values in sorted(recorder.latencies.items()):
+        ordered = sorted(values)
+        print(f"  {label:<38}{len(ordered):>9}{recorder.errors[label]:>8}"
+              + "".join(f"{percentile(ordered, q) * 1000:>9.1f}" for q in (50, 95, 99))
+              + f"{len(ordered) / seconds:>9.1f}")
+
+
+async def run_phase(name: str, tasks: List[Callable[[Recorder], Awaitable]], concurrency: int) -> list:
+    '''
+        Runs `tasks` with at most `concurrency` in flight and prints the latency table of the requests they made.
+    '''
+    recorder, semaphore = Recorder(), asyncio.Semaphore(concurrency)
+    async def one(task):
+        async with semaphore:
+            return await task(recorder)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(task) for task in tasks))
+    print_phase(name, recorder, time.perf_counter() - start)
+    return results
+
+
+#---------------Scenarios---------------
+def upload_task(client: httpx.AsyncClient, content: bytes, i: int):
+    async def task(recorder: Recorder):
+        start = time.perf_counter()
+        response = await recorder.request(client, "POST /v1/resumes", "POST", "/v1/resumes",
+                                          files = {"resume_file": (f"resume_{i:05d}.docx", content, DOCX_TYPE)})
+        body = response.json()
+        if response.status_code == 200:
+            return body["resume_id"]
+        if response.status_code != 202:
+            return None
+        #The upload only queues the resume; time the whole ingestion as its own row
+        while True:
+            await asyncio.sleep(0.02)
+            job = (await recorder.request(client, "GET /v1/jobs/{id}", "GET", body["status_url"])).json()
+            if job.get("status") in ("completed", "failed"):
+                recorder.observe("ingest (upload -> parsed)", time.perf_counter() - start, failed = job["status"] == "failed")
+                return job.get("resume_id")
+    return task
+
+
+def jd_task(client: httpx.AsyncClient, text: str):
+    async def task(recorder: Recorder):
+        response = await recorder.request(client, "POST /v1/jds/paste-text", "POST", "/v1/jds/paste-text",
+                                          content = text, headers = {"Content-Type": "text/plain"})
+        return response.json().get("jd_id") if response.status_code == 201 else None
+    return task
+
+
+def screen_task(client: httpx.AsyncClient, resume_id: str, jd_id: str):
+    async def task(recorder: Recorder):
+        response = await recorder.request(client, "POST /v1/screen", "POST", "/v1/screen",
+                                          json = {"resume_id": resume_id, "jd_id": jd_id})
+        return response.json().get("screening_id") if response.status_code in (200, 201) else None
+    return task
+
+
+def report_task(client: httpx.AsyncClient, screening_id: str, use_llm: bool):
+    async def task(recorder: Recorder):
+        label = "GET /v1/reports/{id}?use_llm=true" if use_llm else "GET /v1/reports/{id}"
+        await recorder.request(client, label, "GET", f"/v1/reports/{screening_id}", params = {"use_llm": use_llm})
+    return task
+
+
+async def run_load_test(args):
+    #Imported here so the environment above is in place before the config is read
+    import main
+    from agents.providers import get_provider
+
+    provider = get_provider()
+    provider.latency_ms, provider.jitter_ms, provider.ms_per_output_token = args.latency_ms, args.jitter_ms, args.ms_per_token
+    provider.throttle_rate, provider.server_error_rate = args.throttle_rate, args.error_rate
+
+    rng = random.Random(42)
+    resumes = [resume_docx(rng, i) for i in range(args.resumes + args.resumes // 2)]
+    jds = [jd_text(rng) for _ in range(args.jds)]
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app = main.app)
+        async with httpx.AsyncClient(transport = transport, base_url = "http://load-test", timeout = None) as client:
+            print(f"{args.resumes} resumes, {args.jds} JDs, {args.screens} screenings, concurrency {args.concurrency}, "
+                  f"fake model {args.latency_ms:.0f}+/-{args.jitter_ms:.0f} ms + {args.ms_per_token} ms/token, "
+                  f"{args.throttle_rate:.0%} 429s, {args.error_rate:.0%} 503s")
+            start = time.perf_counter()
+
+            resume_ids = await run_phase("upload", [upload_task(client, resumes[i], i) for i in range(args.resumes)], args.concurrency)
+            resume_ids = [resume_id for resume_id in resume_ids if resume_id]
+            jd_ids = [jd_id for jd_id in await run_phase("jds", [jd_task(client, text) for text in jds], args.concurrency) if jd_id]
+
+            pairs = rng.sample([(r, j) for r in resume_ids for j in jd_ids], min(args.screens, len(resume_ids) * len(jd_ids)))
+            screening_ids = await run_phase("screen", [screen_task(client, r, j) for r, j in pairs[:len(pairs) // 2]], args.concurrency)
+            screening_ids = [screening_id for screening_id in screening_ids if screening_id]
+
+            await run_phase("report", [report_task(client, s, use_llm) for s in screening_ids for use_llm in (False, True)],
+                            args.concurrency)
+
+            #Everything at once: new uploads, the other half of the screenings and reports on the first half
+            mixed = ([upload_task(client, resumes[i], i) for i in range(args.resumes, len(resumes))]
+                     + [screen_task(client, r, j) for r, j in pairs[len(pairs) // 2:]]
+                     + [report_task(client, s, True) for s in screening_ids])
+            rng.shuffle(mixed)
+            await run_phase("mixed", mixed, args.concurrency)
+
+            scheduler = (await client.get("/v1/llm/scheduler")).json()
+            total = time.perf_counter() - start
+
+    counters = provider.counters
+    print(f"\nTotal {total:.2f} s; fake model: {counters['calls']} calls ({counters['throttled']} throttled, "
+          f"{counters['server_errors']} server errors), {counters['prompt_tokens']} prompt / "
+          f"{counters['completion_tokens']} completion tokens; scheduler limit {scheduler['concurrency_limit']}, "
+          f"{scheduler['throttled']} throttled, {scheduler['transient_errors']} transient errors retried")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--jds", type=int, default=5)
+    parser.add_argument("--screens", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once.")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Fixed latency of a fake model call.")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="Uniform +/- jitter of a fake model call.")
+    parser.add_argument("--ms-per-token", type=float, default=0.2, help="Fake decoding time per output token.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of fake model calls failing with a 429.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake model calls failing with a 503.")
+    asyncio.run(run_load_test(parser.parse_args()))
@@ -2,54 +2,193 @@ import fitz
 import docx
 import pytesseract
 from PIL import Image
+import asyncio
 import io
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import os
+from typing import Callable, List, Optional, Tuple, Union
+
+from utils.metrics import OCR_PAGE_SECONDS
+from core.config import EXTRACTION_WORKERS, BULK_EXTRACTION_PROCESSES, OCR_WORKERS, OCR_MIN_PAGE_CHARS, OCR_MIN_DPI, OCR_MAX_DPI, OCR_TARGET_LONG_SIDE_PX
+
+
+#Extractors accept either the file's bytes or a path to it; a path lets the libraries read the file directly without a copy
+FileSource = Union[bytes, str]
+
+#Lazily created pool shared by every PDF that needs OCR
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    global _ocr_pool
+    if _ocr_pool is None:
+        _ocr_pool = ProcessPoolExecutor(max_workers = OCR_WORKERS)
+    return _ocr_pool
+
+
+#Bounded pool that runs extraction off the event loop, so a large PDF never stalls other requests
+_extraction_pool = ThreadPoolExecutor(max_workers = EXTRACTION_WORKERS, thread_name_prefix = "extraction")
+
+async def run_extraction(extractor: Callable, *args):
+    '''
+        Awaits `extractor(*args)` on the extraction pool.
+    '''
+    return await asyncio.get_running_loop().run_in_executor(_extraction_pool, extractor, *args)
+
+
+#Bulk ingestion extracts on processes instead, so thousands of PDFs/DOCX files are parsed in parallel past the GIL
+_bulk_extraction_pool: Optional[ProcessPoolExecutor] = None
+
+#True inside those processes: they already are the parallelism, so scanned pages are OCR-ed inline instead of on a nested pool
+_inline_ocr = False
+
+def _init_bulk_extraction_process():
+    global _inline_ocr
+    _inline_ocr = True
+
+def _get_bulk_extraction_pool() -> ProcessPoolExecutor:
+    global _bulk_extraction_pool
+    if _bulk_extraction_pool is None:
+        _bulk_extraction_pool = ProcessPoolExecutor(max_workers = BULK_EXTRACTION_PROCESSES,
+                                                    initializer = _init_bulk_extraction_process)
+    return _bulk_extraction_pool
+
+async def run_extraction_in_process(filename: str, path: str) -> Tuple[str, dict]:
+    '''
+        Awaits `extract_file_with_timings(filename, path)` on the bulk extraction process pool
+        (falling back to the thread pool if a worker process died).
+    '''
+    global _bulk_extraction_pool
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_bulk_extraction_pool(), extract_file_with_timings,
+                                                                filename, path)
+    except BrokenProcessPool:
+        _bulk_extraction_pool = None
+        return await run_extraction(extract_file_with_timings, filename, path)
+
+
+def _ocr_grayscale_samples(width: int, height: int, samples: bytes) -> Tuple[str, float]:
+    '''
+        Runs OCR on raw 8-bit grayscale pixmap samples (executed inside the OCR process pool).
+        Returns the text and the seconds the OCR itself took, measured where it ran (not including pool queueing).
+    '''
+    start = time.perf_counter()
+    image = Image.frombytes("L", (width, height), samples)
+    return pytesseract.image_to_string(image), time.perf_counter() - start
+
+
+def _ocr_or_error(job: tuple) -> Tuple[Optional[str], float, Optional[str]]:
+    '''
+        OCR of one page in this process: (text, seconds, None), or (None, 0.0, error) when the OCR failed.
+    '''
+    try:
+        return (*_ocr_grayscale_samples(*job), None)
+    except Exception as e:
+        return None, 0.0, f"{type(e).__name__}: {e}"
+
+
+def _ocr_dpi(page) -> int:
+    '''
+        Picks a DPI so the longest side of the page renders to about OCR_TARGET_LONG_SIDE_PX pixels.
+    '''
+    longest_side_inches = max(page.rect.width, page.rect.height) / 72
+    return int(max(OCR_MIN_DPI, min(OCR_MAX_DPI, OCR_TARGET_LONG_SIDE_PX / longest_side_inches)))
 
 
 #=============Function To Extract Text from PDF================
-def extract_text_from_pdf(file_bytes: bytes)-> str:
-    ''' 
+def extract_pdf_pages(source: FileSource) -> List[dict]:
+    '''
+        Extracts the text of every page, OCR-ing only the pages without a usable text layer.
+        Input(Args):
+                - Path or Bytes of PDF File
+
+        Output:
+                - One dict per page: {"page", "text", "ocr", "dpi", "seconds"}, plus "ocr_error" when its OCR failed
+    '''
+    pages = []
+    ocr_jobs = []
+    pdf_document = fitz.open(source, filetype="pdf") if isinstance(source, str) else fitz.open(stream = source, filetype="pdf")
+    with pdf_document:
+        for page_num, page in enumerate(pdf_document):
+            start = time.perf_counter()
+            text = page.get_text()
+            result = {"page": page_num + 1, "text": text, "ocr": False, "dpi": None}
+
+            #A page with (almost) no text layer is treated as scanned. Images are not required: scanners and
+            #"print to PDF" tools also draw the page as vector paths or form XObjects that get_images() does not list
+            if len(text.strip()) < OCR_MIN_PAGE_CHARS:
+                dpi = _ocr_dpi(page)
+                pix = page.get_pixmap(dpi = dpi, colorspace = fitz.csGRAY, alpha = False)
+                result.update({"ocr": True, "dpi": dpi})
+                ocr_jobs.append((result, (pix.width, pix.height, pix.samples)))
+
+            result["seconds"] = time.perf_counter() - start
+            pages.append(result)
+
+    #Each page records its render time plus the OCR time measured in the worker, not the pool's wall time
+    outputs = []
+    if len(ocr_jobs) == 1 or _inline_ocr:
+        #One page is not worth the inter-process round trip
+        outputs = [_ocr_or_error(job) for _, job in ocr_jobs]
+    elif ocr_jobs:
+        global _ocr_pool
+        try:
+            futures = [_get_ocr_pool().submit(_ocr_grayscale_samples, *job) for _, job in ocr_jobs]
+        except BrokenProcessPool:
+            _ocr_pool, futures = None, None
+        for index, (_, job) in enumerate(ocr_jobs):
+            if futures is None:
+                outputs.append(_ocr_or_error(job))
+                continue
+            try:
+                outputs.append((*futures[index].result(), None))
+            except BrokenProcessPool:
+                #A dead worker breaks every pending future; the remaining pages are OCR-ed here
+                _ocr_pool, futures = None, None
+                outputs.append(_ocr_or_error(job))
+            except Exception as e:
+                outputs.append((None, 0.0, f"{type(e).__name__}: {e}"))
+
+    #A page whose OCR failed keeps its text layer and records the error, so it never costs the other pages their text
+    for (result, _), (text, ocr_seconds, error) in zip(ocr_jobs, outputs):
+        result["seconds"] += ocr_seconds
+        if error:
+            print(f"OCR failed on page {result['page']}: {error}")
+            result["ocr_error"] = error
+            continue
+        result["text"] = text
+        OCR_PAGE_SECONDS.observe(result["seconds"])
+    return pages
+
+
+def extract_text_from_pdf(source: FileSource, timings: Optional[list] = None)-> str:
+    '''
         This function will Extract text from the uploaded Resume PDF
         Input(Args):
-                - Bytes of PDF File
-        
+                - Path or Bytes of PDF File
+                - timings: optional list that receives the per-page timings
+
         Output:
-                - A string containing all the text from the Resume PDF 
+                - A string containing all the text from the Resume PDF
     '''
-    
-    text = ""
     try:
-        #Open the PDF 
-        pdf_document = fitz.open(stream = file_bytes, filetype="pdf")
-        
-        for page_num in range(len(pdf_document)):
-            text += pdf_document.load_page(page_num).get_text()
-
-        #If text is minimal, Use OCR
-        if(len(text.strip()) < 100):
-             #Reset the text
-             text = ""
-             for page_num in range(len(pdf_document)):
-                page = pdf_document.load_page(page_num)
-                #Convert page to an image
-                pix = page.get_pixmap(dpi = 300)
-                img_bytes = pix.tobytes("png")
-                image = Image.open(io.BytesIO(img_bytes))
-                
-                #Extract the text from Image using OCR
-                text += pytesseract.image_to_string(image)
-        pdf_document.close()
-        return text.strip()
+        pages = extract_pdf_pages(source)
+        if timings is not None:
+            timings.extend({key: page[key] for key in ("page", "ocr", "dpi", "seconds", "ocr_error") if key in page}
+                           for page in pages)
+        return "\n".join(page["text"].strip() for page in pages if page["text"].strip())
     except Exception as e:
         print(f"Error processing PDF file: {e}")
         return ""
 
 #==============Function to Extract Text from DOCX format Resume===========
-def extract_text_from_docx(file_bytes: bytes)->str:
-    ''' 
+def extract_text_from_docx(source: FileSource)->str:
+    '''
         This function will extract text from resumes uploaded in DOCX format
     '''
     try:
-        document = docx.Document(io.BytesIO(file_bytes))
+        document = docx.Document(source if isinstance(source, str) else io.BytesIO(source))
         return "\n".join([para.text for para in document.paragraphs]).strip()
     except Exception as e:
         print(f"Error processing DOCX file: {e}")
@@ -57,16 +196,44 @@ def extract_text_from_docx(file_bytes: bytes)->str:
 
 
 #================Function to Extract text from Image format Resume===========
-def extract_text_from_image(file_bytes: bytes) ->str:
-    ''' 
+def extract_text_from_image(source: FileSource) ->str:
+    '''
         Extracts text from an image file using OCR.
     '''
     try:
-        image = Image.open(io.BytesIO(file_bytes))
-        return pytesseract.image_to_string(image).strip()
+        with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as image:
+            return pytesseract.image_to_string(image).strip()
     except Exception as e:
         print(f"Error processing image file: {e}")
         return ""
-                    
 
-            
\ No newline at end of file
+
+#================Function to Extract text from any supported Resume file===========
+def extract_file(filename: str, source: FileSource, timings: Optional[list] = None) -> str:
+    '''
+        This function will Determine the filetype and Extract Raw text
+        (PDF per-page timings are appended to `timings` when given)
+    '''
+    if filename.lower().endswith(".pdf"):
+        return extract_text_from_pdf(source, timings = timings)
+
+    elif filename.lower().endswith(".docx"):
+        return extract_text_from_docx(source)
+
+    elif filename.lower().endswith(('.png', '.jpg', '.jpeg')):
+        return extract_text_from_image(source)
+
+    else:
+        raise ValueError("Unsupported File Type")
+
+
+def extract_file_with_timings(filename: str, source: FileSource) -> Tuple[str, dict]:
+    '''
+        Extracts the raw text and records how long it took (per page for PDFs).
+    '''
+    start = time.perf_counter()
+    page_timings = []
+    raw_text = extract_file(filename, source, timings = page_timings)
+    extraction = {"seconds": round(time.perf_counter() - start, 4),
+                  "pages": [{**page, "seconds": round(page["seconds"], 4)} for page in page_timings]}
+    return raw_text, extraction
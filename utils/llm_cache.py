@@ -0,0 +1,121 @@
+import dataclasses
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+from pymongo.collection import Collection
+
+
+class LLMResponseCache:
+    '''
+        Two-tier cache for model responses: an in-process LRU with size and TTL eviction,
+        backed by a persistent MongoDB collection shared by every worker.
+    '''
+    def __init__(self, max_entries: int, ttl_seconds: int, collection: Optional[Collection] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.collection = collection
+        self._entries = OrderedDict()   #key -> (expires_at, text)
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "persistent_hits": 0, "misses": 0,
+                         "size_evictions": 0, "ttl_evictions": 0}
+
+    @staticmethod
+    def make_key(model_name: str, generation_config, prompt: str) -> str:
+        '''
+            Hash of the model name, the generation config and the whitespace-normalized prompt.
+        '''
+        if dataclasses.is_dataclass(generation_config):
+            generation_config = dataclasses.asdict(generation_config)
+        config = json.dumps(generation_config, sort_keys=True, default=str) if isinstance(generation_config, dict) else repr(generation_config)
+        normalized_prompt = " ".join(prompt.split())
+
+        hasher = hashlib.sha256()
+        for part in (model_name, config, normalized_prompt):
+            hasher.update(part.encode("utf-8"))
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, text = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return text
+                del self._entries[key]
+                self.counters["ttl_evictions"] += 1
+
+        text = self._get_persistent(key)
+        with self._lock:
+            if text is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["persistent_hits"] += 1
+        self._set_memory(key, text)
+        return text
+
+    def set(self, key: str, text: str, model_name: str):
+        self._set_memory(key, text)
+        if self.collection is None:
+            return
+        try:
+            self.collection.replace_one({"_id": key},
+                                        {"_id": key, "text": text, "model_name": model_name,
+                                         "created_at": datetime.now(timezone.utc)},
+                                        upsert = True)
+        except Exception as e:
+            print(f"Could not persist LLM response to cache: {e}")
+
+    def delete(self, key: str):
+        '''
+            Drops a response from both tiers (e.g. one that no longer passes the Agent's validation).
+        '''
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.collection is None:
+            return
+        try:
+            self.collection.delete_one({"_id": key})
+        except Exception as e:
+            print(f"Could not delete LLM response from cache: {e}")
+
+    def _set_memory(self, key: str, text: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last = False)
+                self.counters["size_evictions"] += 1
+
+    def _get_persistent(self, key: str) -> Optional[str]:
+        if self.collection is None:
+            return None
+        try:
+            #The TTL index only sweeps periodically, so expired entries are also filtered on read
+            oldest = datetime.now(timezone.utc) - timedelta(seconds = self.ttl_seconds)
+            doc = self.collection.find_one({"_id": key, "created_at": {"$gte": oldest}}, {"text": 1})
+            return doc["text"] if doc else None
+        except Exception as e:
+            print(f"Could not read LLM response cache: {e}")
+            return None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.counters["memory_hits"] + self.counters["persistent_hits"] + self.counters["misses"]
+            hits = lookups - self.counters["misses"]
+            return {**self.counters,
+                    "entries": len(self._entries),
+                    "max_entries": self.max_entries,
+                    "ttl_seconds": self.ttl_seconds,
+                    "hit_rate": round(hits / lookups, 4) if lookups else 0.0}
@@ -0,0 +1,265 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Hashable, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+#Priority classes, most urgent first; a waiting call is never overtaken by a less urgent one
+PRIORITIES = {"interactive": 0, "batch": 1, "bulk": 2}
+
+#Priority of the model calls made from the current context (request handlers are interactive by default)
+_current_priority = contextvars.ContextVar("llm_priority", default = "interactive")
+
+#Throttled by the API: back off and shrink the concurrency limit
+THROTTLE_ERRORS = (google_exceptions.TooManyRequests,)
+#Transient server-side failures: back off and retry at the same concurrency
+TRANSIENT_ERRORS = (google_exceptions.ServiceUnavailable, google_exceptions.InternalServerError,
+                    google_exceptions.DeadlineExceeded)
+
+
+@contextmanager
+def llm_priority(priority: str):
+    '''
+        Runs the enclosed model calls (and the tasks started inside) at `priority`.
+    '''
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority '{priority}'")
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+def retry_reason(error: Exception) -> Optional[str]:
+    '''
+        "throttled" or "transient" for a model error worth retrying, None otherwise.
+    '''
+    if isinstance(error, THROTTLE_ERRORS):
+        return "throttled"
+    if isinstance(error, TRANSIENT_ERRORS):
+        return "transient"
+    return None
+
+
+class TokenBucket:
+    '''
+        Refills `per_minute` units evenly over a minute and holds at most a minute's worth.
+        Not thread-safe on its own; the scheduler's lock guards it. A non-positive rate disables it.
+    '''
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def seconds_until(self, amount: float) -> float:
+        '''
+            How long until `amount` units are available (a request larger than the bucket waits for a full one).
+        '''
+        if not self.enabled:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(missing, 0.0) / self.rate
+
+    def take(self, amount: float):
+        '''
+            Removes `amount` units; a negative amount refunds. The level may go negative (a debt paid off by refills).
+        '''
+        if self.enabled:
+            self._refill()
+            self.level = min(self.capacity, self.level - amount)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "event", "loop", "cancelled")
+
+    def __init__(self, priority: int, seq: int, tokens: int, loop: Optional[asyncio.AbstractEventLoop]):
+        self.priority, self.seq, self.tokens, self.loop = priority, seq, tokens, loop
+        self.event = asyncio.Event() if loop else threading.Event()
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def wake(self):
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.event.set)
+        else:
+            self.event.set()
+
+
+class LLMScheduler:
+    '''
+        Process-wide admission control for model calls, shared by every Agent and every event loop/thread.
+        A call is admitted when it is the most urgent waiter (priority, then arrival), a concurrency slot is free
+        and the requests-per-minute and tokens-per-minute buckets can pay for it.
+
+        The concurrency limit adapts (AIMD): it grows by about one slot per limit's worth of calls while latency stays
+        within `latency_tolerance` x the best smoothed latency seen, shrinks by 10% when latency degrades and halves
+        when the API throttles. Latency is only compared between calls of the same kind (`latency_key`, e.g. the
+        agent and the prompt size), since a packed screening is legitimately slower than a title.
+    '''
+    def __init__(self, rpm: int, tpm: int, initial_concurrency: int, min_concurrency: int, max_concurrency: int,
+                 latency_tolerance: float = 2.0):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.latency_tolerance = latency_tolerance
+        self._latency = {}   #latency_key -> [smoothed latency, best smoothed latency, last update]
+        self.in_flight = 0
+        self._waiters = []   #heap of _Waiter
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.counters = {"admitted": 0, "throttled": 0, "transient_errors": 0, "latency_backoffs": 0}
+
+    #---------------Admission---------------
+    def _next_waiter(self) -> Optional[_Waiter]:
+        while self._waiters and self._waiters[0].cancelled:
+            heapq.heappop(self._waiters)
+        return self._waiters[0] if self._waiters else None
+
+    def _wake_next(self):
+        waiter = self._next_waiter()
+        if waiter:
+            waiter.wake()
+
+    def _try_admit(self, waiter: _Waiter) -> Optional[float]:
+        '''
+            Admits `waiter` and returns 0, or returns how long to wait (None = until woken). Call with the lock held.
+        '''
+        if self._next_waiter() is not waiter or self.in_flight >= int(self.limit):
+            return None
+        delay = max(self.requests.seconds_until(1), self.tokens.seconds_until(waiter.tokens))
+        if delay > 0:
+            return delay
+        heapq.heappop(self._waiters)
+        self.requests.take(1)
+        self.tokens.take(waiter.tokens)
+        self.in_flight += 1
+        self.counters["admitted"] += 1
+        #The next waiter may fit too (a slot and budget were left over)
+        self._wake_next()
+        return 0
+
+    def _enqueue(self, tokens: int, loop: Optional[asyncio.AbstractEventLoop]) -> _Waiter:
+        waiter = _Waiter(PRIORITIES[current_priority()], next(self._seq), tokens, loop)
+        with self._lock:
+            heapq.heappush(self._waiters, waiter)
+        return waiter
+
+    def _abandon(self, waiter: _Waiter):
+        with self._lock:
+            waiter.cancelled = True
+            self._wake_next()
+
+    async def acquire(self, tokens: int):
+        '''
+            Waits for a slot for a call estimated at `tokens` tokens.
+        '''
+        waiter = self._enqueue(tokens, asyncio.get_running_loop())
+        try:
+            while True:
+                waiter.event.clear()
+                with self._lock:
+                    delay = self._try_admit(waiter)
+                if delay == 0:
+                    return
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def acquire_sync(self, tokens: int):
+        '''
+            Blocking twin of `acquire` for the synchronous Agent methods (called from worker threads).
+        '''
+        waiter = self._enqueue(tokens, None)
+        try:
+            while True:
+                waiter.event.clear()
+                with self._lock:
+                    delay = self._try_admit(waiter)
+                if delay == 0:
+                    return
+                waiter.event.wait(delay)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False, transient: bool = False,
+                token_correction: int = 0, latency_key: Hashable = None):
+        '''
+            Frees the slot of a finished call and feeds its outcome to the concurrency controller.
+            `token_correction` is the difference between the billed and the estimated tokens.
+        '''
+        with self._lock:
+            self.in_flight -= 1
+            self.tokens.take(token_correction)
+            if throttled:
+                self.counters["throttled"] += 1
+                self.limit = max(self.min_concurrency, self.limit / 2)
+            elif transient:
+                self.counters["transient_errors"] += 1
+            elif latency is not None:
+                self._observe_latency(latency, latency_key)
+            self._wake_next()
+
+    def _observe_latency(self, latency: float, latency_key: Hashable):
+        now = time.monotonic()
+        tracked = self._latency.setdefault(latency_key, [latency, latency, now])
+        tracked[0] = 0.8 * tracked[0] + 0.2 * latency
+        #The floor drifts up by ~0.2%/s so a permanently slower model does not pin the limit at the minimum
+        tracked[1] = min(tracked[0], tracked[1] * (1 + 0.002 * (now - tracked[2])))
+        tracked[2] = now
+        if tracked[0] > tracked[1] * self.latency_tolerance:
+            self.counters["latency_backoffs"] += 1
+            self.limit = max(self.min_concurrency, self.limit * 0.9)
+        else:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waiting = {name: 0 for name in PRIORITIES}
+            names = {value: name for name, value in PRIORITIES.items()}
+            for waiter in self._waiters:
+                if not waiter.cancelled:
+                    waiting[names[waiter.priority]] += 1
+            return {"concurrency_limit": int(self.limit), "in_flight": self.in_flight, "waiting": waiting,
+                    "latency_seconds": {str(key): {"smoothed": round(smoothed, 3), "best": round(best, 3)}
+                                        for key, (smoothed, best, _) in self._latency.items()},
+                    "requests_available": round(self.requests.level, 2) if self.requests.enabled else None,
+                    "tokens_available": round(self.tokens.level) if self.tokens.enabled else None,
+                    **self.counters}
+
+
+def backoff_seconds(attempt: int, base: float, cap: float) -> float:
+    '''
+        "Full jitter" exponential backoff: uniform in [0, min(cap, base * 2^attempt)].
+    '''
+    return random.uniform(0, min(cap, base * 2 ** attempt))
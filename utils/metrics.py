@@ -0,0 +1,150 @@
+import json
+import os
+import time
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from pydantic import ValidationError
+from pymongo import monitoring
+
+#Buckets for the LLM calls and OCR, which take seconds rather than milliseconds
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+#=====================Metric Definitions=====================
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served", ["method"],
+                                multiprocess_mode="livesum")
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"])
+
+EXTRACTION_SECONDS = Histogram("extraction_duration_seconds", "Resume text extraction latency", ["file_type"],
+                               buckets=SLOW_BUCKETS)
+OCR_PAGE_SECONDS = Histogram("ocr_page_duration_seconds", "Render + OCR latency of one scanned PDF page",
+                             buckets=SLOW_BUCKETS)
+
+LLM_REQUEST_SECONDS = Histogram("llm_request_duration_seconds", "Latency of generate_content calls (cache misses only)",
+                                ["agent", "model"], buckets=SLOW_BUCKETS)
+LLM_REQUESTS_IN_FLIGHT = Gauge("llm_requests_in_flight", "generate_content calls awaiting a response", ["agent"],
+                               multiprocess_mode="livesum")
+LLM_TOKENS = Counter("llm_tokens", "Tokens reported by the model's usage metadata", ["agent", "model", "kind"])
+LLM_CACHE_RESULTS = Counter("llm_cache_lookups", "LLM response cache lookups", ["agent", "result"])
+LLM_SCHEDULER_WAIT_SECONDS = Histogram("llm_scheduler_wait_seconds", "Time a model call waited for admission", ["priority"],
+                                       buckets=SLOW_BUCKETS)
+LLM_RETRIES = Counter("llm_retries", "Model calls retried after a throttled (429) or transient (5xx) failure",
+                      ["agent", "reason"])
+LLM_CONCURRENCY_LIMIT = Gauge("llm_concurrency_limit", "Adaptive limit on concurrent model calls",
+                              multiprocess_mode="livesum")
+AGENT_FAILURES = Counter("agent_failures", "Agent failures by kind (api_error, json_decode, validation, other)",
+                         ["agent", "kind"])
+SCREENING_PACK_CANDIDATES = Counter("screening_pack_candidates",
+                                    "Candidates sent in packed screening prompts, by outcome (packed, fallback)", ["outcome"])
+
+RESUME_PREPARSE_OUTCOMES = Counter("resume_preparse",
+                                   "Resume parses by pre-parser outcome (skipped_llm, reduced, full)", ["outcome"])
+
+MONGO_COMMAND_SECONDS = Histogram("mongo_command_duration_seconds", "MongoDB command latency", ["command", "collection"])
+MONGO_COMMAND_FAILURES = Counter("mongo_command_failures", "Failed MongoDB commands", ["command", "collection"])
+
+
+#=====================Recording Helpers=====================
+def agent_label(agent) -> str:
+    return type(agent).__name__
+
+
+def failure_kind(error: Exception) -> str:
+    #JSONDecodeError and ValidationError are ValueErrors, so they are checked first
+    if isinstance(error, json.JSONDecodeError):
+        return "json_decode"
+    if isinstance(error, ValidationError):
+        return "validation"
+    return "other"
+
+
+def record_agent_failure(agent, error: Exception, kind: Optional[str] = None):
+    #An API error is recorded where it is raised; the Agent's own error handling must not count it again
+    if getattr(error, "_failure_recorded", False):
+        return
+    AGENT_FAILURES.labels(agent_label(agent), kind or failure_kind(error)).inc()
+    try:
+        error._failure_recorded = True
+    except AttributeError:
+        pass
+
+
+def observe_extraction(filename: str, extraction: dict):
+    EXTRACTION_SECONDS.labels(os.path.splitext(filename)[1].lower().lstrip(".") or "unknown").observe(extraction["seconds"])
+
+
+def record_token_usage(agent, response):
+    '''
+        Adds the prompt and completion tokens of a Gemini response (if it carries usage metadata).
+    '''
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    name, model = agent_label(agent), agent.model_name
+    LLM_TOKENS.labels(name, model, "prompt").inc(getattr(usage, "prompt_token_count", 0) or 0)
+    LLM_TOKENS.labels(name, model, "completion").inc(getattr(usage, "candidates_token_count", 0) or 0)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    '''
+        Times every MongoDB command (sync and async clients alike) through PyMongo's command monitoring.
+    '''
+    def __init__(self):
+        self._collections = {}   #request_id -> collection name, between the started and finished events
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self._collections[event.request_id] = collection if isinstance(collection, str) else ""
+
+    def succeeded(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        MONGO_COMMAND_SECONDS.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        MONGO_COMMAND_SECONDS.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(event.command_name, collection).inc()
+
+mongo_command_metrics = MongoCommandMetrics()
+
+
+class PrometheusMiddleware:
+    '''
+        ASGI middleware that tracks in-flight requests and request latency per route template.
+    '''
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(scope["method"])
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(scope["method"], getattr(route, "path", "unmatched"), str(status)).observe(
+                time.perf_counter() - start)
+
+
+def render_metrics():
+    '''
+        The exposition payload; aggregates every worker process when PROMETHEUS_MULTIPROC_DIR is set.
+    '''
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,34 @@
+import base64
+import json
+from typing import Optional, Tuple
+
+from bson.objectid import ObjectId
+
+
+#=====================Keyset (Cursor) Pagination=====================
+#A page ends at its last row's (sort value, _id); the next page starts strictly after it, so every page is an index seek
+#no matter how deep it is, where skip/limit would walk and discard all the rows before it.
+def encode_cursor(value, doc_id: str) -> str:
+    payload = json.dumps([value, doc_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[object, ObjectId]:
+    '''
+        Inverse of `encode_cursor`; raises ValueError on a malformed or tampered cursor.
+    '''
+    try:
+        value, doc_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return value, ObjectId(doc_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def after_cursor_descending(field: str, cursor: Optional[str]) -> dict:
+    '''
+        Filter for the rows after `cursor` when sorting by (`field` desc, _id desc).
+    '''
+    if not cursor:
+        return {}
+    value, doc_id = decode_cursor(cursor)
+    return {"$or": [{field: {"$lt": value}}, {field: value, "_id": {"$lt": doc_id}}]}
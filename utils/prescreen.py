@@ -0,0 +1,130 @@
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from utils.skill_index import normalize_skill
+
+#Weights of the deterministic pre-screening score (re-normalized when the JD has no preferred skills)
+REQUIRED_WEIGHT = 0.6
+PREFERRED_WEIGHT = 0.15
+EXPERIENCE_WEIGHT = 0.25
+
+_MONTHS = {m: i for i, m in enumerate(["jan", "feb", "mar", "apr", "may", "jun",
+                                        "jul", "aug", "sep", "oct", "nov", "dec"], start = 1)}
+#Whole words only: 'now' must not match 'Unknown', nor 'current' 'Concurrent Systems'
+_PRESENT_RE = re.compile(r"\b(present|current|now|ongoing|till date|to date)\b")
+_YEAR_RE = re.compile(r"(19|20)\d{2}")
+_NUMERIC_MONTH_RE = re.compile(r"\b(\d{1,2})\s*[/\-.]\s*((?:19|20)\d{2})\b|\b((?:19|20)\d{2})\s*[/\-.]\s*(\d{1,2})\b")
+
+
+def _parse_date(text: Optional[str], is_end: bool) -> Optional[float]:
+    '''
+        Turns a resume date such as 'Jan 2020', '2020-01', '01/2020', '2020' or 'Present' into fractional years.
+    '''
+    if not text:
+        return None
+    text = text.strip().lower()
+    if _PRESENT_RE.search(text):
+        today = date.today()
+        return today.year + (today.month - 1) / 12
+
+    numeric = _NUMERIC_MONTH_RE.search(text)
+    if numeric:
+        month, year = (numeric.group(1), numeric.group(2)) if numeric.group(1) else (numeric.group(4), numeric.group(3))
+        if 1 <= int(month) <= 12:
+            return int(year) + (int(month) - 1) / 12
+
+    year_match = _YEAR_RE.search(text)
+    if not year_match:
+        return None
+    year = int(year_match.group(0))
+    for word, month in _MONTHS.items():
+        if word in text:
+            return year + (month - 1) / 12
+    #A bare year covers the whole year when it closes a role and starts in January when it opens one
+    return year + (11 / 12 if is_end else 0.0)
+
+
+def experience_years(work_experience: List[dict]) -> float:
+    '''
+        Total years of professional experience, merging overlapping roles so they are not double counted.
+    '''
+    intervals: List[Tuple[float, float]] = []
+    for job in work_experience or []:
+        start = _parse_date(job.get("start_date"), is_end = False)
+        end = _parse_date(job.get("end_date"), is_end = True)
+        if start is None:
+            continue
+        if end is None or end < start:
+            end = start
+        #A role ending in a given month includes that month
+        intervals.append((start, end + 1 / 12))
+
+    total, current_start, current_end = 0.0, None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return round(total, 2)
+
+
+def score_candidates(resumes: List[dict], jd: dict) -> List[dict]:
+    '''
+        Scores every resume against the JD in one vectorized pass and returns the results sorted by score.
+        Builds a candidate-by-skill matrix over the JD's skills, then combines required/preferred coverage
+        and experience fit into a 0-100 score.
+    '''
+    required = list(dict.fromkeys(normalize_skill(s["skill"]) for s in jd.get("required_skills", [])))
+    preferred = [s for s in dict.fromkeys(normalize_skill(s["skill"]) for s in jd.get("preferred_skills", []))
+                 if s not in required]
+    vocabulary = {skill: column for column, skill in enumerate(required + preferred)}
+
+    n_candidates, n_required = len(resumes), len(required)
+    skill_matrix = np.zeros((n_candidates, len(vocabulary)), dtype = bool)
+    years = np.zeros(n_candidates, dtype = np.float32)
+    for row, resume in enumerate(resumes):
+        for skill in resume.get("skills", []):
+            column = vocabulary.get(normalize_skill(skill))
+            if column is not None:
+                skill_matrix[row, column] = True
+        years[row] = experience_years(resume.get("work_experience", []))
+
+    required_coverage = skill_matrix[:, :n_required].mean(axis = 1) if n_required else np.ones(n_candidates, dtype = np.float32)
+    preferred_coverage = skill_matrix[:, n_required:].mean(axis = 1) if preferred else np.zeros(n_candidates, dtype = np.float32)
+
+    required_years = jd.get("required_years_of_experience") or 0
+    experience_fit = np.clip(years / required_years, 0.0, 1.0) if required_years > 0 else np.ones(n_candidates, dtype = np.float32)
+
+    weights = np.array([REQUIRED_WEIGHT, PREFERRED_WEIGHT if preferred else 0.0, EXPERIENCE_WEIGHT])
+    weights = weights / weights.sum()
+    scores = 100 * (weights[0] * required_coverage + weights[1] * preferred_coverage + weights[2] * experience_fit)
+
+    order = np.argsort(-scores, kind = "stable")
+    missing = ~skill_matrix[:, :n_required]
+    return [{"resume_id": resumes[i]["_id"],
+             "name": resumes[i].get("name"),
+             "score": round(float(scores[i]), 2),
+             "required_coverage": round(float(required_coverage[i]), 3),
+             "preferred_coverage": round(float(preferred_coverage[i]), 3),
+             "experience_years": float(years[i]),
+             "experience_fit": round(float(experience_fit[i]), 3),
+             "missing_required_skills": [required[j] for j in np.flatnonzero(missing[i])]}
+            for i in order]
+
+
+def shortlist(scored: List[dict], top_k: Optional[int] = None, min_score: Optional[float] = None) -> List[dict]:
+    '''
+        Keeps the candidates at or above `min_score`, then the best `top_k` of those.
+    '''
+    if min_score is not None:
+        scored = [candidate for candidate in scored if candidate["score"] >= min_score]
+    if top_k is not None:
+        scored = scored[:top_k]
+    return scored
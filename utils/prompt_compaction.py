@@ -0,0 +1,100 @@
+import json
+import math
+import re
+from typing import Any, List, Tuple
+
+#Rough size of a token in compact English/JSON text; good enough to budget prompts without a tokenizer round trip
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def prune_empty(value: Any) -> Any:
+    '''
+        Recursively drops None, empty strings, empty lists and empty dicts.
+    '''
+    if isinstance(value, dict):
+        pruned = {key: prune_empty(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        pruned = [prune_empty(item) for item in value]
+        return [item for item in pruned if item not in (None, "", [], {})]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def compact_json(value: Any) -> str:
+    '''
+        JSON without empty fields, indentation or spaces after separators.
+    '''
+    return json.dumps(prune_empty(value), separators=(",", ":"), ensure_ascii=False)
+
+
+def _skill_patterns(jd: dict) -> List[Tuple[re.Pattern, float]]:
+    patterns = []
+    for key, weight in (("required_skills", 2.0), ("preferred_skills", 1.0)):
+        for skill in jd.get(key) or []:
+            name = (skill.get("skill") or "").strip().lower()
+            if name:
+                patterns.append((re.compile(r"(?<![a-z0-9])" + re.escape(name) + r"(?![a-z0-9])"), weight))
+    return patterns
+
+
+def _relevance(text: str, patterns: List[Tuple[re.Pattern, float]]) -> float:
+    text = text.lower()
+    return sum(weight for pattern, weight in patterns if pattern.search(text))
+
+
+def trim_resume_for_jd(resume: dict, jd: dict, max_tokens: int) -> Tuple[dict, int]:
+    '''
+        Fits the compact serialization of `resume` into `max_tokens`, dropping the content least relevant to the JD first:
+        responsibility bullets (ranked by the JD skills they mention, earlier roles and bullets kept on ties),
+        then skills the JD does not ask for, then the tail of the summary.
+        Returns the trimmed resume (already pruned of empty fields) and the number of items removed.
+    '''
+    resume = prune_empty(resume)
+    budget_chars = max_tokens * CHARS_PER_TOKEN
+    size = len(compact_json(resume))
+    if size <= budget_chars:
+        return resume, 0
+
+    patterns = _skill_patterns(jd)
+    bullets = []   #(relevance, section order, entry order, bullet order, section, entry index, bullet)
+    for section_order, section in enumerate(("work_experience", "projects")):
+        for entry_index, entry in enumerate(resume.get(section, [])):
+            for bullet_order, bullet in enumerate(entry.get("responsibilities", [])):
+                bullets.append((_relevance(bullet, patterns), section_order, entry_index, bullet_order, section, bullet))
+
+    #Least relevant first; among equals the later section/role/bullet goes first
+    bullets.sort(key=lambda b: (b[0], -b[1], -b[2], -b[3]))
+    dropped = set()
+    for relevance, _, entry_index, bullet_order, section, bullet in bullets:
+        if size <= budget_chars:
+            break
+        dropped.add((section, entry_index, bullet_order))
+        size -= len(json.dumps(bullet, ensure_ascii=False)) + 1   #The bullet and its comma
+    removed = len(dropped)
+    for section in ("work_experience", "projects"):
+        for entry_index, entry in enumerate(resume.get(section, [])):
+            if "responsibilities" in entry:
+                entry["responsibilities"] = [bullet for bullet_order, bullet in enumerate(entry["responsibilities"])
+                                             if (section, entry_index, bullet_order) not in dropped]
+    resume = prune_empty(resume)
+    size = len(compact_json(resume))
+
+    if size > budget_chars and resume.get("skills"):
+        kept = [skill for skill in resume["skills"] if _relevance(skill, patterns) > 0]
+        removed += len(resume["skills"]) - len(kept)
+        resume["skills"] = kept
+        resume = prune_empty(resume)
+        size = len(compact_json(resume))
+
+    if size > budget_chars and resume.get("summary"):
+        overflow = size - budget_chars
+        summary = resume["summary"]
+        resume["summary"] = summary[:max(0, len(summary) - overflow - 3)].rstrip() + "..."
+        removed += 1
+    return prune_empty(resume), removed
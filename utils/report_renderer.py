@@ -0,0 +1,143 @@
+import html
+from datetime import datetime, timezone
+from string import Template
+from typing import Dict, List, Optional
+
+#=====================Templates=====================
+#Same structure the ReportingAgent prompt asks Gemini for, filled in locally
+MARKDOWN_TEMPLATE = Template("""# Candidate Screening Report$candidate_heading
+
+**Match Score:** $score / 100 ($verdict)
+
+## Summary
+$summary
+
+## Strengths
+$strengths
+
+## Gaps / Areas for Review
+$gaps
+""")
+
+HTML_SECTION_TEMPLATE = Template("""<section class="report" id="$anchor">
+  <h1>Candidate Screening Report$candidate_heading</h1>
+  <p class="score"><strong>Match Score:</strong> $score / 100 ($verdict)</p>
+  <h2>Summary</h2>
+  <p>$summary</p>
+  <h2>Strengths</h2>
+  $strengths
+  <h2>Gaps / Areas for Review</h2>
+  $gaps
+</section>""")
+
+HTML_DOCUMENT_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>
+  body { font-family: system-ui, sans-serif; max-width: 60rem; margin: 2rem auto; line-height: 1.5; }
+  table { border-collapse: collapse; } td, th { border: 1px solid #ccc; padding: .25rem .75rem; text-align: left; }
+  .report { border-top: 1px solid #ccc; margin-top: 2rem; }
+</style>
+</head>
+<body>
+$body
+</body>
+</html>
+""")
+
+#Score bands shown next to the match score
+VERDICTS = ((80, "Strong match"), (60, "Good match"), (40, "Partial match"), (0, "Weak match"))
+
+
+def _verdict(score) -> str:
+    if not isinstance(score, (int, float)):
+        return "Not scored"
+    return next(label for threshold, label in VERDICTS if score >= threshold)
+
+
+def _markdown_list(items: List[str]) -> str:
+    return "\n".join(f"- {item}" for item in items) if items else "- None noted."
+
+
+def _markdown_cell(text: str) -> str:
+    return text.replace("|", "\\|")
+
+
+def _html_list(items: List[str]) -> str:
+    if not items:
+        return "<ul><li>None noted.</li></ul>"
+    return "<ul>" + "".join(f"<li>{html.escape(item)}</li>" for item in items) + "</ul>"
+
+
+def _fields(screening: dict) -> dict:
+    score = screening.get("match_score")
+    return {"score": score if score is not None else "N/A",
+            "verdict": _verdict(score),
+            "summary": screening.get("summary") or "No summary provided.",
+            "strengths": screening.get("strengths") or [],
+            "gaps": screening.get("gaps") or []}
+
+
+#=====================Renderers=====================
+def render_markdown(screening: dict, candidate_name: Optional[str] = None) -> str:
+    '''
+        Renders one stored ScreeningResult as a markdown report (no LLM call).
+    '''
+    fields = _fields(screening)
+    return MARKDOWN_TEMPLATE.substitute(
+        candidate_heading = f": {candidate_name}" if candidate_name else "",
+        score = fields["score"], verdict = fields["verdict"], summary = fields["summary"],
+        strengths = _markdown_list(fields["strengths"]), gaps = _markdown_list(fields["gaps"]))
+
+
+def _html_section(screening: dict, candidate_name: Optional[str] = None) -> str:
+    fields = _fields(screening)
+    return HTML_SECTION_TEMPLATE.substitute(
+        anchor = html.escape(str(screening.get("_id", "report")), quote = True),
+        candidate_heading = f": {html.escape(candidate_name)}" if candidate_name else "",
+        score = fields["score"], verdict = fields["verdict"], summary = html.escape(fields["summary"]),
+        strengths = _html_list(fields["strengths"]), gaps = _html_list(fields["gaps"]))
+
+
+def render_html(screening: dict, candidate_name: Optional[str] = None) -> str:
+    '''
+        Renders one stored ScreeningResult as a standalone HTML page.
+    '''
+    title = f"Screening Report: {candidate_name}" if candidate_name else "Screening Report"
+    return HTML_DOCUMENT_TEMPLATE.substitute(title = html.escape(title), body = _html_section(screening, candidate_name))
+
+
+def render_bulk(screenings: List[dict], fmt: str = "markdown", candidate_names: Optional[Dict[str, str]] = None,
+                title: str = "Screening Reports") -> str:
+    '''
+        Renders many screenings into one document: an overview table sorted by match score, then every report.
+        `candidate_names` maps resume_id -> name.
+    '''
+    candidate_names = candidate_names or {}
+    ordered = sorted(screenings, key = lambda s: s.get("match_score") if isinstance(s.get("match_score"), (int, float)) else -1,
+                     reverse = True)
+    generated_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+    def name_of(screening):
+        return candidate_names.get(screening.get("resume_id")) or screening.get("resume_id") or "Unknown candidate"
+
+    if fmt == "markdown":
+        overview = "\n".join(f"| {rank} | {_markdown_cell(name_of(s))} | {s.get('match_score', 'N/A')} | {_verdict(s.get('match_score'))} | {s.get('_id', '')} |"
+                             for rank, s in enumerate(ordered, start = 1))
+        sections = "\n---\n\n".join(render_markdown(s, name_of(s)) for s in ordered)
+        return (f"# {title}\n\n_{len(ordered)} candidates, generated {generated_at}_\n\n"
+                f"| Rank | Candidate | Score | Verdict | Screening ID |\n|---|---|---|---|---|\n{overview}\n\n---\n\n{sections}")
+
+    if fmt == "html":
+        rows = "".join(f"<tr><td>{rank}</td><td><a href=\"#{html.escape(str(s.get('_id', '')), quote = True)}\">"
+                       f"{html.escape(name_of(s))}</a></td><td>{s.get('match_score', 'N/A')}</td>"
+                       f"<td>{_verdict(s.get('match_score'))}</td></tr>"
+                       for rank, s in enumerate(ordered, start = 1))
+        body = (f"<h1>{html.escape(title)}</h1>\n<p><em>{len(ordered)} candidates, generated {generated_at}</em></p>\n"
+                f"<table><tr><th>Rank</th><th>Candidate</th><th>Score</th><th>Verdict</th></tr>{rows}</table>\n"
+                + "\n".join(_html_section(s, name_of(s)) for s in ordered))
+        return HTML_DOCUMENT_TEMPLATE.substitute(title = html.escape(title), body = body)
+
+    raise ValueError("`format` must be 'markdown' or 'html'.")
@@ -0,0 +1,203 @@
+import re
+from typing import Dict, List, Optional
+
+#Bump when the rules below change: it is part of the parser version, so cached parses are redone
+PREPARSER_VERSION = "2"
+
+#Section headings as they appear on resumes (normalized: lower case, no punctuation, '&' -> 'and')
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "career summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "about"),
+    "experience": ("experience", "work experience", "professional experience", "relevant experience", "employment",
+                   "employment history", "work history", "career history", "internships", "internship",
+                   "internship experience"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects", "selected projects",
+                 "side projects"),
+    "education": ("education", "academic background", "academics", "academic qualifications", "qualifications",
+                  "education and training", "educational qualifications"),
+    "skills": ("skills", "technical skills", "key skills", "core skills", "core competencies", "skill set", "skillset",
+               "tech stack", "technologies", "tools and technologies", "skills and tools", "technical expertise"),
+    #Sections the schema has no field for; they still go to the model, which may take skills or projects from them
+    "other": ("certifications", "certificates", "licenses and certifications", "achievements", "awards",
+              "honors and awards", "publications", "languages", "interests", "hobbies", "volunteering",
+              "volunteer experience", "extracurricular activities", "activities", "positions of responsibility",
+              "courses", "coursework", "references", "leadership"),
+}
+_HEADING_KINDS = {alias: kind for kind, aliases in SECTION_HEADINGS.items() for alias in aliases}
+#Kinds recognised in the inline form "Skills: Python, Go" as well as on a line of their own
+_INLINE_KINDS = ("summary", "skills")
+
+#Words that make a header line a document title or a job title rather than a person's name
+NOT_NAME_WORDS = {"resume", "résumé", "cv", "curriculum", "vitae", "biodata", "portfolio", "profile", "contact",
+                  "engineer", "developer", "programmer", "architect", "manager", "analyst", "scientist", "designer",
+                  "consultant", "administrator", "specialist", "director", "lead", "head", "officer", "executive",
+                  "intern", "trainee", "associate", "assistant", "coordinator", "technician", "accountant", "teacher",
+                  "student", "graduate", "founder", "president", "senior", "junior", "principal", "staff", "software",
+                  "data", "full", "stack", "backend", "frontend", "devops", "cloud", "product", "project", "marketing",
+                  "sales", "research", "researcher"}
+
+#ParsedResume fields in schema order; the structured lists are always left to the model
+RESUME_FIELDS = ("name", "email", "phone", "summary", "work_experience", "projects", "education", "skills")
+
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_PHONE_RE = re.compile(r"(?<![\w+])\+?\(?\d[\d\s().-]{7,18}\d(?![\w])")
+_URL_RE = re.compile(r"https?://|www\.|linkedin\.com|github\.com", re.I)
+_BULLET_RE = re.compile(r"^[\s\-*•·▪●◦‣>#=]+")
+_SKILL_SPLIT_RE = re.compile(r"[,;|•·▪●]|\t|\s{3,}")
+#A skills token longer than this reads like a sentence, so the section is left to the model
+MAX_SKILL_WORDS = 4
+MAX_SKILL_CHARS = 40
+
+
+def _normalize_heading(line: str) -> str:
+    text = _BULLET_RE.sub("", line).replace("&", " and ")
+    return " ".join(re.sub(r"[^a-z ]", " ", text.lower()).split())
+
+
+def _heading(line: str) -> Optional[tuple]:
+    '''
+        (kind, inline content) when `line` is a section heading, e.g. "EDUCATION", "## Work Experience",
+        "Technical Skills:" or "Skills: Python, Go"; None otherwise.
+    '''
+    stripped = line.strip()
+    if not stripped or len(stripped) > 200:
+        return None
+    head, colon, rest = stripped.partition(":")
+    kind = _HEADING_KINDS.get(_normalize_heading(head))
+    if kind and (not rest.strip() or kind in _INLINE_KINDS):
+        return kind, rest.strip()
+    if not colon and len(stripped.split()) <= 5:
+        kind = _HEADING_KINDS.get(_normalize_heading(stripped))
+        if kind:
+            return kind, ""
+    return None
+
+
+def segment_sections(raw_text: str) -> List[dict]:
+    '''
+        Splits resume text at its section headings. The first section is the "header" (the lines before any
+        heading: name, contact details); each section is {"kind", "heading", "lines"}.
+    '''
+    sections = [{"kind": "header", "heading": None, "lines": []}]
+    for line in raw_text.splitlines():
+        heading = _heading(line)
+        if heading:
+            kind, inline = heading
+            sections.append({"kind": kind, "heading": line.strip(), "lines": [inline] if inline else []})
+        elif line.strip():
+            sections[-1]["lines"].append(line.strip())
+    return sections
+
+
+#=====================Field Extractors=====================
+def find_email(text: str) -> Optional[str]:
+    match = _EMAIL_RE.search(text)
+    return match.group(0) if match else None
+
+
+def find_phone(text: str) -> Optional[str]:
+    '''
+        The first run of 10-15 digits written like a phone number (date ranges such as "2019 - 2021" are too short).
+    '''
+    for match in _PHONE_RE.finditer(text):
+        if 10 <= sum(char.isdigit() for char in match.group(0)) <= 15:
+            return match.group(0).strip()
+    return None
+
+
+def find_name(header_lines: List[str]) -> Optional[str]:
+    '''
+        The resume's first line (or its first "|"-separated part) when it unambiguously reads like a person's name.
+        Anything else ("Curriculum Vitae", "Senior Software Engineer", a line of contact details) returns None, so
+        the name and the header are left to the model instead of guessed from a later line.
+    '''
+    if not header_lines:
+        return None
+    candidate = re.split(r"\s[|•·,]\s|\s[-–]\s", header_lines[0])[0].strip()
+    words = candidate.split()
+    if (2 <= len(words) <= 5 and len(candidate) <= 50 and not any(char.isdigit() for char in candidate)
+            and "@" not in candidate and not _URL_RE.search(candidate)
+            and all(word[0].isalpha() for word in words) and _normalize_heading(candidate) not in _HEADING_KINDS
+            and not set(_normalize_heading(candidate).split()) & NOT_NAME_WORDS):
+        return candidate
+    return None
+
+
+def parse_skills(lines: List[str]) -> Optional[List[str]]:
+    '''
+        Tokens of a skills section: comma/pipe/bullet separated lists, optionally under labels such as
+        "Languages: Python, Go". None when a token reads like a sentence, so the section needs the model.
+    '''
+    skills, seen = [], set()
+    for line in lines:
+        line = _BULLET_RE.sub("", line)
+        label, colon, rest = line.partition(":")
+        if colon and len(label.split()) <= MAX_SKILL_WORDS:
+            line = rest
+        for token in _SKILL_SPLIT_RE.split(line):
+            token = re.sub(r"^(?:and|&)\s+", "", token.strip().rstrip("."), flags = re.I).strip()
+            if not token:
+                continue
+            if len(token) > MAX_SKILL_CHARS or len(token.split()) > MAX_SKILL_WORDS:
+                return None
+            if token.lower() not in seen:
+                seen.add(token.lower())
+                skills.append(token)
+    return skills or None
+
+
+def _header_has_prose(header_lines: List[str], name: Optional[str]) -> bool:
+    '''
+        True when the header holds more than a name and contact details (e.g. a summary without a heading).
+    '''
+    for line in header_lines:
+        if line == name or find_email(line) or find_phone(line) or _URL_RE.search(line):
+            continue
+        if len(line.split()) > 6:
+            return True
+    return False
+
+
+#=====================Pre-Parse=====================
+def preparse_resume(raw_text: str) -> Dict:
+    '''
+        Resolves what rules get right on almost every resume and says what is left for the model.
+        Returns:
+            - fields: the ParsedResume fields resolved locally (name, email, phone, summary, skills)
+            - segmented: whether any section heading was found; without one the text is left to the model whole
+            - llm_fields: the fields the model still has to return
+            - llm_text: the sections the model needs for them (empty when nothing is left)
+            - sections: the kinds of the sections found, in order
+    '''
+    sections = segment_sections(raw_text)
+    header = sections[0]["lines"]
+    by_kind: Dict[str, List[dict]] = {}
+    for section in sections[1:]:
+        by_kind.setdefault(section["kind"], []).append(section)
+
+    name = find_name(header)
+    fields = {"name": name,
+              "email": find_email("\n".join(header)) or find_email(raw_text),
+              "phone": find_phone("\n".join(header)) or find_phone(raw_text)}
+    if "summary" in by_kind:
+        fields["summary"] = " ".join(line for section in by_kind["summary"] for line in section["lines"]) or None
+    if "skills" in by_kind:
+        fields["skills"] = parse_skills([line for section in by_kind["skills"] for line in section["lines"]])
+    fields = {key: value for key, value in fields.items() if value}
+
+    llm_fields = [field for field in RESUME_FIELDS if field not in fields]
+    #The header goes to the model when it still has to find a contact field there or holds a summary without a heading
+    needed = []
+    if set(llm_fields) & {"name", "email", "phone"} or _header_has_prose(header, name):
+        needed.append(sections[0])
+        if "summary" not in llm_fields and _header_has_prose(header, name):
+            llm_fields.insert(RESUME_FIELDS.index("summary"), "summary")
+            fields.pop("summary", None)
+    for section in sections[1:]:
+        if section["kind"] in ("experience", "projects", "education", "other") or section["kind"] in llm_fields:
+            needed.append(section)
+
+    llm_text = "\n\n".join("\n".join(([section["heading"]] if section["heading"] else []) + section["lines"])
+                           for section in needed if section["lines"])
+    return {"fields": fields, "segmented": len(sections) > 1, "llm_fields": llm_fields if llm_text else [],
+            "llm_text": llm_text, "sections": [section["kind"] for section in sections[1:]]}
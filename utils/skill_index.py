@@ -0,0 +1,255 @@
+import re
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+#Canonical spelling of common skill aliases, keyed by the normalized form (see `normalize_skill`)
+SKILL_ALIASES = {
+    "reactjs": "react", "react js": "react",
+    "nodejs": "node", "node js": "node",
+    "vuejs": "vue", "vue js": "vue",
+    "nextjs": "next", "angularjs": "angular",
+    "js": "javascript", "ecmascript": "javascript",
+    "ts": "typescript",
+    "py": "python", "python3": "python", "python 3": "python",
+    "golang": "go",
+    "cpp": "c++", "c plus plus": "c++",
+    "c sharp": "c#", "csharp": "c#",
+    "net": "dotnet", "net core": "dotnet",
+    "postgres": "postgresql", "postgre sql": "postgresql",
+    "mongo": "mongodb", "mongo db": "mongodb",
+    "k8s": "kubernetes",
+    "amazon web services": "aws",
+    "google cloud": "gcp", "google cloud platform": "gcp",
+    "ms azure": "azure", "microsoft azure": "azure",
+    "sklearn": "scikitlearn", "scikit learn": "scikitlearn",
+    "tf": "tensorflow", "keras tensorflow": "tensorflow",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "natural language processing": "nlp",
+    "computer vision": "cv",
+    "large language models": "llm", "llms": "llm",
+    "gitgithub": "git", "github": "git",
+    "cicd": "ci cd",
+    "fullstack": "full stack",
+    "machinelearning": "machine learning", "deeplearning": "deep learning",
+}
+
+#Everything except word characters, whitespace and the '+'/'#' of C++/C#
+_PUNCTUATION_RE = re.compile(r"[^\w\s+#]")
+_SEPARATOR_RE = re.compile(r"[-_/]")
+_TOKEN_RE = re.compile(r'\(|\)|"[^"]*"|[^\s()"]+')
+_OPERATORS = ("AND", "OR", "NOT")
+
+
+def normalize_skill(skill: str) -> str:
+    '''
+        Folds case, strips punctuation and maps aliases so 'ReactJS', 'React.js' and 'React' are one skill.
+        '-', '_' and '/' separate words like a space does, so 'Full-Stack', 'full_stack' and 'Full Stack' are one
+        skill too; the words are then tried joined ('CI CD' -> 'cicd') against the aliases.
+    '''
+    text = _SEPARATOR_RE.sub(" ", skill.casefold())
+    text = _PUNCTUATION_RE.sub("", text)
+    text = " ".join(text.split())
+    if text in SKILL_ALIASES:
+        return SKILL_ALIASES[text]
+    return SKILL_ALIASES.get(text.replace(" ", ""), text)
+
+
+def normalize_skills(skills: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(n for n in (normalize_skill(s) for s in skills or []) if n))
+
+
+#=====================Boolean Skill Query Parsing=====================
+def parse_query(query: str):
+    '''
+        Parses queries such as 'Python AND (PyTorch OR TensorFlow) NOT PHP' into a nested tuple tree:
+        ("skill", name) | ("and", a, b) | ("or", a, b) | ("not", a).
+        Operators must be upper-case; adjacent words (or a quoted phrase) form one multi-word skill ('Machine Learning').
+        'X NOT Y' means 'X AND NOT Y'.
+    '''
+    tokens = []
+    for token in _TOKEN_RE.findall(query):
+        if token.startswith('"'):
+            tokens.append(("phrase", token.strip('"')))
+        elif token in _OPERATORS or token in ("(", ")"):
+            tokens.append((token, None))
+        elif tokens and tokens[-1][0] == "skill":
+            tokens[-1] = ("skill", f"{tokens[-1][1]} {token}")
+        else:
+            tokens.append(("skill", token))
+
+    position = 0
+
+    def peek():
+        return tokens[position][0] if position < len(tokens) else None
+
+    def take(expected = None):
+        nonlocal position
+        if position >= len(tokens) or (expected and tokens[position][0] != expected):
+            raise ValueError(f"Malformed skill query near token {position + 1}: expected {expected or 'a skill'}")
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        node = parse_and()
+        while peek() == "OR":
+            take("OR")
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_factor()
+        while peek() in ("AND", "NOT", "skill", "phrase", "("):
+            if peek() == "AND":
+                take("AND")
+            node = ("and", node, parse_factor())
+        return node
+
+    def parse_factor():
+        kind = peek()
+        if kind == "NOT":
+            take("NOT")
+            return ("not", parse_factor())
+        if kind == "(":
+            take("(")
+            node = parse_or()
+            take(")")
+            return node
+        _, name = take("phrase" if kind == "phrase" else "skill")
+        return ("skill", normalize_skill(name))
+
+    if not tokens:
+        raise ValueError("Skill query cannot be empty")
+    tree = parse_or()
+    if position != len(tokens):
+        raise ValueError(f"Malformed skill query near token {position + 1}: unexpected '{tokens[position][1] or tokens[position][0]}'")
+    return tree
+
+
+def to_mongo_filter(tree) -> dict:
+    '''
+        Translates a parsed query into a filter on the multikey `normalized_skills` index.
+    '''
+    kind = tree[0]
+    if kind == "skill":
+        return {"normalized_skills": tree[1]}
+    if kind == "not":
+        return {"$nor": [to_mongo_filter(tree[1])]}
+    return {f"${kind}": [to_mongo_filter(tree[1]), to_mongo_filter(tree[2])]}
+
+
+class SkillIndex:
+    '''
+        In-memory inverted index: every skill maps to a bitmap (a Python int) over dense resume positions,
+        so boolean queries run as a handful of big-integer AND/OR/NOT operations.
+        The index is per process: inserts made by other workers (or straight to MongoDB) are picked up by a
+        background task comparing `watermark()` with the `resumes` collection (db.database.refresh_skill_index_periodically).
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._resume_ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._doc_skills: Dict[int, Set[str]] = {}
+        self._postings: Dict[str, int] = {}
+        self._universe = 0
+        self._max_id: Optional[str] = None
+
+    def add(self, resume_id: str, normalized_skills: Iterable[str]):
+        with self._lock:
+            position = self._positions.get(resume_id)
+            if position is None:
+                position = len(self._resume_ids)
+                self._resume_ids.append(resume_id)
+                self._positions[resume_id] = position
+                self._universe |= 1 << position
+                self._max_id = max(self._max_id or resume_id, resume_id)
+            bit = 1 << position
+
+            #Re-adding a resume replaces its previous skills
+            for skill in self._doc_skills.get(position, ()):
+                self._postings[skill] &= ~bit
+            skills = set(normalized_skills)
+            for skill in skills:
+                self._postings[skill] = self._postings.get(skill, 0) | bit
+            self._doc_skills[position] = skills
+
+    def rebuild(self, documents: Iterable[tuple]):
+        '''
+            Replaces the whole index from (resume_id, normalized_skills) pairs.
+            Bitmaps are assembled from byte arrays in one go instead of OR-ing one bit at a time.
+        '''
+        resume_ids, doc_skills, skill_positions = [], {}, {}
+        for position, (resume_id, normalized_skills) in enumerate(documents):
+            resume_ids.append(resume_id)
+            doc_skills[position] = set(normalized_skills)
+            for skill in doc_skills[position]:
+                skill_positions.setdefault(skill, []).append(position)
+
+        size = (len(resume_ids) + 7) // 8
+        postings = {}
+        for skill, positions in skill_positions.items():
+            bits = bytearray(size)
+            for position in positions:
+                bits[position >> 3] |= 1 << (position & 7)
+            postings[skill] = int.from_bytes(bits, "little")
+
+        with self._lock:
+            self._resume_ids = resume_ids
+            self._positions = {resume_id: position for position, resume_id in enumerate(resume_ids)}
+            self._doc_skills = doc_skills
+            self._postings = postings
+            self._universe = (1 << len(resume_ids)) - 1
+            self._max_id = max(resume_ids, default = None)
+
+    def _evaluate(self, tree) -> int:
+        kind = tree[0]
+        if kind == "skill":
+            return self._postings.get(tree[1], 0)
+        if kind == "not":
+            return self._universe & ~self._evaluate(tree[1])
+        left, right = self._evaluate(tree[1]), self._evaluate(tree[2])
+        return left & right if kind == "and" else left | right
+
+    def query(self, query: str, limit: Optional[int] = None) -> List[str]:
+        tree = parse_query(query)
+        with self._lock:
+            bitmap = self._evaluate(tree)
+            resume_ids = []
+            while bitmap and (limit is None or len(resume_ids) < limit):
+                lowest = bitmap & -bitmap
+                resume_ids.append(self._resume_ids[lowest.bit_length() - 1])
+                bitmap ^= lowest
+            return resume_ids
+
+    def count(self, query: str) -> int:
+        tree = parse_query(query)
+        with self._lock:
+            return bin(self._evaluate(tree)).count("1")
+
+    def watermark(self) -> Tuple[int, Optional[str]]:
+        '''
+            (indexed resumes, highest resume _id): equal to the collection's while the index is current.
+        '''
+        with self._lock:
+            return len(self._resume_ids), self._max_id
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"resumes": len(self._resume_ids), "distinct_skills": sum(1 for b in self._postings.values() if b)}
+
+
+#Process-wide index, kept current by db.database.add_document("resumes", ...) and refresh_skill_index_async
+skill_index = SkillIndex()
+
+
+if __name__ == "__main__":
+    #Rebuild command: python -m utils.skill_index rebuild
+    if sys.argv[1:] != ["rebuild"]:
+        print("Usage: python -m utils.skill_index rebuild")
+        sys.exit(1)
+    from db.database import rebuild_skill_index
+    print(f"Re-normalized skills of {rebuild_skill_index(persist = True)} resumes")
@@ -0,0 +1,221 @@
+import fcntl
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from utils.skill_index import normalize_skill
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_SEARCH_BLOCK_ROWS = 65536          #Rows scored per block, bounding the temporary score array
+_INITIAL_CAPACITY = 1024            #Rows pre-allocated in a new vector file; the file doubles when full
+
+
+#=====================Offline Hashed TF-IDF Vectorizer=====================
+def _tokens(text: str) -> List[str]:
+    return [token.rstrip(".") for token in _TOKEN_RE.findall(text.lower())]
+
+
+def hash_vectorize(weighted_terms: Iterable[Tuple[str, float]], dim: int) -> np.ndarray:
+    '''
+        Signed feature hashing of (term, weight) pairs with sublinear term frequency, L2-normalized.
+        No vocabulary is fitted, so vectors never need recomputing as the corpus grows.
+    '''
+    counts = Counter()
+    for term, weight in weighted_terms:
+        counts[term] += weight
+
+    vector = np.zeros(dim, dtype = np.float32)
+    for term, count in counts.items():
+        hashed = zlib.crc32(term.encode("utf-8"))
+        sign = 1.0 if hashed & 0x80000000 == 0 else -1.0
+        vector[hashed % dim] += sign * (1.0 + math.log(count))
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _text_terms(text: str, weight: float = 1.0):
+    tokens = _tokens(text or "")
+    for token in tokens:
+        yield token, weight
+    for first, second in zip(tokens, tokens[1:]):
+        yield f"{first} {second}", weight * 0.5
+
+
+def _skill_terms(skills: Iterable[str], weight: float):
+    for skill in skills:
+        yield f"skill:{normalize_skill(skill)}", weight
+
+
+def vectorize_resume(resume: dict, dim: int) -> np.ndarray:
+    def terms():
+        yield from _text_terms(resume.get("summary"))
+        yield from _skill_terms(resume.get("skills", []), weight = 2.0)
+        yield from _text_terms(" ".join(resume.get("skills", [])))
+        for item in resume.get("work_experience", []) + resume.get("projects", []):
+            yield from _text_terms(item.get("title") or "", weight = 1.5)
+            for responsibility in item.get("responsibilities") or []:
+                yield from _text_terms(responsibility)
+    return hash_vectorize(terms(), dim)
+
+
+def vectorize_jd(jd: dict, dim: int) -> np.ndarray:
+    def terms():
+        yield from _text_terms(jd.get("job_title"), weight = 1.5)
+        required = [s["skill"] for s in jd.get("required_skills", [])]
+        preferred = [s["skill"] for s in jd.get("preferred_skills", [])]
+        yield from _skill_terms(required, weight = 2.0)
+        yield from _skill_terms(preferred, weight = 1.0)
+        yield from _text_terms(" ".join(required + preferred))
+        yield from _text_terms(jd.get("education_requirements"), weight = 0.5)
+    return hash_vectorize(terms(), dim)
+
+
+#=====================Memory-Mapped Vector Store=====================
+class VectorIndex:
+    '''
+        Resume vectors in a memory-mapped float32 matrix (`vectors.f32`) with an append-only id map (`ids.txt`).
+        The id map is the commit point: a row only becomes visible once its id line is written, so any number
+        of worker processes can map the same file read-only while one of them appends.
+    '''
+    def __init__(self, directory: str, dim: int):
+        self.directory = directory
+        self.dim = dim
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.ids_path = os.path.join(directory, "ids.txt")
+        self.df_path = os.path.join(directory, "df.npy")
+        self.lock_path = os.path.join(directory, ".lock")
+        os.makedirs(directory, exist_ok = True)
+
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._ids_size = 0
+        self._matrix = None
+        self._df = np.zeros(dim, dtype = np.float64)
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        '''
+            Picks up rows appended by this or another process since the last call (cheap when nothing changed).
+        '''
+        try:
+            ids_size = os.path.getsize(self.ids_path)
+        except FileNotFoundError:
+            return
+        if ids_size == self._ids_size:
+            return
+
+        with open(self.ids_path, "rb") as ids_file:
+            ids_file.seek(self._ids_size)
+            appended = ids_file.read(ids_size - self._ids_size).decode("utf-8")
+        if "\n" not in appended:
+            return
+        complete, _, _ = appended.rpartition("\n")
+        for resume_id in filter(None, complete.split("\n")):
+            self._positions[resume_id] = len(self._ids)
+            self._ids.append(resume_id)
+        self._ids_size += len(complete.encode("utf-8")) + 1
+
+        if os.path.exists(self.df_path):
+            self._df = np.load(self.df_path)
+        self._matrix = np.memmap(self.vectors_path, dtype = np.float32, mode = "r", shape = (len(self._ids), self.dim)) if self._ids else None
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+
+    def contains(self, resume_id: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return resume_id in self._positions
+
+    def append(self, items: List[Tuple[str, np.ndarray]]) -> int:
+        '''
+            Appends (resume_id, vector) rows, skipping ids that are already indexed. Returns rows written.
+        '''
+        with self._lock, self._file_lock():
+            self._refresh()
+            items = [(resume_id, vector) for resume_id, vector in dict(items).items() if resume_id not in self._positions]
+            if not items:
+                return 0
+
+            rows = len(self._ids)
+            row_bytes = self.dim * 4
+            current_size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+            capacity = max(current_size // row_bytes, _INITIAL_CAPACITY)
+            while capacity < rows + len(items):
+                capacity *= 2
+
+            block = np.stack([vector.astype(np.float32, copy = False) for _, vector in items])
+            with open(self.vectors_path, "r+b" if current_size else "wb") as vectors_file:
+                if capacity * row_bytes > current_size:
+                    vectors_file.truncate(capacity * row_bytes)
+                vectors_file.seek(rows * row_bytes)
+                vectors_file.write(block.tobytes())
+
+            df = np.load(self.df_path) if os.path.exists(self.df_path) else np.zeros(self.dim, dtype = np.float64)
+            df += (block != 0).sum(axis = 0)
+            np.save(self.df_path, df)
+
+            with open(self.ids_path, "a", encoding = "utf-8") as ids_file:
+                ids_file.write("".join(f"{resume_id}\n" for resume_id, _ in items))
+            self._refresh()
+            return len(items)
+
+    def reset(self):
+        with self._lock, self._file_lock():
+            for path in (self.vectors_path, self.ids_path, self.df_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._ids, self._positions, self._ids_size, self._matrix = [], {}, 0, None
+            self._df = np.zeros(self.dim, dtype = np.float64)
+
+    def search(self, query_vector: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        '''
+            Exact top-K by cosine similarity, scored block by block straight from the memory map.
+            The query is IDF-weighted with the stored document frequencies before scoring.
+        '''
+        with self._lock:
+            self._refresh()
+            matrix, ids, df = self._matrix, list(self._ids), self._df
+        if matrix is None or k <= 0:
+            return []
+
+        idf = np.log((len(ids) + 1) / (df + 1)) + 1.0
+        query = (query_vector * idf).astype(np.float32)
+        norm = np.linalg.norm(query)
+        if not norm:
+            return []
+        query /= norm
+
+        best_rows = np.empty(0, dtype = np.int64)
+        best_scores = np.empty(0, dtype = np.float32)
+        for start in range(0, len(ids), _SEARCH_BLOCK_ROWS):
+            scores = matrix[start:start + _SEARCH_BLOCK_ROWS] @ query
+            keep = min(k, len(scores))
+            top = np.argpartition(-scores, keep - 1)[:keep]
+            best_rows = np.concatenate([best_rows, top + start])
+            best_scores = np.concatenate([best_scores, scores[top]])
+            if len(best_rows) > k:
+                survivors = np.argpartition(-best_scores, k - 1)[:k]
+                best_rows, best_scores = best_rows[survivors], best_scores[survivors]
+
+        order = np.argsort(-best_scores, kind = "stable")
+        return [(ids[best_rows[i]], float(best_scores[i])) for i in order]